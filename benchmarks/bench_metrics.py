@@ -0,0 +1,245 @@
+"""
+Metrics Benchmark
+Times the Matrix metrics: the previous mask-per-metric calculate_metrics,
+the vectorized compute_metrics kernel and a MetricsAccumulator lookup.
+
+Run from the project folder:  python benchmarks/bench_metrics.py [sizes...]
+"""
+
+import os
+import sys
+import math
+import time
+import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trade_schema import apply_schema
+from metrics_engine import compute_metrics, MetricsAccumulator
+
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+# Legacy Max Consec. values come from a cumsum/diff chain, not run lengths
+SKIP_COMPARE = {'Max Consec. Loss', 'Max Consec. Win'}
+
+
+def legacy_calculate_metrics(df, current_balance, start_balance):
+    """calculate_metrics as it was before the vectorized kernel (one mask per metric)"""
+
+    total_shares = 100
+    metrics = {}
+
+    # Handle empty dataframe
+    if df.empty:
+        metrics['Acc. Return Net $'] = 0
+        metrics['Acc. Return Gross $'] = 0
+        metrics['Account Balance'] = current_balance
+        metrics['Daily Return $'] = 0
+        metrics['Return on Winners'] = 0
+        metrics['Return on Losers'] = 0
+        metrics['Return $ on Long'] = 0
+        metrics['Return $ on Short'] = 0
+        metrics['Biggest Profit $'] = 0
+        metrics['Biggest Loss $'] = 0
+        metrics['Profit/Loss Ratio'] = 0
+        metrics['Profit Factor'] = 0
+        metrics['Trade $ Expectancy'] = 0
+        metrics['Win %'] = 0
+        metrics['Loss %'] = 0
+        metrics['BE %'] = 0
+        metrics['Open %'] = 0
+        metrics['Acc. Return %'] = 0
+        metrics['Biggest % Profit'] = 0
+        metrics['Biggest % Loser'] = 0
+        metrics['Return per Share'] = 0
+        metrics['Kelly Criterion'] = 0
+        metrics['Avg Return'] = 0
+        metrics['Avg Return $'] = 0
+        metrics['Return/Size'] = 0
+        metrics['Avg $ on Winners'] = 0
+        metrics['Avg $ on Losers'] = 0
+        metrics['Avg Daily P&L'] = 0
+        metrics['Avg Return %'] = 0
+        metrics['Avg % Return'] = 0
+        metrics['Avg % on Shorts'] = 0
+        metrics['Avg % on Long'] = 0
+        metrics['Avg % on Winners'] = 0
+        metrics['Avg % on Losers'] = 0
+        metrics['Trades'] = len(df)
+        metrics['Total Winner'] = 0
+        metrics['Total Open Trades'] = 0
+        metrics['Tot. Closed Trades'] = 0
+        metrics['Total Losers'] = 0
+        metrics['Total BE'] = 0
+        metrics['Max Consec. Loss'] = 0
+        metrics['Max Consec. Win'] = 0
+        metrics['PnL Std Dev'] = 0
+        metrics['PnL Std Dev (W)'] = 0
+        metrics['PnL Std Dev (L)'] = 0
+        metrics['SQN'] = 0
+        return metrics
+
+    # CRITICAL: Only use CLOSED trades for PnL calculations
+    closed_df = df[df['Status'] == 'Closed'] if 'Status' in df.columns else df
+
+    metrics['Acc. Return Net $'] = closed_df['PnL'].sum() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+    metrics['Acc. Return Gross $'] = closed_df['PnL'].abs().sum() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+
+    # CRITICAL: Use actual current balance from profile
+    metrics['Account Balance'] = current_balance
+
+    today = datetime.datetime.now().date()
+    daily_return = closed_df[closed_df['Time'].dt.date == today]['PnL'].sum() if 'PnL' in closed_df.columns and 'Time' in closed_df.columns and not closed_df.empty else 0
+    metrics['Daily Return $'] = round(daily_return, 2)
+
+    metrics['Return on Winners'] = closed_df[closed_df.get('Outcome', '') == 'Win']['PnL'].sum() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+    metrics['Return on Losers'] = closed_df[closed_df.get('Outcome', '') == 'Loss']['PnL'].sum() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+
+    if 'Position Type' in closed_df.columns and not closed_df.empty:
+        metrics['Return $ on Long'] = closed_df[closed_df['Position Type'] == 'Long Position']['PnL'].sum()
+        metrics['Return $ on Short'] = closed_df[closed_df['Position Type'] == 'Short Position']['PnL'].sum()
+    else:
+        metrics['Return $ on Long'] = 0
+        metrics['Return $ on Short'] = 0
+
+    metrics['Biggest Profit $'] = closed_df[closed_df.get('PnL', 0) > 0].get('PnL', pd.Series(dtype=float)).max() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+    metrics['Biggest Loss $'] = closed_df[closed_df.get('PnL', 0) < 0].get('PnL', pd.Series(dtype=float)).min() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+
+    if metrics.get('Return on Losers', 0) != 0:
+        metrics['Profit/Loss Ratio'] = abs(metrics['Return on Winners']) / abs(metrics['Return on Losers'])
+        metrics['Profit Factor'] = metrics['Return on Winners'] / abs(metrics['Return on Losers'])
+    else:
+        metrics['Profit/Loss Ratio'] = 0
+        metrics['Profit Factor'] = 0
+
+    # CRITICAL: Use CLOSED trades only for expectancy
+    metrics['Trade $ Expectancy'] = closed_df['PnL'].mean() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+
+    # Win/Loss % uses ALL trades (correct)
+    metrics['Win %'] = (df['Outcome'] == 'Win').mean() * 100 if 'Outcome' in df.columns else 0
+    metrics['Loss %'] = (df['Outcome'] == 'Loss').mean() * 100 if 'Outcome' in df.columns else 0
+    metrics['BE %'] = (df['Outcome'] == 'Break Even').mean() * 100 if 'Outcome' in df.columns else 0
+    metrics['Open %'] = (df['Status'] == 'Running').mean() * 100 if 'Status' in df.columns else 0
+
+    # CRITICAL: Use INITIAL balance for % return calculation
+    metrics['Acc. Return %'] = (metrics['Acc. Return Net $'] / start_balance) * 100 if start_balance else 0
+
+    metrics['Biggest % Profit'] = closed_df[closed_df.get('PnL %', 0) > 0].get('PnL %', pd.Series(dtype=float)).max() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
+    metrics['Biggest % Loser'] = closed_df[closed_df.get('PnL %', 0) < 0].get('PnL %', pd.Series(dtype=float)).min() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
+    metrics['Return per Share'] = metrics['Acc. Return Net $'] / total_shares if total_shares != 0 else 0
+
+    if metrics.get('Profit/Loss Ratio', 0) != 0:
+        metrics['Kelly Criterion'] = (metrics['Win %'] / 100 * (metrics['Profit/Loss Ratio'] + 1) - 1) / metrics['Profit/Loss Ratio']
+    else:
+        metrics['Kelly Criterion'] = 0
+
+    # Use closed trades for averages
+    metrics['Avg Return'] = closed_df.get('PnL %', pd.Series(dtype=float)).mean() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
+    metrics['Avg Return $'] = closed_df.get('PnL', pd.Series(dtype=float)).mean() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+    metrics['Return/Size'] = metrics['Acc. Return Net $'] / closed_df['Trade Size'].sum() if 'Trade Size' in closed_df.columns and not closed_df.empty and closed_df['Trade Size'].sum() != 0 else 0
+    metrics['Avg $ on Winners'] = closed_df[closed_df.get('Outcome', '') == 'Win'].get('PnL', pd.Series(dtype=float)).mean() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+    metrics['Avg $ on Losers'] = closed_df[closed_df.get('Outcome', '') == 'Loss'].get('PnL', pd.Series(dtype=float)).mean() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+    metrics['Avg Daily P&L'] = daily_return
+    metrics['Avg Return %'] = closed_df.get('PnL %', pd.Series(dtype=float)).mean() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
+    metrics['Avg % Return'] = closed_df.get('PnL %', pd.Series(dtype=float)).mean() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
+
+    if 'Position Type' in closed_df.columns and not closed_df.empty:
+        metrics['Avg % on Shorts'] = closed_df[closed_df['Position Type'] == 'Short Position'].get('PnL %', pd.Series(dtype=float)).mean()
+        metrics['Avg % on Long'] = closed_df[closed_df['Position Type'] == 'Long Position'].get('PnL %', pd.Series(dtype=float)).mean()
+    else:
+        metrics['Avg % on Shorts'] = 0
+        metrics['Avg % on Long'] = 0
+
+    metrics['Avg % on Winners'] = closed_df[closed_df.get('Outcome', '') == 'Win'].get('PnL %', pd.Series(dtype=float)).mean() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
+    metrics['Avg % on Losers'] = closed_df[closed_df.get('Outcome', '') == 'Loss'].get('PnL %', pd.Series(dtype=float)).mean() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
+
+    # Trade counts use ALL trades
+    metrics['Trades'] = len(df)
+    metrics['Total Winner'] = (df.get('Outcome', '') == 'Win').sum()
+    metrics['Total Open Trades'] = (df.get('Status', '') == 'Running').sum()
+    metrics['Tot. Closed Trades'] = (df.get('Status', '') == 'Closed').sum()
+    metrics['Total Losers'] = (df.get('Outcome', '') == 'Loss').sum()
+    metrics['Total BE'] = (df.get('Outcome', '') == 'Break Even').sum()
+
+    try:
+        metrics['Max Consec. Loss'] = closed_df['PnL'].lt(0).astype(int).cumsum().mul(closed_df['PnL'].lt(0)).diff().fillna(0).cummax().max() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+        metrics['Max Consec. Win'] = closed_df['PnL'].gt(0).astype(int).cumsum().mul(closed_df['PnL'].gt(0)).diff().fillna(0).cummax().max() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+    except Exception:
+        metrics['Max Consec. Loss'] = 0
+        metrics['Max Consec. Win'] = 0
+
+    metrics['PnL Std Dev'] = closed_df.get('PnL', pd.Series(dtype=float)).std() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+    metrics['PnL Std Dev (W)'] = closed_df[closed_df.get('Outcome', '') == 'Win'].get('PnL', pd.Series(dtype=float)).std() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+    metrics['PnL Std Dev (L)'] = closed_df[closed_df.get('Outcome', '') == 'Loss'].get('PnL', pd.Series(dtype=float)).std() if 'PnL' in closed_df.columns and not closed_df.empty else 0
+
+    pnl_std = metrics['PnL Std Dev'] if metrics['PnL Std Dev'] else 0
+    metrics['SQN'] = (metrics['Avg Return $'] / pnl_std * (metrics['Trades'] ** 0.5)) if pnl_std != 0 else 0
+
+    return metrics
+
+
+def make_trades(n, seed=42):
+    """Synthetic typed trades frame with the journal's columns"""
+    rng = np.random.default_rng(seed)
+    closed = rng.random(n) < 0.8
+    now = pd.Timestamp.now().floor('s')
+    df = pd.DataFrame({
+        'Time': now - pd.to_timedelta(rng.integers(0, 3 * 365 * 86400, n), unit='s'),
+        'Pair': rng.choice(['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'XRP/USDT'], n),
+        'Trade Size': rng.uniform(10, 1000, n).round(2),
+        'Leverage': rng.choice([1.0, 5.0, 10.0, 20.0], n),
+        'Status': np.where(closed, 'Closed', 'Running'),
+        'Outcome': np.where(closed, rng.choice(['Win', 'Loss', 'Break Even'], n), ''),
+        'PnL': np.where(closed, rng.normal(5, 50, n).round(2), np.nan),
+        'PnL %': np.where(closed, rng.normal(0.5, 5, n).round(2), np.nan),
+        'Position Type': rng.choice(['Long Position', 'Short Position'], n),
+    })
+    df = apply_schema(df)
+    # What the Matrix server feeds calculate_metrics
+    df['PnL'] = df['PnL'].fillna(0)
+    df['PnL %'] = df['PnL %'].fillna(0)
+    return df
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def same(a, b):
+    a, b = float(a), float(b)
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) and math.isnan(b)
+    return math.isclose(a, b, rel_tol=1e-7, abs_tol=1e-7)
+
+
+def main(sizes):
+    current_balance, start_balance = 10_000.0, 10_000.0
+    print(f"{'trades':>10} {'legacy (ms)':>12} {'kernel (ms)':>12} {'speedup':>8} {'accumulator (ms)':>17}")
+    for n in sizes:
+        df = make_trades(n)
+        repeat = 3 if n <= 100_000 else 1
+        legacy_time, expected = best_of(lambda: legacy_calculate_metrics(df, current_balance, start_balance), repeat)
+        kernel_time, result = best_of(lambda: compute_metrics(df, current_balance, start_balance), repeat)
+        accumulator = MetricsAccumulator(df)
+        lookup_time, _ = best_of(lambda: accumulator.matrix(current_balance, start_balance), 3)
+
+        assert set(expected) <= set(result), "metric keys missing"
+        mismatched = [key for key in expected if key not in SKIP_COMPARE and not same(expected[key], result[key])]
+        if mismatched:
+            print(f"  ⚠️ values differ for: {', '.join(mismatched)}")
+
+        print(f"{n:>10,} {legacy_time * 1000:>12.1f} {kernel_time * 1000:>12.1f} "
+              f"{legacy_time / kernel_time:>7.1f}x {lookup_time * 1000:>17.3f}")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,83 @@
+"""
+Dashboard Worker
+Background thread that prepares the dashboard's numbers and chart data
+"""
+
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class DashboardWorker(QThread):
+    """Loads, aggregates and downsamples for the dashboard off the GUI thread.
+
+    request() only records the newest refresh and returns. The thread always
+    works on the latest request; anything superseded while it was waiting or
+    computing is dropped instead of emitted, so a burst of edits costs one
+    computation and the GUI only applies the newest state.
+    """
+    results_ready = pyqtSignal(object)   # {'generation', 'repository', 'stats', 'curve'}
+    failed = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self._cond = threading.Condition()
+        self._request = None     # (generation, repository, chart points)
+        self._generation = 0
+        self._stopping = False
+
+    # ---------- called from the UI thread ----------
+    def request(self, repository, points):
+        """Queue a refresh, replacing any queued one; returns its generation"""
+        with self._cond:
+            self._generation += 1
+            self._request = (self._generation, repository, points)
+            self._cond.notify_all()
+            return self._generation
+
+    def cancel(self):
+        """Drop the queued refresh and discard the one in flight"""
+        with self._cond:
+            self._generation += 1
+            self._request = None
+
+    def is_current(self, generation):
+        """False once a newer refresh was requested (or it was cancelled)"""
+        with self._cond:
+            return generation == self._generation
+
+    def stop(self, timeout=5.0):
+        with self._cond:
+            self._stopping = True
+            self._request = None
+            self._cond.notify_all()
+        self.wait(int(timeout * 1000))
+
+    # ---------- worker thread ----------
+    def run(self):
+        while True:
+            with self._cond:
+                while self._request is None and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                generation, repository, points = self._request
+                self._request = None
+
+            try:
+                stats = repository.dashboard_metrics()
+                if not self.is_current(generation):
+                    continue  # superseded: skip the chart work
+                curve = repository.equity_curve(points=points)
+            except Exception as e:
+                print(f"Error refreshing dashboard: {e}")
+                self.failed.emit(str(e))
+                continue
+
+            if self.is_current(generation):
+                self.results_ready.emit({
+                    'generation': generation,
+                    'repository': repository,
+                    'stats': stats,
+                    'curve': curve,
+                })
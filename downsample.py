@@ -0,0 +1,74 @@
+"""
+Downsampling
+Largest-Triangle-Three-Buckets reduction of the equity curve for charts
+"""
+
+import numpy as np
+
+
+# Chart point counts outside this range are clamped
+MIN_POINTS = 3
+MAX_POINTS = 5000
+
+
+def lttb(x, y, threshold):
+    """Indices of the `threshold` points LTTB keeps (first and last always kept)
+
+    The series is split into threshold - 2 buckets; from each bucket the point
+    forming the largest triangle with the previously kept point and the mean
+    of the next bucket is kept, so peaks and drawdowns survive the reduction.
+    """
+    n = len(x)
+    if threshold is None or threshold >= n or threshold < MIN_POINTS:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    x = x - x[0]  # keep precision for large epoch values
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    # Mean of each bucket (and of the final point, the "next bucket" of the last one)
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    next_starts = np.append(edges[1:-1], n - 1)
+    next_ends = np.append(edges[2:], n)
+    counts = next_ends - next_starts
+    avg_x = (cum_x[next_ends] - cum_x[next_starts]) / counts
+    avg_y = (cum_y[next_ends] - cum_y[next_starts]) / counts
+
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    keep[-1] = n - 1
+    return keep
+
+
+def equity_curve(df, time_index, start=None, points=None):
+    """Cumulative PnL of the trades in time order, reduced to at most `points` points
+
+    Trades without a Time are left out, unless no trade has one (then the
+    frame order is used). Returns a dict with 'time' (datetime64 array or
+    None), 'trade' (1-based trade numbers), 'cumulative' and 'total'.
+    """
+    if len(time_index):
+        positions = time_index.between(start)
+        times = df['Time'].to_numpy(dtype='datetime64[ns]')[positions]
+    else:
+        positions = np.arange(len(df)) if start is None else np.array([], dtype=int)
+        times = None
+    pnl = df['PnL'].to_numpy(dtype=float, na_value=np.nan)[positions]
+    cumulative = np.cumsum(np.nan_to_num(pnl, nan=0.0))
+    trade = np.arange(1, len(positions) + 1)
+
+    if points is not None:
+        points = min(max(int(points), MIN_POINTS), MAX_POINTS)
+    keep = lttb(times.view('int64') if times is not None else trade, cumulative, points)
+    return {
+        'time': times[keep] if times is not None else None,
+        'trade': trade[keep],
+        'cumulative': cumulative[keep],
+        'total': len(positions),
+    }
@@ -3,29 +3,42 @@ import sys
 import os
 import shutil
 import datetime
-import threading
 import webbrowser
 import hashlib
-from io import StringIO
 import json
 
 # Charting imports
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+import matplotlib.dates as mdates
+from matplotlib.ticker import MaxNLocator, ScalarFormatter
 
 # PyQt5 imports
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QComboBox,
     QTextEdit, QPushButton, QFileDialog, QTabWidget, QListWidget, QMessageBox, 
-    QInputDialog, QFrame, QDialog, QGroupBox, QFormLayout, QScrollArea  # ✅ Added
+    QInputDialog, QFrame, QDialog, QGroupBox, QFormLayout, QScrollArea,  # ✅ Added
+    QDateEdit, QTableView, QHeaderView, QAbstractItemView, QTableWidget, QTableWidgetItem, QProgressBar,
+    QListView
 )
-from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QDate, QEvent, QSize
 
 # Data handling
 import pandas as pd
 
 from theme_manager import ThemeManager, FontManager, EmojiLib
+from trade_store import STORE_BACKENDS, open_trade_store
+from trade_repository import get_trade_repository
+from trade_writer import TradeSaveWriter
+from dashboard_worker import DashboardWorker
+from trade_table_model import TradeTableModel, TradeFilterProxy
+from screenshot_cache import ScreenshotCache
+from screenshot_store import ScreenshotStore, ScreenshotIngestor
+from screenshot_prefetch import ScreenshotPrefetcher, PREFETCH_RADIUS
+from screenshot_gc import ScreenshotGCWorker, scan_profiles, collect, format_bytes
+from screenshot_gallery import GalleryModel, ThumbnailLoader, ICON_SIZE
+from trade_schema import TradeSchemaError, coerce_trade, format_value
+from matrix_server import FLASK_AVAILABLE, get_matrix_server, stop_matrix_server
 
 # ✅ AI INTEGRATION IMPORTS
 try:
@@ -42,26 +55,6 @@ except ImportError:
     API_KEY_MANAGER_AVAILABLE = False
     print("⚠️ api_key_manager.py not found. API key management disabled.")
 
-# Try to import Flask-related modules
-
-
-# Try to import Flask-related modules
-try:
-    from flask import Flask, request, jsonify, render_template_string, Response
-    FLASK_AVAILABLE = True
-except Exception:
-    FLASK_AVAILABLE = False
-    
-# Settings helpers to persist editable capital across UI and Flask servers
-SETTINGS_FILE = 'settings.json'
-
-# Try to import Flask-related modules
-try:
-    from flask import Flask, request, jsonify, render_template_string, Response
-    FLASK_AVAILABLE = True
-except Exception:
-    FLASK_AVAILABLE = False
-    
 # Settings helpers to persist editable capital across UI and Flask servers
 SETTINGS_FILE = 'settings.json'
 
@@ -118,307 +111,46 @@ def set_initial_balance(value):
     s['initial_balance'] = float(value)
     save_settings(s)
 
-# -------------------- EMBEDDED MATRIX APP (from matrix.py) --------------------
-# Runs on port 5001 when requested.
-def run_matrix_server(port=5001, profile_id=None, profile_balance=None, initial_balance=None):
-    if not FLASK_AVAILABLE:
-        return False, "Flask not installed"
-
-    # guard: avoid re-creating multiple apps with same name in multiple threads
-    app = Flask(f"matrix_app_{port}")
-
-    def load_data():
-        # ALWAYS use profile-specific trades file
-        profile_trades_file = f"profiles/profile_{profile_id}/trades.xlsx" if profile_id else 'trades.xlsx'
-        
-        try:
-            if not os.path.exists(profile_trades_file):
-                # Return empty dataframe with proper columns
-                return pd.DataFrame(columns=['Time', 'Pair', 'PnL', 'Status', 'Outcome', 'Trade Size', 'PnL %'])
-            
-            df = pd.read_excel(profile_trades_file)
-            df['Time'] = pd.to_datetime(df['Time'], errors='coerce')
-            df['PnL'] = pd.to_numeric(df.get('PnL', pd.Series(dtype=float)), errors='coerce').fillna(0)
-            df['PnL %'] = pd.to_numeric(df.get('PnL %', pd.Series(dtype=float)), errors='coerce').fillna(0)
-            return df
-        except Exception as e:
-            print(f"Error loading trades: {e}")
-            # Return empty dataframe with proper columns
-            return pd.DataFrame(columns=['Time', 'Pair', 'PnL', 'Status', 'Outcome', 'Trade Size', 'PnL %'])
-
-    def calculate_metrics(df):
-        # CRITICAL: Use current balance for display, initial balance for % calculations
-        current_balance = profile_balance if profile_balance is not None else 5000.0
-        start_balance = initial_balance if initial_balance is not None else current_balance
-        
-        total_shares = 100
-        metrics = {}
-        
-        # Handle empty dataframe
-        if df.empty:
-            metrics['Acc. Return Net $'] = 0
-            metrics['Acc. Return Gross $'] = 0
-            metrics['Account Balance'] = current_balance
-            metrics['Daily Return $'] = 0
-            metrics['Return on Winners'] = 0
-            metrics['Return on Losers'] = 0
-            metrics['Return $ on Long'] = 0
-            metrics['Return $ on Short'] = 0
-            metrics['Biggest Profit $'] = 0
-            metrics['Biggest Loss $'] = 0
-            metrics['Profit/Loss Ratio'] = 0
-            metrics['Profit Factor'] = 0
-            metrics['Trade $ Expectancy'] = 0
-            metrics['Win %'] = 0
-            metrics['Loss %'] = 0
-            metrics['BE %'] = 0
-            metrics['Open %'] = 0
-            metrics['Acc. Return %'] = 0
-            metrics['Biggest % Profit'] = 0
-            metrics['Biggest % Loser'] = 0
-            metrics['Return per Share'] = 0
-            metrics['Kelly Criterion'] = 0
-            metrics['Avg Return'] = 0
-            metrics['Avg Return $'] = 0
-            metrics['Return/Size'] = 0
-            metrics['Avg $ on Winners'] = 0
-            metrics['Avg $ on Losers'] = 0
-            metrics['Avg Daily P&L'] = 0
-            metrics['Avg Return %'] = 0
-            metrics['Avg % Return'] = 0
-            metrics['Avg % on Shorts'] = 0
-            metrics['Avg % on Long'] = 0
-            metrics['Avg % on Winners'] = 0
-            metrics['Avg % on Losers'] = 0
-            metrics['Trades'] = len(df)
-            metrics['Total Winner'] = 0
-            metrics['Total Open Trades'] = 0
-            metrics['Tot. Closed Trades'] = 0
-            metrics['Total Losers'] = 0
-            metrics['Total BE'] = 0
-            metrics['Max Consec. Loss'] = 0
-            metrics['Max Consec. Win'] = 0
-            metrics['PnL Std Dev'] = 0
-            metrics['PnL Std Dev (W)'] = 0
-            metrics['PnL Std Dev (L)'] = 0
-            metrics['SQN'] = 0
-            return metrics
-        
-        # CRITICAL: Only use CLOSED trades for PnL calculations
-        closed_df = df[df['Status'] == 'Closed'] if 'Status' in df.columns else df
-        
-        metrics['Acc. Return Net $'] = closed_df['PnL'].sum() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-        metrics['Acc. Return Gross $'] = closed_df['PnL'].abs().sum() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-        
-        # CRITICAL: Use actual current balance from profile
-        metrics['Account Balance'] = current_balance
-        
-        today = datetime.datetime.now().date()
-        daily_return = closed_df[closed_df['Time'].dt.date == today]['PnL'].sum() if 'PnL' in closed_df.columns and 'Time' in closed_df.columns and not closed_df.empty else 0
-        metrics['Daily Return $'] = round(daily_return, 2)
-        
-        metrics['Return on Winners'] = closed_df[closed_df.get('Outcome', '') == 'Win']['PnL'].sum() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-        metrics['Return on Losers'] = closed_df[closed_df.get('Outcome', '') == 'Loss']['PnL'].sum() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-
-        if 'Position Type' in closed_df.columns and not closed_df.empty:
-            metrics['Return $ on Long'] = closed_df[closed_df['Position Type'] == 'Long Position']['PnL'].sum()
-            metrics['Return $ on Short'] = closed_df[closed_df['Position Type'] == 'Short Position']['PnL'].sum()
-        else:
-            metrics['Return $ on Long'] = 0
-            metrics['Return $ on Short'] = 0
-
-        metrics['Biggest Profit $'] = closed_df[closed_df.get('PnL', 0) > 0].get('PnL', pd.Series(dtype=float)).max() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-        metrics['Biggest Loss $'] = closed_df[closed_df.get('PnL', 0) < 0].get('PnL', pd.Series(dtype=float)).min() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-
-        if metrics.get('Return on Losers', 0) != 0:
-            metrics['Profit/Loss Ratio'] = abs(metrics['Return on Winners']) / abs(metrics['Return on Losers'])
-            metrics['Profit Factor'] = metrics['Return on Winners'] / abs(metrics['Return on Losers'])
-        else:
-            metrics['Profit/Loss Ratio'] = 0
-            metrics['Profit Factor'] = 0
-
-        # CRITICAL: Use CLOSED trades only for expectancy
-        metrics['Trade $ Expectancy'] = closed_df['PnL'].mean() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-        
-        # Win/Loss % uses ALL trades (correct)
-        metrics['Win %'] = (df['Outcome'] == 'Win').mean() * 100 if 'Outcome' in df.columns else 0
-        metrics['Loss %'] = (df['Outcome'] == 'Loss').mean() * 100 if 'Outcome' in df.columns else 0
-        metrics['BE %'] = (df['Outcome'] == 'Break Even').mean() * 100 if 'Outcome' in df.columns else 0
-        metrics['Open %'] = (df['Status'] == 'Running').mean() * 100 if 'Status' in df.columns else 0
-        
-        # CRITICAL: Use INITIAL balance for % return calculation
-        metrics['Acc. Return %'] = (metrics['Acc. Return Net $'] / start_balance) * 100 if start_balance else 0
-        
-        metrics['Biggest % Profit'] = closed_df[closed_df.get('PnL %', 0) > 0].get('PnL %', pd.Series(dtype=float)).max() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
-        metrics['Biggest % Loser'] = closed_df[closed_df.get('PnL %', 0) < 0].get('PnL %', pd.Series(dtype=float)).min() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
-        metrics['Return per Share'] = metrics['Acc. Return Net $'] / total_shares if total_shares != 0 else 0
-
-        if metrics.get('Profit/Loss Ratio', 0) != 0:
-            metrics['Kelly Criterion'] = (metrics['Win %'] / 100 * (metrics['Profit/Loss Ratio'] + 1) - 1) / metrics['Profit/Loss Ratio']
-        else:
-            metrics['Kelly Criterion'] = 0
-
-        # Use closed trades for averages
-        metrics['Avg Return'] = closed_df.get('PnL %', pd.Series(dtype=float)).mean() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
-        metrics['Avg Return $'] = closed_df.get('PnL', pd.Series(dtype=float)).mean() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-        metrics['Return/Size'] = metrics['Acc. Return Net $'] / closed_df['Trade Size'].sum() if 'Trade Size' in closed_df.columns and not closed_df.empty and closed_df['Trade Size'].sum() != 0 else 0
-        metrics['Avg $ on Winners'] = closed_df[closed_df.get('Outcome', '') == 'Win'].get('PnL', pd.Series(dtype=float)).mean() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-        metrics['Avg $ on Losers'] = closed_df[closed_df.get('Outcome', '') == 'Loss'].get('PnL', pd.Series(dtype=float)).mean() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-        metrics['Avg Daily P&L'] = daily_return
-        metrics['Avg Return %'] = closed_df.get('PnL %', pd.Series(dtype=float)).mean() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
-        metrics['Avg % Return'] = closed_df.get('PnL %', pd.Series(dtype=float)).mean() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
-
-        if 'Position Type' in closed_df.columns and not closed_df.empty:
-            metrics['Avg % on Shorts'] = closed_df[closed_df['Position Type'] == 'Short Position'].get('PnL %', pd.Series(dtype=float)).mean()
-            metrics['Avg % on Long'] = closed_df[closed_df['Position Type'] == 'Long Position'].get('PnL %', pd.Series(dtype=float)).mean()
-        else:
-            metrics['Avg % on Shorts'] = 0
-            metrics['Avg % on Long'] = 0
-
-        metrics['Avg % on Winners'] = closed_df[closed_df.get('Outcome', '') == 'Win'].get('PnL %', pd.Series(dtype=float)).mean() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
-        metrics['Avg % on Losers'] = closed_df[closed_df.get('Outcome', '') == 'Loss'].get('PnL %', pd.Series(dtype=float)).mean() if 'PnL %' in closed_df.columns and not closed_df.empty else 0
-        
-        # Trade counts use ALL trades
-        metrics['Trades'] = len(df)
-        metrics['Total Winner'] = (df.get('Outcome', '') == 'Win').sum()
-        metrics['Total Open Trades'] = (df.get('Status', '') == 'Running').sum()
-        metrics['Tot. Closed Trades'] = (df.get('Status', '') == 'Closed').sum()
-        metrics['Total Losers'] = (df.get('Outcome', '') == 'Loss').sum()
-        metrics['Total BE'] = (df.get('Outcome', '') == 'Break Even').sum()
-        
-        try:
-            metrics['Max Consec. Loss'] = closed_df['PnL'].lt(0).astype(int).cumsum().mul(closed_df['PnL'].lt(0)).diff().fillna(0).cummax().max() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-            metrics['Max Consec. Win'] = closed_df['PnL'].gt(0).astype(int).cumsum().mul(closed_df['PnL'].gt(0)).diff().fillna(0).cummax().max() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-        except Exception:
-            metrics['Max Consec. Loss'] = 0
-            metrics['Max Consec. Win'] = 0
-            
-        metrics['PnL Std Dev'] = closed_df.get('PnL', pd.Series(dtype=float)).std() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-        metrics['PnL Std Dev (W)'] = closed_df[closed_df.get('Outcome', '') == 'Win'].get('PnL', pd.Series(dtype=float)).std() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-        metrics['PnL Std Dev (L)'] = closed_df[closed_df.get('Outcome', '') == 'Loss'].get('PnL', pd.Series(dtype=float)).std() if 'PnL' in closed_df.columns and not closed_df.empty else 0
-
-        pnl_std = metrics['PnL Std Dev'] if metrics['PnL Std Dev'] else 0
-        metrics['SQN'] = (metrics['Avg Return $'] / pnl_std * (metrics['Trades'] ** 0.5)) if pnl_std != 0 else 0
-
-        return metrics
-
-    @app.route('/', methods=['GET', 'POST'])
-    def index():
-        try:
-            df = load_data()
-        except Exception as e:
-            return f"<h2>Could not load trades:</h2><pre>{e}</pre>"
-
-        filter_option = request.form.get('filter') if request.method == 'POST' else 'all'
-        from datetime import datetime, timedelta
-        if filter_option == 'last_7_days':
-            start_date = datetime.now() - timedelta(days=7)
-            df = df[df['Time'] >= start_date]
-        elif filter_option == 'last_30_days':
-            start_date = datetime.now() - timedelta(days=30)
-            df = df[df['Time'] >= start_date]
-
-        metrics = calculate_metrics(df)
-        
-        # Simple HTML rendering
-        html_template = '''
-        <!doctype html>
-        <html lang="en">
-          <head>
-            <meta charset="utf-8">
-            <title>📈 Trade Metrics</title>
-            <style>
-            @import url('https://fonts.googleapis.com/css2?family=Open+Sans:wght@400;600&display=swap');
-            body { background-color: #121212; color: #ffffff; font-family: 'Open Sans', sans-serif; margin: 0; padding: 0; }
-            .header { display: flex; justify-content: space-around; align-items: center; padding: 20px; background-color: #1f1f1f; }
-            .container { display: flex; flex-wrap: wrap; justify-content: center; gap: 20px; padding: 20px; }
-            .card { background-color: #1f1f1f; border: 1px solid #333; border-radius: 8px; padding: 20px; width: 220px; text-align: center; }
-            </style>
-            <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-          </head>
-          <body>
-            <div class="header">
-              <div><h1>💸 Account Balance</h1><p>${{ "%.2f"|format(metrics['Account Balance']) }}</p></div>
-              <div><h1>📊 Total Trades</h1><p>{{ metrics['Trades'] }}</p></div>
-              <div><h1>🏆 Win Rate</h1><p>{{ "%.2f"|format(metrics['Win %']) }}%</p></div>
-            </div>
-            <div style="display:flex; justify-content:center; margin-top:10px;">
-              <form method="post" style="display:flex; gap:10px;">
-                <select name="filter">
-                  <option value="all">All Time</option>
-                  <option value="last_7_days">Last 7 Days</option>
-                  <option value="last_30_days">Last 30 Days</option>
-                </select>
-                <button type="submit">Apply</button>
-              </form>
-            </div>
-            <div class="container">
-              {% for key, value in metrics.items() %}
-                <div class="card">
-                  <h3>{{ key }}</h3>
-                  <p>{{ "%.2f"|format(value) if value is number else value }}</p>
-                </div>
-              {% endfor %}
-            </div>
-            <div style="width:90%; margin: auto; max-width:1200px;">
-              <canvas id="pnlChart"></canvas>
-            </div>
-            <script>
-              var ctx = document.getElementById('pnlChart').getContext('2d');
-              var pnlData = {{ df['PnL'].fillna(0).tolist() | tojson | safe if not df.empty else '[]' }};
-              var pnlChart = new Chart(ctx, {
-                type: 'line',
-                data: {
-                  labels: Array.from({length: pnlData.length}, (_, i) => i + 1),
-                  datasets: [{
-                    label: 'PnL Over Time 📈',
-                    data: pnlData,
-                    borderColor: 'rgba(54, 162, 235, 1)',
-                    borderWidth: 1,
-                    fill: false,
-                  }]
-                }
-              });
-            </script>
-          </body>
-        </html>
-        '''
-        return render_template_string(html_template, metrics=metrics, df=df)
-
-    @app.route('/save_report', methods=['POST'])
-    def save_report():
-        try:
-            df = load_data()
-        except Exception as e:
-            return f"Error loading data: {e}"
-        
-        filter_option = request.form.get('filter')
-        from datetime import datetime, timedelta
-        if filter_option == 'last_7_days':
-            start_date = datetime.now() - timedelta(days=7)
-            df = df[df['Time'] >= start_date]
-        elif filter_option == 'last_30_days':
-            start_date = datetime.now() - timedelta(days=30)
-            df = df[df['Time'] >= start_date]
-        
-        metrics = calculate_metrics(df)
-        report = StringIO()
-        report.write("📊 Trade Metrics Report 📊\n")
-        report.write("="*50 + "\n")
-        for key, value in metrics.items():
-            report.write(f"{key}: {value}\n")
-        report.seek(0)
-        return Response(report.getvalue(), mimetype='text/plain', headers={'Content-Disposition': 'attachment; filename=report.txt'})
-
-    def _serve():
-        try:
-            app.run(port=port, debug=False, use_reloader=False)
-        except Exception as e:
-            print("Matrix server error:", e)
-
-    thread = threading.Thread(target=_serve, daemon=True)
-    thread.start()
-    return True, f"http://127.0.0.1:{port}/"
+def get_storage_backend():
+    return load_settings().get('storage_backend', 'sqlite')
+
+def open_profile_store(profile_id):
+    """Open the trade store for a profile using the configured backend"""
+    profile_path = f"profiles/profile_{profile_id}" if profile_id else '.'
+    return open_trade_store(profile_path, get_storage_backend())
+
+def find_store_files(profile_path):
+    """(backend, file names) of the trade store in a profile folder, preferring the configured backend"""
+    preferred = get_storage_backend()
+    for backend in [preferred] + [b for b in STORE_BACKENDS if b != preferred]:
+        names = STORE_BACKENDS[backend].store_files if backend in STORE_BACKENDS else []
+        if names and os.path.exists(os.path.join(profile_path, names[0])):
+            return backend, [n for n in names if os.path.exists(os.path.join(profile_path, n))]
+    return None, []
+
+def open_profile_repository(profile_id):
+    """Shared cached trades for a profile (journal UI and Matrix server)"""
+    profile_path = f"profiles/profile_{profile_id}" if profile_id else '.'
+    return get_trade_repository(profile_path, get_storage_backend())
+
+# -------------------- MATRIX SERVER (matrix_server.py) --------------------
+# One shared server per process; each profile is served at /profile/<id>/.
+# Balances published by EnhancedProfileManager whenever profiles.json is loaded or saved,
+# so the server thread never reads (or creates) the file while the UI writes it
+_profile_balances = {}
+
+def get_profile_balance(profile_id):
+    """Last saved balance of a profile (None if unknown)"""
+    return _profile_balances.get(profile_id)
+
+def _publish_profile_balances(profiles):
+    global _profile_balances
+    # Swap in a new dict so readers always see a complete snapshot
+    _profile_balances = {p['id']: float(p['balance']) for p in profiles}
+
+def open_matrix_server():
+    """The process-wide Matrix server for this app's profiles"""
+    return get_matrix_server(open_profile_repository, get_profile_balance)
 # ==================== ENHANCED PROFILE MANAGER ====================
 
 class EnhancedProfileManager:
@@ -457,11 +189,13 @@ class EnhancedProfileManager:
         else:
             with open(self.file_path, "r") as file:
                 self.profiles = json.load(file)
+            _publish_profile_balances(self.profiles)
     
     def _save_profiles(self):
         """Save profiles to JSON file"""
         with open(self.file_path, "w") as file:
             json.dump(self.profiles, file, indent=4)
+        _publish_profile_balances(self.profiles)
     
     def create_profile(self, username, password, balance, avatar_path="", color="#2196F3"):
         """Create a new profile"""
@@ -632,9 +366,17 @@ class EnhancedProfileManager:
         if not profile:
             return False, "Profile not found"
         
+        profile_path = f"profiles/profile_{profile_id}"
+        backend, names = find_store_files(profile_path)
+        if backend is None:
+            # No trades saved yet: the configured backend creates its files on first use
+            backend = get_storage_backend()
+            names = STORE_BACKENDS.get(backend, STORE_BACKENDS['sqlite']).store_files[:1]
         export_data = {
             "profile": profile,
-            "trades_file": f"profiles/profile_{profile_id}/trades.xlsx",
+            "storage_backend": backend,
+            "trades_file": f"{profile_path}/{names[0]}",
+            "trades_files": [f"{profile_path}/{name}" for name in names],
             "export_date": datetime.datetime.now().isoformat()
         }
         
@@ -1052,10 +794,16 @@ class EnhancedProfileDialog(QDialog):
             
             # 2. Copy entire profile folder (screenshots, trades, exports)
             source_profile_path = f"profiles/profile_{profile['id']}"
+            # Edits still queued on the save writer must be in the copied store
+            if not open_profile_repository(profile['id']).flush():
+                raise RuntimeError("Pending trade edits could not be saved")
             if os.path.exists(source_profile_path):
                 dest_profile_path = os.path.join(full_export_path, "profile_data")
                 shutil.copytree(source_profile_path, dest_profile_path, dirs_exist_ok=True)
-            
+
+                # Excel copy of the trade store so the backup stays readable/importable
+                open_profile_store(profile['id']).export_xlsx(os.path.join(dest_profile_path, "trades.xlsx"))
+
             # Count files for report
             screenshot_count = 0
             if os.path.exists(source_profile_path):
@@ -1077,7 +825,8 @@ CONTENTS:
 ---------
 > {profile['username']}_profile.json  - Profile data and settings
 > profile_data/                       - Complete profile folder
-  * trades.xlsx                       - Trading history
+  * trades.db                         - Trading history (journal database)
+  * trades.xlsx                       - Trading history (Excel copy)
   * screenshots/                      - Chart screenshots
   * exports/                          - Previous exports
 
@@ -1239,13 +988,14 @@ NOTES:
             ]
             
             for location in possible_locations:
-                if os.path.exists(os.path.join(location, "trades.xlsx")):
+                if (os.path.exists(os.path.join(location, "trades.db")) or
+                        os.path.exists(os.path.join(location, "trades.xlsx"))):
                     profile_source_folder = location
                     break
             
             if not profile_source_folder:
                 raise ValueError(
-                    "Could not find trades.xlsx file.\n\n"
+                    "Could not find trades.db or trades.xlsx file.\n\n"
                     f"Expected in:\n• {import_folder}/profile_2/\n"
                     f"• {import_folder}/profile_data/\n"
                     f"• {import_folder}/"
@@ -1253,11 +1003,13 @@ NOTES:
             
             files_imported = []
             
-            # Copy trades.xlsx
-            trades_source = os.path.join(profile_source_folder, "trades.xlsx")
-            if os.path.exists(trades_source):
-                shutil.copy(trades_source, os.path.join(new_profile_path, "trades.xlsx"))
-                files_imported.append("✓ trades.xlsx")
+            # Copy the trade store of the configured backend when the backup has it;
+            # either backend migrates the other one's files on first load
+            _, copied = find_store_files(profile_source_folder)
+            if copied:
+                for name in copied:
+                    shutil.copy(os.path.join(profile_source_folder, name), os.path.join(new_profile_path, name))
+                    files_imported.append(f"✓ {name}")
             else:
                 files_imported.append("⚠ trades.xlsx (not found)")
             
@@ -1551,6 +1303,142 @@ NOTES:
             self.refresh_profile_list()
             self.load_profile_details()
 
+class ScreenshotCleanupDialog(QDialog):
+    """Screenshot storage per profile, and cleanup of the screenshots no trade uses"""
+    HEADERS = ['Profile', 'Files', 'On Disk', 'Referenced', 'Orphans', 'Orphaned', 'Thumbnails']
+
+    def __init__(self, profiles, keep=(), parent=None):
+        super().__init__(parent)
+        self.profiles = profiles
+        self.keep = keep
+        self.reports = []
+        self.worker = None
+        self.setWindowTitle("🧹 Screenshot Cleanup")
+        self.setMinimumWidth(760)
+
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.table)
+        self.summary_label = QLabel('')
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+        self.progress_bar = QProgressBar()
+        layout.addWidget(self.progress_bar)
+
+        button_layout = QHBoxLayout()
+        self.scan_btn = QPushButton("🔍 Rescan")
+        self.scan_btn.clicked.connect(self.scan)
+        self.archive_btn = QPushButton("📦 Archive Orphans")
+        self.archive_btn.clicked.connect(lambda: self.collect_orphans('archive'))
+        self.delete_btn = QPushButton("🗑️ Delete Orphans")
+        self.delete_btn.clicked.connect(lambda: self.collect_orphans('delete'))
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        for btn in (self.scan_btn, self.archive_btn, self.delete_btn, close_btn):
+            button_layout.addWidget(btn)
+        layout.addLayout(button_layout)
+
+        self.scan()
+
+    def run_worker(self, task, *args, on_done=None, **kwargs):
+        for btn in (self.scan_btn, self.archive_btn, self.delete_btn):
+            btn.setEnabled(False)
+        self.progress_bar.setValue(0)
+        worker = ScreenshotGCWorker(task, *args, **kwargs)
+        worker.progress.connect(self.on_progress)
+        worker.finished_with.connect(on_done)
+        worker.failed.connect(self.on_failed)
+        worker.start()
+        self.worker = worker
+
+    def on_progress(self, done, total):
+        self.progress_bar.setMaximum(max(total, 1))
+        self.progress_bar.setValue(done)
+
+    def scan(self):
+        self.summary_label.setText("Loading trades and scanning screenshots...")
+        self.run_worker(scan_profiles, self.profiles, keep=self.keep,
+                        open_repository=open_profile_repository, on_done=self.on_scanned)
+
+    def on_scanned(self, reports):
+        self.reports = reports
+        self.table.setRowCount(len(reports))
+        for row, report in enumerate(reports):
+            values = [
+                report['name'], report['files'], format_bytes(report['bytes']),
+                format_bytes(report['referenced_bytes']), len(report['orphans']),
+                format_bytes(report['orphan_bytes']), format_bytes(report['thumb_bytes']),
+            ]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(str(value)))
+
+        orphans = sum(len(r['orphans']) for r in reports)
+        thumbs = sum(len(r['orphan_thumbs']) for r in reports)
+        reclaim = sum(r['orphan_bytes'] + r['orphan_thumb_bytes'] for r in reports)
+        recent = sum(r['recent_files'] for r in reports)
+        summary = (f"{orphans} orphaned screenshots and {thumbs} stale thumbnails "
+                   f"({format_bytes(reclaim)} reclaimable).")
+        if recent:
+            summary += f" {recent} unreferenced uploads from the last hour are kept."
+        self.summary_label.setText(summary)
+        self.scan_btn.setEnabled(True)
+        self.archive_btn.setEnabled(orphans > 0)
+        self.delete_btn.setEnabled(orphans + thumbs > 0)
+
+    def collect_orphans(self, mode):
+        orphans = sum(len(r['orphans']) for r in self.reports)
+        if mode == 'archive':
+            question = f"Move {orphans} orphaned screenshots into a zip in each profile's exports folder?"
+        else:
+            question = f"Permanently delete {orphans} orphaned screenshots?"
+        if QMessageBox.question(self, "Confirm Cleanup", question, QMessageBox.Yes | QMessageBox.No) != QMessageBox.Yes:
+            return
+        self.summary_label.setText("Cleaning up screenshots...")
+        self.run_worker(collect, self.reports, mode, keep=self.keep, on_done=self.on_collected)
+
+    def on_collected(self, result):
+        message = f"Removed {result['files']} files ({format_bytes(result['bytes'])})."
+        if result['archives']:
+            message += "\n\nArchived to:\n" + "\n".join(result['archives'])
+        if result['errors']:
+            message += f"\n\n{result['errors']} files could not be removed."
+        QMessageBox.information(self, "Cleanup Complete", message)
+        self.scan()
+
+    def on_failed(self, error):
+        self.summary_label.setText("")
+        self.scan_btn.setEnabled(True)
+        QMessageBox.warning(self, "Cleanup Error", f"Screenshot cleanup failed:\n{error}")
+
+    def done(self, result):
+        # Let a running scan / cleanup finish its batch before the dialog goes away
+        if self.worker is not None:
+            self.worker.wait()
+        super().done(result)
+
+
+class ScreenshotZoomDialog(QDialog):
+    """Scrollable full-resolution screenshot"""
+
+    def __init__(self, pixmap, title, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"🔍 {title}")
+        image_label = QLabel()
+        image_label.setPixmap(pixmap)
+        scroll_area = QScrollArea()
+        scroll_area.setWidget(image_label)
+        scroll_area.setAlignment(Qt.AlignCenter)
+        layout = QVBoxLayout(self)
+        layout.addWidget(scroll_area)
+        screen = QApplication.primaryScreen().availableGeometry()
+        self.resize(min(pixmap.width() + 40, int(screen.width() * 0.9)),
+                    min(pixmap.height() + 40, int(screen.height() * 0.9)))
+
+
 # -------------------- ORIGINAL GUI APP (your full functionality preserved) --------------------
 # I reused your previously-fixed long version (with the mapping from self.* attributes to self.journal_tab.*),
 # keeping all functionality (Excel saving, screenshots, filters, etc.) intact.
@@ -1908,19 +1796,117 @@ class TradeJournalApp(QWidget):
         self.profile_id = self.active_profile['id']
         self.profile_path = f"profiles/profile_{self.profile_id}"
         self.screenshot_folder = f"{self.profile_path}/screenshots"
-        self.trades_file = f"{self.profile_path}/trades.xlsx"
         
         os.makedirs(self.screenshot_folder, exist_ok=True)
+        self.screenshot_cache = ScreenshotCache(self.screenshot_folder)
+        self.screenshot_store = ScreenshotStore(self.screenshot_folder, self.screenshot_cache)
+        self.pending_screenshots = {}   # screenshot number -> (ingest, future)
+        self.screenshot_requests = 0
+        self.repository = open_profile_repository(self.profile_id)
+        self.trade_store = self.repository.store
         
         # ==================== STEP 5: Initialize UI ====================
         self.load_data()
         self.initUI()  # Now theme_manager exists!
+        self.start_save_writer()
+        self.start_dashboard_worker()
+        self.start_screenshot_ingestor()
+        self.start_screenshot_prefetcher()
         self.current_trade_index = None
-        self.screenshot_counter = self.get_screenshot_counter()
         self._matrix_server_url = None
 
-    def get_screenshot_counter(self):
-        return len([f for f in os.listdir(self.screenshot_folder) if f.endswith('.png')])
+    def start_save_writer(self):
+        """Persist trade edits of the current profile on a background thread"""
+        writer = TradeSaveWriter(self.trade_store)
+        writer.state_changed.connect(self.on_save_state_changed)
+        writer.save_finished.connect(self.on_save_finished)
+        writer.save_failed.connect(self.on_save_failed)
+        self.repository.attach_writer(writer)
+        writer.start()
+        self.save_writer = writer
+    
+    def start_dashboard_worker(self):
+        """Dashboard numbers and chart data are prepared on a background thread"""
+        worker = DashboardWorker()
+        worker.results_ready.connect(self.on_dashboard_results)
+        worker.start()
+        self.dashboard_worker = worker
+
+    def stop_dashboard_worker(self):
+        worker = getattr(self, 'dashboard_worker', None)
+        if worker is None:
+            return
+        worker.stop()
+        self.dashboard_worker = None
+
+    def start_screenshot_ingestor(self):
+        """Screenshots are hashed, stored and thumbnailed on a worker pool"""
+        ingestor = ScreenshotIngestor()
+        ingestor.ingested.connect(self.on_screenshot_ingested)
+        ingestor.failed.connect(self.on_screenshot_failed)
+        self.screenshot_ingestor = ingestor
+
+    def stop_screenshot_ingestor(self):
+        ingestor = getattr(self, 'screenshot_ingestor', None)
+        if ingestor is None:
+            return
+        ingestor.shutdown()
+        self.screenshot_ingestor = None
+
+    def start_screenshot_prefetcher(self):
+        """Screenshots next to the selected trade are decoded on a background thread"""
+        prefetcher = ScreenshotPrefetcher()
+        prefetcher.image_ready.connect(self.on_screenshot_prefetched)
+        prefetcher.start()
+        self.screenshot_prefetcher = prefetcher
+
+    def stop_screenshot_prefetcher(self):
+        prefetcher = getattr(self, 'screenshot_prefetcher', None)
+        if prefetcher is None:
+            return
+        prefetcher.stop()
+        self.screenshot_prefetcher = None
+
+    def stop_save_writer(self):
+        """Flush pending edits and stop the writer (profile switch / exit)"""
+        writer = getattr(self, 'save_writer', None)
+        if writer is None:
+            return
+        self.repository.detach_writer()
+        if writer.has_pending():
+            QMessageBox.warning(self, "Save Error",
+                                "⚠️ Some trade changes could not be saved.\nCheck the console for details.")
+        self.save_writer = None
+    
+    def on_save_state_changed(self, state):
+        if state == 'dirty':
+            self.save_status_label.setText("✏️ Unsaved changes")
+            self.save_status_label.setToolTip("Changes will be saved in a moment")
+        elif state == 'saving':
+            self.save_status_label.setText("⏳ Saving...")
+        elif state == 'error':
+            self.save_status_label.setText("❌ Save failed - retrying")
+    
+    def on_save_finished(self, ops, latency_ms):
+        if self.save_writer is not None and self.save_writer.has_pending():
+            return
+        self.save_status_label.setText(f"💾 Saved ({latency_ms:.0f} ms)")
+        self.save_status_label.setToolTip(f"Last save wrote {ops} change(s) in {latency_ms:.1f} ms")
+    
+    def on_save_failed(self, message):
+        self.save_status_label.setToolTip(f"Last save failed: {message}")
+    
+    def closeEvent(self, event):
+        """Make sure queued trade edits reach the disk (and the Matrix server stops) before exiting"""
+        self.stop_dashboard_worker()
+        self.stop_screenshot_prefetcher()
+        self.stop_screenshot_ingestor()
+        self.gallery_loader.stop()
+        self.stop_save_writer()
+        self.repository.close()
+        self.trade_store.close()
+        stop_matrix_server()
+        super().closeEvent(event)
     
     def initUI(self):
             self.setWindowTitle(f'Trade Journal - 👤 {self.active_profile["username"]}')
@@ -1952,6 +1938,12 @@ class TradeJournalApp(QWidget):
             """)
             toolbar_layout.addWidget(self.profile_indicator)
             
+            # Save status (written by the background save writer)
+            self.save_status_label = QLabel("💾 Saved")
+            self.save_status_label.setToolTip("All changes are saved")
+            self.save_status_label.setStyleSheet("padding: 8px 10px; font-size: 12px; color: gray;")
+            toolbar_layout.addWidget(self.save_status_label)
+            
             toolbar_layout.addStretch()
             
             # Quick switch button (emoji only)
@@ -2040,6 +2032,12 @@ class TradeJournalApp(QWidget):
             self.init_journal_tab()
             self.init_trades_tab()
             
+            # Screenshot gallery (built when first shown)
+            self.gallery_tab = QWidget()
+            self.tabs.addTab(self.gallery_tab, '🖼️ Gallery')
+            self.init_gallery_tab()
+            self.tabs.currentChanged.connect(self.on_tab_changed)
+            
             main_layout.addWidget(self.tabs)
             self.setLayout(main_layout)
 
@@ -2082,7 +2080,15 @@ class TradeJournalApp(QWidget):
             self.profile_id = self.active_profile['id']
             self.profile_path = f"profiles/profile_{self.profile_id}"
             self.screenshot_folder = f"{self.profile_path}/screenshots"
-            self.trades_file = f"{self.profile_path}/trades.xlsx"
+            self.screenshot_cache = ScreenshotCache(self.screenshot_folder)
+            self.screenshot_store = ScreenshotStore(self.screenshot_folder, self.screenshot_cache)
+            self.pending_screenshots.clear()
+            if getattr(self, 'screenshot_prefetcher', None) is not None:
+                self.screenshot_prefetcher.cancel()
+            self.stop_save_writer()
+            self.repository = open_profile_repository(self.profile_id)
+            self.trade_store = self.repository.store
+            self.start_save_writer()
             
             # CRITICAL: Sync account balance from profile manager
             self.active_profile = self.profile_manager.get_active_profile()
@@ -2107,6 +2113,10 @@ class TradeJournalApp(QWidget):
             self.load_data()
             self.populate_trades()
             self.refresh_dashboard()
+            self.gallery_model.set_cache(self.screenshot_cache)
+            self.gallery_key = None
+            if self.tabs.currentWidget() is self.gallery_tab:
+                self.refresh_gallery()
             
             # Update balance label
             if hasattr(self, 'account_balance_label'):
@@ -2153,49 +2163,41 @@ class TradeJournalApp(QWidget):
     
 
     def refresh_dashboard(self):
-        """Refresh the dashboard metrics and chart without rebuilding the layout."""
+        """Refresh the dashboard metrics and chart without rebuilding the layout.
+
+        Metrics and chart data are computed by the dashboard worker; only the
+        label and curve updates in on_dashboard_results run on the GUI thread.
+        """
         if not hasattr(self, 'win_rate_label'):
             return  # dashboard not yet built
+        worker = getattr(self, 'dashboard_worker', None)
+        if worker is None:
+            self.apply_dashboard_stats(self.repository.dashboard_metrics())
+            self.update_dashboard_chart()
+            return
+        # Supersedes any refresh still queued or in flight
+        worker.request(self.repository, max(self.pnl_canvas.width(), 200))
 
-        # --- Load latest data from profile-specific file ---
-        if os.path.exists(self.trades_file):
-            try:
-                df = pd.read_excel(self.trades_file)
-            except Exception:
-                df = pd.DataFrame()
-        else:
-            df = pd.DataFrame()
-
-        # --- Compute metrics safely ---
-        if not df.empty and 'Outcome' in df.columns:
-            total_trades = len(df)
-            wins = (df['Outcome'] == 'Win').sum()
-            losses = (df['Outcome'] == 'Loss').sum()
-            win_rate = (wins / total_trades) * 100 if total_trades > 0 else 0
-
-            pnl_values = pd.to_numeric(df.get('PnL %', pd.Series(dtype=float)), errors='coerce')
-            avg_pnl = pnl_values.mean() if not pnl_values.empty else 0
-
-            if 'PnL' in df.columns and len(df) > 0:
-                df['PnL'] = pd.to_numeric(df['PnL'], errors='coerce').fillna(0)
-                win_trades = df[df['PnL'] > 0].shape[0]
-                loss_trades = df[df['PnL'] < 0].shape[0]
-                total_trades = len(df)
-                win_rate = (win_trades / total_trades * 100) if total_trades > 0 else 0
-                profit_factor = win_trades / loss_trades if loss_trades != 0 else 0
-                biggest_win = df['PnL'].max()
-                biggest_loss = df['PnL'].min()
-                # CRITICAL: Use profile balance
-                account_balance = self.account_balance
-            else:
-                win_rate = 0
-                profit_factor = 0
-                biggest_win = 0
-                biggest_loss = 0
-                # CRITICAL: Use profile balance
-                account_balance = self.account_balance
-        else:
-            total_trades = wins = losses = win_rate = avg_pnl = profit_factor = biggest_win = biggest_loss = 0
+    def on_dashboard_results(self, result):
+        """Dashboard worker finished; drop it if a newer refresh (or profile) came along"""
+        worker = getattr(self, 'dashboard_worker', None)
+        if worker is None or not worker.is_current(result['generation']):
+            return
+        if result['repository'] is not self.repository:
+            return
+        self.apply_dashboard_stats(result['stats'])
+        self.update_dashboard_chart(result['curve'])
+
+    def apply_dashboard_stats(self, stats):
+        """Labels and cards from the accumulator's dashboard numbers"""
+        total_trades = stats['total_trades']
+        wins = stats['wins']
+        losses = stats['losses']
+        win_rate = stats['win_rate']
+        avg_pnl = stats['avg_pnl']
+        profit_factor = stats['profit_factor']
+        biggest_win = stats['biggest_win']
+        biggest_loss = stats['biggest_loss']
         
         # CRITICAL: Always use profile's current balance from profile manager
         self.account_balance = self.active_profile['balance']
@@ -2225,17 +2227,26 @@ class TradeJournalApp(QWidget):
         self.avg_pnl_card.setText(f"{avg_pnl:.2f}%")
         self.profit_factor_card.setText(f"{profit_factor:.2f}")
         self.biggest_card.setText(f"{biggest_win:.2f} / {biggest_loss:.2f}")
+        self.update_streak_card(stats['streaks'])
 
         # Update profile indicator
         if hasattr(self, 'profile_indicator'):
             self.profile_indicator.setText(f"🔵 {self.active_profile['username']} | 💰 ${account_balance:.2f}")
 
-        # --- Refresh chart & recent trades ---
-        self.update_dashboard_chart(df)
    
     from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
     from matplotlib.figure import Figure
         
+    def update_streak_card(self, streaks):
+        """Current streak on the card; longest / average / distribution in the tooltip"""
+        longest = streaks['longest']
+        self.streak_card.setText(f"{streaks['current']} | Best {longest['Win']}W / {longest['Loss']}L")
+        lines = []
+        for kind in ('Win', 'Loss', 'Break Even'):
+            histogram = ', '.join(f"{length}×{count}" for length, count in streaks['histogram'][kind].items()) or '-'
+            lines.append(f"{kind}: longest {longest[kind]}, avg {streaks['average'][kind]:.2f} ({histogram})")
+        self.streak_card.setToolTip('\n'.join(lines))
+
     def init_dashboard_tab(self):
         layout = QVBoxLayout()
 
@@ -2260,72 +2271,18 @@ class TradeJournalApp(QWidget):
 
         layout.addLayout(btn_layout)
 
-        # --- LOAD DATA ---
-        # --- LOAD DATA ---
-        # --- LOAD DATA ---
-        df = None
-        if os.path.exists(self.trades_file):
-            try:
-                df = pd.read_excel(self.trades_file)
-            except Exception:
-                df = pd.DataFrame()
-        else:
-            df = pd.DataFrame()
-
-        # --- CALCULATE INITIAL METRICS ---
-        # Normalize column names immediately for safety (only if df is not empty)
-        if not df.empty and len(df.columns) > 0:
-            df.columns = df.columns.str.strip()
-            df.columns = df.columns.str.replace(r'\s+', ' ', regex=True)
-        # Ensure PnL % is numeric for avg_pnl calculation
-        pnl_pct_series = pd.to_numeric(df.get('PnL %', pd.Series(dtype=float)), errors='coerce')
-
-        if not df.empty:
-            # Make sure Outcome / Status columns exist as strings
-            if 'Outcome' in df.columns:
-                total_trades = len(df)
-                wins = (df['Outcome'] == 'Win').sum()
-                losses = (df['Outcome'] == 'Loss').sum()
-                win_rate = (wins / total_trades) * 100 if total_trades > 0 else 0
-            else:
-                total_trades = 0
-                wins = 0
-                losses = 0
-                win_rate = 0
-
-            avg_pnl = pnl_pct_series.mean() if not pnl_pct_series.empty and not pnl_pct_series.isnull().all() else 0
-
-            # Ensure numeric PnL (closed trades contribute numbers, running trades -> 0)
-            # Ensure numeric PnL (closed trades contribute numbers, running trades -> 0)
-            if 'PnL' in df.columns:
-                df['PnL'] = pd.to_numeric(df['PnL'], errors='coerce').fillna(0)
-                win_sum = df[df['PnL'] > 0]['PnL'].sum()
-                loss_sum = abs(df[df['PnL'] < 0]['PnL'].sum())
-                profit_factor = win_sum / loss_sum if loss_sum != 0 else 0
-                biggest_win = df['PnL'].max() if not df['PnL'].empty else 0
-                biggest_loss = df['PnL'].min() if not df['PnL'].empty else 0
-                # Use profile's current balance instead of calculating from scratch
-                account_balance = self.account_balance
-            else:
-                # If no PnL column, still compute useful defaults
-                profit_factor = 0
-                biggest_win = 0
-                biggest_loss = 0
-                # CRITICAL: Use profile balance, not global settings
-                account_balance = self.account_balance
-        else:
-            # DEFAULT VALUES WHEN NO TRADES AVAILABLE
-            total_trades = 0
-            wins = 0
-            losses = 0
-            win_rate = 0
-            avg_pnl = 0
-            profit_factor = 0
-            biggest_win = 0
-            biggest_loss = 0
-                
-            # Always use the profile's current account balance
-            account_balance = self.account_balance
+        # --- INITIAL METRICS (running accumulator, no pass over the trades) ---
+        stats = self.repository.dashboard_metrics()
+        total_trades = stats['total_trades']
+        wins = stats['wins']
+        losses = stats['losses']
+        win_rate = stats['win_rate']
+        avg_pnl = stats['avg_pnl']
+        profit_factor = stats['profit_factor']
+        biggest_win = stats['biggest_win']
+        biggest_loss = stats['biggest_loss']
+        # Always use the profile's current account balance
+        account_balance = self.account_balance
 
         # --- TOP METRICS (Horizontal Row) ---
         stats_layout = QHBoxLayout()
@@ -2378,11 +2335,14 @@ class TradeJournalApp(QWidget):
         card2, self.avg_pnl_card = make_card("Avg PnL %", f"{avg_pnl:.2f}%", "📈")
         card3, self.profit_factor_card = make_card("Profit Factor", f"{profit_factor:.2f}", "📊")
         card4, self.biggest_card = make_card("Biggest Win/Loss", f"{biggest_win:.2f} / {biggest_loss:.2f}", "💥")
+        card5, self.streak_card = make_card("Streak", "-", "🔥")
+        self.update_streak_card(stats['streaks'])
 
         perf_layout.addWidget(card1)
         perf_layout.addWidget(card2)
         perf_layout.addWidget(card3)
         perf_layout.addWidget(card4)
+        perf_layout.addWidget(card5)
         layout.addLayout(perf_layout)
 
         # --- CHART + RECENT TRADES CODE (keep as before) ---
@@ -2394,12 +2354,13 @@ class TradeJournalApp(QWidget):
         self.pnl_fig = Figure(figsize=(6, 3))
         self.pnl_canvas = FigureCanvas(self.pnl_fig)
         chart_layout.addWidget(self.pnl_canvas)
+        self.init_pnl_chart()
 
         chart_frame.setLayout(chart_layout)
         layout.addWidget(chart_frame)
 
     # Draw first chart
-        self.update_dashboard_chart(df)
+        self.update_dashboard_chart()
 
         self.dashboard_tab.setLayout(layout)
         layout.addStretch(1)   # ← MUST be after setting layout
@@ -2414,15 +2375,8 @@ class TradeJournalApp(QWidget):
         self.active_profile = self.profile_manager.get_active_profile()
         self.account_balance = self.active_profile['balance']
         
-        # Use unique port for each session to avoid conflicts
-        import time
-        port = 5001 + (int(time.time()) % 10)  # Rotates between 5001-5010
-        
-        ok, result = run_matrix_server(
-            port=port, 
-            profile_id=self.profile_id, 
-            profile_balance=self.account_balance
-        )
+        # One server for the whole app, started on first use
+        ok, result = open_matrix_server().profile_url(self.profile_id)
         
         if not ok:
             QMessageBox.warning(self, "Matrix Error", f"Could not start Matrix server: {result}")
@@ -2431,63 +2385,92 @@ class TradeJournalApp(QWidget):
         self._matrix_server_url = result
         webbrowser.open(self._matrix_server_url)
             
-    def update_dashboard_chart(self, df):
-        # Clear chart
-        self.pnl_fig.clear()
-        ax = self.pnl_fig.add_subplot(111)
-
-        # Safe copy + normalize name spacing
-        df = df.copy() if df is not None else pd.DataFrame()
-        
-        # Only normalize columns if dataframe is not empty
-        if not df.empty and len(df.columns) > 0:
-            df.columns = df.columns.str.strip()
-            df.columns = df.columns.str.replace(r'\s+', ' ', regex=True)
-
-        if df.empty:
-            ax.text(0.5, 0.5, "No data", ha='center', va='center')
-            self.pnl_canvas.draw()
-            return
-
-        # Ensure numeric PnL (closed trades numeric, running trades -> 0)
-        if 'PnL' in df.columns:
-            df['PnL'] = pd.to_numeric(df['PnL'], errors='coerce').fillna(0)
-        else:
-            df['PnL'] = 0
-
-        # Time-based sorting (if Time column valid)
-        if 'Time' in df.columns:
-            df['Time'] = pd.to_datetime(df['Time'], errors='coerce')
-            if not df['Time'].isnull().all():
-                df = df.sort_values('Time').reset_index(drop=True)
-
-        # Build cumulative PnL
-        df['Cumulative'] = df['PnL'].cumsum()
-
-        # X-axis selection
-        if 'Time' in df.columns and not df['Time'].isnull().all():
-            x = df['Time']
-            ax.plot(x, df['Cumulative'])
-            try:
-                import matplotlib.dates as mdates
-                ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-                ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(mdates.AutoDateLocator()))
-                for lbl in ax.get_xticklabels():
-                    lbl.set_rotation(30)
-                    lbl.set_ha('right')
-            except:
-                pass
-        else:
-            ax.plot(df.index, df['Cumulative'])
-
-        # Labels
+    def init_pnl_chart(self):
+        """Create the dashboard chart's axes and curve once; refreshes only update the data"""
+        ax = self.pnl_ax = self.pnl_fig.add_subplot(111)
+        # Animated: left out of full draws and blitted on top of the saved background
+        self.pnl_line, = ax.plot([], [], animated=True)
+        self.pnl_empty_text = ax.text(0.5, 0.5, "No data", ha='center', va='center',
+                                      transform=ax.transAxes, visible=False)
         ax.set_title("PnL Over Time")
         ax.set_ylabel("Cumulative PnL ($)")
         ax.set_xlabel("Trades")
+        self._pnl_mode = None        # 'time' or 'trade' x-axis
+        self._pnl_background = None  # canvas pixels without the curve
+        self.pnl_canvas.mpl_connect('draw_event', self.on_pnl_chart_drawn)
+
+    def on_pnl_chart_drawn(self, event):
+        """After every full draw: keep the background for blitting and paint the curve on it"""
+        self._pnl_background = self.pnl_canvas.copy_from_bbox(self.pnl_fig.bbox)
+        self.pnl_ax.draw_artist(self.pnl_line)
+
+    def set_pnl_chart_mode(self, mode):
+        ax = self.pnl_ax
+        if mode == 'time':
+            locator = mdates.AutoDateLocator()
+            ax.xaxis.set_major_locator(locator)
+            ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+            ax.tick_params(axis='x', labelrotation=30)
+        else:
+            ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+            ax.xaxis.set_major_formatter(ScalarFormatter())
+            ax.tick_params(axis='x', labelrotation=0)
+        self._pnl_mode = mode
+
+    def fit_pnl_chart_limits(self, x, y):
+        """Move the axes only when the curve leaves them or shrinks to under half; True if they moved"""
+        ax = self.pnl_ax
+        x0, x1 = float(x.min()), float(x.max())
+        y0, y1 = float(y.min()), float(y.max())
+        (cx0, cx1), (cy0, cy1) = ax.get_xlim(), ax.get_ylim()
+        inside = cx0 <= x0 and x1 <= cx1 and cy0 <= y0 and y1 <= cy1
+        snug = (x1 - x0) >= 0.5 * (cx1 - cx0) and (y1 - y0) >= 0.5 * (cy1 - cy0)
+        if inside and snug:
+            return False
+        x_pad = (x1 - x0) * 0.05 or 1.0
+        y_pad = (y1 - y0) * 0.1 or 1.0
+        # Extra room on the right so the next trades still fit
+        ax.set_xlim(x0 - x_pad, x1 + 2 * x_pad)
+        ax.set_ylim(y0 - y_pad, y1 + y_pad)
+        return True
+
+    def update_dashboard_chart(self, curve=None):
+        # Cumulative PnL in time order, LTTB-downsampled to about one point per pixel
+        if curve is None:
+            curve = self.repository.equity_curve(points=max(self.pnl_canvas.width(), 200))
+
+        if curve['total'] == 0:
+            self.pnl_line.set_data([], [])
+            if not self.pnl_empty_text.get_visible():
+                self.pnl_empty_text.set_visible(True)
+            self.pnl_canvas.draw_idle()
+            return
 
-        # Draw final
-        self.pnl_fig.tight_layout()
-        self.pnl_canvas.draw()
+        mode = 'time' if curve['time'] is not None else 'trade'
+        x = mdates.date2num(curve['time']) if mode == 'time' else curve['trade']
+        y = curve['cumulative']
+        self.pnl_line.set_data(x, y)
+
+        # Full redraw only when the axes themselves change
+        full = self._pnl_background is None
+        if self.pnl_empty_text.get_visible():
+            self.pnl_empty_text.set_visible(False)
+            full = True
+        if mode != self._pnl_mode:
+            self.set_pnl_chart_mode(mode)
+            self.fit_pnl_chart_limits(x, y)
+            self.pnl_fig.tight_layout()
+            full = True
+        elif self.fit_pnl_chart_limits(x, y):
+            full = True
+
+        if full:
+            self.pnl_canvas.draw_idle()
+        else:
+            # Same axes: repaint just the curve over the saved background
+            self.pnl_canvas.restore_region(self._pnl_background)
+            self.pnl_ax.draw_artist(self.pnl_line)
+            self.pnl_canvas.blit(self.pnl_fig.bbox)
 
     # ---------------- Journal tab initialization ----------------
     def init_journal_tab(self):
@@ -2699,12 +2682,18 @@ class TradeJournalApp(QWidget):
         self.screenshot1_label.setFixedSize(350, 180)
         self.screenshot1_label.setStyleSheet("border: 2px solid #4CAF50; border-radius: 6px;")
         self.screenshot1_label.setAlignment(Qt.AlignCenter)
+        self.screenshot1_label.setCursor(Qt.PointingHandCursor)
+        self.screenshot1_label.setToolTip('Click to zoom')
+        self.screenshot1_label.installEventFilter(self)
         right_layout.addWidget(self.screenshot1_label)
         
         self.screenshot2_label = QLabel(self)
         self.screenshot2_label.setFixedSize(350, 180)
         self.screenshot2_label.setStyleSheet("border: 2px solid #4CAF50; border-radius: 6px;")
         self.screenshot2_label.setAlignment(Qt.AlignCenter)
+        self.screenshot2_label.setCursor(Qt.PointingHandCursor)
+        self.screenshot2_label.setToolTip('Click to zoom')
+        self.screenshot2_label.installEventFilter(self)
         right_layout.addWidget(self.screenshot2_label)
         
         right_layout.addStretch()
@@ -2758,9 +2747,6 @@ class TradeJournalApp(QWidget):
         text = self.pair_entry.text()
         self.pair_entry.setText(text.upper())
 
-    def get_screenshot_counter(self):
-        return len([f for f in os.listdir(self.screenshot_folder) if f.endswith('.png')])
-
     def upload_screenshot(self, screenshot_num):
             options = QFileDialog.Options()
             file_name, _ = QFileDialog.getOpenFileName(
@@ -2772,30 +2758,66 @@ class TradeJournalApp(QWidget):
             )
             
             if file_name:
-                date_str = datetime.datetime.now().strftime('%Y-%m-%d')
-                new_file_name = f"{date_str}_{self.screenshot_counter + 1}.png"
-                new_file_path = os.path.join(self.screenshot_folder, new_file_name)
-                
-                shutil.copy(file_name, new_file_path)
-                
-                if screenshot_num == 1:
-                    self.screenshot1_path = new_file_path
-                    pixmap = QPixmap(new_file_path).scaled(
-                        self.screenshot1_label.size(), 
-                        Qt.KeepAspectRatio, 
-                        Qt.SmoothTransformation
-                    )
-                    self.screenshot1_label.setPixmap(pixmap)
-                    self.screenshot_counter += 1
-                elif screenshot_num == 2:
-                    self.screenshot2_path = new_file_path
-                    pixmap = QPixmap(new_file_path).scaled(
-                        self.screenshot2_label.size(), 
-                        Qt.KeepAspectRatio, 
-                        Qt.SmoothTransformation
-                    )
-                    self.screenshot2_label.setPixmap(pixmap)
-                    self.screenshot_counter += 1
+                # Hashed, copied and thumbnailed off the GUI thread; stored once per content
+                self.screenshot_requests += 1
+                ingest = (screenshot_num, self.screenshot_requests)
+                future = self.screenshot_ingestor.submit(self.screenshot_store, file_name, ingest)
+                self.pending_screenshots[screenshot_num] = (ingest, future)
+                self.screenshot_label(screenshot_num).setText('⏳ Importing screenshot...')
+
+    def screenshot_label(self, screenshot_num):
+        return self.screenshot1_label if screenshot_num == 1 else self.screenshot2_label
+
+    def on_screenshot_ingested(self, result):
+        screenshot_num = result['request'][0]
+        pending = self.pending_screenshots.get(screenshot_num)
+        if pending is None or pending[0] != result['request']:
+            return  # superseded (another file, another trade, or already applied)
+        del self.pending_screenshots[screenshot_num]
+        setattr(self, f'screenshot{screenshot_num}_path', result['path'])
+        self.show_screenshot(self.screenshot_label(screenshot_num), result['path'])
+
+    def on_screenshot_failed(self, result):
+        screenshot_num = result['request'][0]
+        pending = self.pending_screenshots.get(screenshot_num)
+        if pending is None or pending[0] != result['request']:
+            return
+        del self.pending_screenshots[screenshot_num]
+        self.show_screenshot(self.screenshot_label(screenshot_num), getattr(self, f'screenshot{screenshot_num}_path', ''))
+        QMessageBox.warning(self, "Screenshot Error", f"Could not import screenshot:\n{result['error']}")
+
+    def finish_pending_screenshots(self):
+        """Wait for uploads still being imported so a saved trade references them"""
+        for screenshot_num, (ingest, future) in list(self.pending_screenshots.items()):
+            try:
+                path = future.result()
+            except Exception:
+                continue  # reported through on_screenshot_failed
+            self.on_screenshot_ingested({'request': ingest, 'path': path})
+
+    def show_screenshot(self, label, path):
+        """Preview a screenshot from its cached thumbnail (never the full-size file)"""
+        if path:
+            label.setPixmap(self.screenshot_cache.pixmap(path, label.size()))
+        else:
+            label.clear()
+
+    def zoom_screenshot(self, screenshot_num):
+        """Full-resolution view of a trade screenshot"""
+        path = getattr(self, f'screenshot{screenshot_num}_path', '')
+        if not path or not os.path.exists(path):
+            return
+        ScreenshotZoomDialog(self.screenshot_cache.full_pixmap(path), os.path.basename(path), self).exec_()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.MouseButtonRelease:
+            if obj is getattr(self, 'screenshot1_label', None):
+                self.zoom_screenshot(1)
+                return True
+            if obj is getattr(self, 'screenshot2_label', None):
+                self.zoom_screenshot(2)
+                return True
+        return super().eventFilter(obj, event)
 
   
     def status_changed(self, index):
@@ -2809,6 +2831,7 @@ class TradeJournalApp(QWidget):
         self.update_day()
         self.pair_entry.clear()
         self.notes_entry.clear()
+        self.pending_screenshots.clear()
         self.screenshot1_label.clear()
         self.screenshot2_label.clear()
         self.trade_size_entry.clear()
@@ -2866,6 +2889,7 @@ class TradeJournalApp(QWidget):
             self.pnl_percent_entry.clear()
 
     def add_trade(self):
+            self.finish_pending_screenshots()
             try:
                 trade_size_val = float(self.trade_size_entry.text())
             except Exception:
@@ -2893,6 +2917,16 @@ class TradeJournalApp(QWidget):
                 'Position Type': self.position_dropdown.currentText()
             }
             
+            # Save to profile-specific store (single-row insert)
+            try:
+                self.repository.add(trade_data)
+            except TradeSchemaError as e:
+                QMessageBox.warning(self, "Input Error", str(e))
+                return
+            except Exception as e:
+                QMessageBox.warning(self, "Save Error", f"Could not save trade:\n\n{e}")
+                return
+
             # CRITICAL: Update account balance and profile
             self.account_balance -= trade_data['Trade Size']
             
@@ -2907,16 +2941,7 @@ class TradeJournalApp(QWidget):
             self.active_profile = self.profile_manager.get_active_profile()
             self.account_balance = self.active_profile['balance'] 
 
-            # Add to dataframe
-            if not hasattr(self, 'df'):
-                self.df = pd.DataFrame()
-            self.df = pd.concat([self.df, pd.DataFrame([trade_data])], ignore_index=True)
-            
-            # Save to profile-specific file
-            try:
-                self.df.to_excel(self.trades_file, index=False)
-            except Exception as e:
-                print("Error saving trades:", e)
+            self.df = self.repository.frame()
             
             # Update UI
             self.populate_trades()
@@ -2930,6 +2955,7 @@ class TradeJournalApp(QWidget):
 
     def update_trade(self):
             if self.current_trade_index is not None:
+                self.finish_pending_screenshots()
                 try:
                     trade_size_val = float(self.trade_size_entry.text())
                 except Exception:
@@ -2956,20 +2982,26 @@ class TradeJournalApp(QWidget):
                     'Closed Notes': self.closed_notes_entry.toPlainText() if self.status_dropdown.currentText() == 'Closed' else '',
                     'Position Type': self.position_dropdown.currentText()
                 }
+                try:
+                    trade_data = coerce_trade(trade_data)
+                except TradeSchemaError as e:
+                    QMessageBox.warning(self, "Input Error", str(e))
+                    return
                 
                 # Recalculate balance
                 # CRITICAL: Recalculate balance from profile manager
                 old_status = self.df.at[self.current_trade_index, 'Status']
                 old_trade_size = self.df.at[self.current_trade_index, 'Trade Size']
+                new_balance = self.account_balance
                 
                 # Return old trade size if it was running
                 if old_status == 'Running':
-                    self.account_balance += old_trade_size
+                    new_balance += old_trade_size
                 
                 # Process new trade status
                 if trade_data['Status'] == 'Running':
                     # Deduct new trade size
-                    self.account_balance -= trade_data['Trade Size']
+                    new_balance -= trade_data['Trade Size']
                 elif trade_data['Status'] == 'Closed':
                     try:
                         pnl_float = float(trade_data['PnL'])
@@ -2977,13 +3009,24 @@ class TradeJournalApp(QWidget):
                         pnl_float = 0.0
                     # If was closed, don't deduct trade size, just add PnL difference
                     if old_status == 'Closed':
-                        old_pnl = float(self.df.at[self.current_trade_index, 'PnL']) if self.df.at[self.current_trade_index, 'PnL'] else 0
-                        self.account_balance += (pnl_float - old_pnl)
+                        old_pnl = self.df.at[self.current_trade_index, 'PnL']
+                        old_pnl = 0 if pd.isna(old_pnl) else old_pnl
+                        new_balance += (pnl_float - old_pnl)
                     else:
                         # Was running, now closed: add trade size back + PnL
-                        self.account_balance += pnl_float
+                        new_balance += pnl_float
+                
+                # Update dataframe and profile-specific store (single-row update) first,
+                # so the balance only changes once the trade is saved
+                try:
+                    self.repository.update(self.current_trade_index, trade_data)
+                except Exception as e:
+                    QMessageBox.warning(self, "Save Error", f"Could not save trade:\n\n{e}")
+                    return
+                self.df = self.repository.frame()
                 
                 # Update profile balance
+                self.account_balance = new_balance
                 self.profile_manager.update_balance(
                     self.profile_id,
                     self.account_balance,
@@ -2994,16 +3037,6 @@ class TradeJournalApp(QWidget):
                 self.active_profile = self.profile_manager.get_active_profile()
                 self.account_balance = self.active_profile['balance']
                 
-                # Update dataframe
-                for key, value in trade_data.items():
-                    self.df.at[self.current_trade_index, key] = value
-                
-                # Save to profile-specific file
-                try:
-                    self.df.to_excel(self.trades_file, index=False)
-                except Exception:
-                    pass
-                
                 # Update UI
                 self.populate_trades()
                 self.reset_fields()
@@ -3014,14 +3047,13 @@ class TradeJournalApp(QWidget):
                 self.profile_indicator.setText(f"🔵 {self.active_profile['username']} | 💰 ${self.account_balance:.2f}")
                 
                 self.refresh_dashboard()
-    def load_trade(self, item):
+    def load_trade(self, index):
         self.tabs.setCurrentWidget(self.journal_tab)
-        time, pair = item.text().split(' - ')
-        trade = self.df[(self.df['Time'] == time) & (self.df['Pair'] == pair)]
-        if not trade.empty:
-            self.current_trade_index = trade.index[0]
-            trade = trade.iloc[0]
-            self.time_entry.setText(trade['Time'])
+        trade_id = index.data(Qt.UserRole)
+        trade = self.repository.get_trade(trade_id)
+        if trade is not None:
+            self.current_trade_index = trade_id
+            self.time_entry.setText(format_value(trade['Time']))
             self.update_day()
             self.pair_entry.setText(trade['Pair'])
             # ---- SAFE FIX: force Notes fields to string ----
@@ -3035,34 +3067,31 @@ class TradeJournalApp(QWidget):
                 closed_notes = "" if pd.isna(closed_notes) else str(closed_notes)
 
             self.notes_entry.setPlainText(notes)
+            self.pending_screenshots.clear()
             if trade['Screenshot1'] and not pd.isna(trade['Screenshot1']):
-                pixmap = QPixmap(trade['Screenshot1']).scaled(self.screenshot1_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                self.screenshot1_label.setPixmap(pixmap)
                 self.screenshot1_path = trade['Screenshot1']
             else:
-                self.screenshot1_label.clear()
                 self.screenshot1_path = ''
+            self.show_screenshot(self.screenshot1_label, self.screenshot1_path)
             if trade['Screenshot2'] and not pd.isna(trade['Screenshot2']):
-                pixmap = QPixmap(trade['Screenshot2']).scaled(self.screenshot2_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                self.screenshot2_label.setPixmap(pixmap)
                 self.screenshot2_path = trade['Screenshot2']
             else:
-                self.screenshot2_label.clear()
                 self.screenshot2_path = ''
-            self.trade_size_entry.setText(str(trade['Trade Size']))
-            self.leverage_entry.setText(str(trade['Leverage']))
-            self.tp_entry.setText(str(trade['Take Profit %']))
-            self.sl_entry.setText(str(trade['Stop Loss %']))
-            self.tp_amount_entry.setText(str(trade['Take Profit Amount']))
-            self.sl_amount_entry.setText(str(trade['Stop Loss Amount']))
-            self.rr_ratio_entry.setText(str(trade['Risk/Reward Ratio']))
+            self.show_screenshot(self.screenshot2_label, self.screenshot2_path)
+            self.trade_size_entry.setText(format_value(trade['Trade Size']))
+            self.leverage_entry.setText(format_value(trade['Leverage']))
+            self.tp_entry.setText(format_value(trade['Take Profit %']))
+            self.sl_entry.setText(format_value(trade['Stop Loss %']))
+            self.tp_amount_entry.setText(format_value(trade['Take Profit Amount']))
+            self.sl_amount_entry.setText(format_value(trade['Stop Loss Amount']))
+            self.rr_ratio_entry.setText(format_value(trade['Risk/Reward Ratio']))
             self.status_dropdown.setCurrentText(trade['Status'])
             self.position_dropdown.setCurrentText(trade['Position Type'])
             if trade['Status'] == 'Closed':
                 self.hidden_widget.setVisible(True)
                 self.outcome_dropdown.setCurrentText(trade['Outcome'])
-                self.pnl_entry.setText(str(trade['PnL']))
-                self.pnl_percent_entry.setText(str(trade['PnL %']))
+                self.pnl_entry.setText(format_value(trade['PnL']))
+                self.pnl_percent_entry.setText(format_value(trade['PnL %']))
                 # Same protection for closed notes
                 closed_notes = trade.get('Closed Notes', "")
                 if not isinstance(closed_notes, str):
@@ -3072,13 +3101,19 @@ class TradeJournalApp(QWidget):
                 self.hidden_widget.setVisible(False)
 
     def delete_trade(self):
-            selected_items = self.running_trades_list.selectedItems() + self.closed_trades_list.selectedItems()
-            if selected_items:
-                item = selected_items[0]
-                time, pair = item.text().split(' - ')
-                trade = self.df[(self.df['Time'] == time) & (self.df['Pair'] == pair)]
-                if not trade.empty:
-                    trade_row = trade.iloc[0]
+            selected_rows = (self.running_trades_table.selectionModel().selectedRows()
+                             + self.closed_trades_table.selectionModel().selectedRows())
+            if selected_rows:
+                trade_id = selected_rows[0].data(Qt.UserRole)
+                trade_row = self.repository.get_trade(trade_id)
+                if trade_row is not None:
+                    # Delete trade first; the balance only changes once it is gone
+                    try:
+                        self.repository.delete(trade_id)
+                    except Exception as e:
+                        QMessageBox.warning(self, "Delete Error", f"Could not delete trade:\n\n{e}")
+                        return
+                    self.df = self.repository.frame()
                     
                     # CRITICAL: Return balance if trade was running
                     if trade_row['Status'] == 'Running':
@@ -3091,79 +3126,216 @@ class TradeJournalApp(QWidget):
                         self.active_profile = self.profile_manager.get_active_profile()
                         self.account_balance = self.active_profile['balance']
                     
-                    # Delete trade
-                    self.df = self.df.drop(trade.index)
-                    try:
-                        self.df.to_excel(self.trades_file, index=False)
-                    except Exception:
-                        pass
-                    
                     # Update UI
                     self.populate_trades()
                     self.account_balance_label.setText(f"Account Balance: ${self.account_balance:.2f}")
                     self.profile_indicator.setText(f"Profile: {self.active_profile['username']} | Balance: ${self.account_balance:.2f}")
                     self.refresh_dashboard()
 
-    def filter_trades(self, index):
+    def filter_trades(self, index=None):
         filter_option = self.filter_dropdown.currentText()
-        today = datetime.date.today()
+        custom = filter_option == 'Custom Range'
+        for widget in (self.filter_from_label, self.filter_from_date, self.filter_to_label, self.filter_to_date):
+            widget.setVisible(custom)
+        
+        # Binary search on the repository's time index (no per-row parsing)
+        today = pd.Timestamp(datetime.date.today())
         if filter_option == 'Today':
-            filtered_df = self.df[self.df['Time'].apply(lambda x: datetime.datetime.strptime(x, '%Y-%m-%d %H:%M:%S').date() == today)]
+            filtered_df = self.repository.trades_between(today, today + pd.Timedelta(days=1))
         elif filter_option == 'Last 7 Days':
-            filtered_df = self.df[self.df['Time'].apply(lambda x: (today - datetime.datetime.strptime(x, '%Y-%m-%d %H:%M:%S').date()).days <= 7)]
+            filtered_df = self.repository.trades_between(today - pd.Timedelta(days=7))
         elif filter_option == 'Last 30 Days':
-            filtered_df = self.df[self.df['Time'].apply(lambda x: (today - datetime.datetime.strptime(x, '%Y-%m-%d %H:%M:%S').date()).days <= 30)]
+            filtered_df = self.repository.trades_between(today - pd.Timedelta(days=30))
+        elif custom:
+            start = pd.Timestamp(self.filter_from_date.date().toPyDate())
+            end = pd.Timestamp(self.filter_to_date.date().toPyDate()) + pd.Timedelta(days=1)
+            filtered_df = self.repository.trades_between(start, end)
         else:
             filtered_df = self.df
         self.populate_filtered_trades(filtered_df)
 
     def populate_filtered_trades(self, filtered_df):
-        running_trades = filtered_df[filtered_df['Status'] == 'Running']
-        closed_trades = filtered_df[filtered_df['Status'] == 'Closed']
-        self.running_trades_list.clear()
-        self.closed_trades_list.clear()
-        for index, row in running_trades.iterrows():
-            self.running_trades_list.addItem(f"{row['Time']} - {row['Pair']}")
-        for index, row in closed_trades.iterrows():
-            self.closed_trades_list.addItem(f"{row['Time']} - {row['Pair']}")
+        # One model for both tables; the Running / Closed split and sorting happen in the proxies
+        self.trades_model.set_trades(filtered_df)
 
     def load_data(self):
-            # CRITICAL: Always use profile-specific file path
-            if os.path.exists(self.trades_file):
-                try:
-                    self.df = pd.read_excel(self.trades_file)
-                    
-                    # Force text columns to string
-                    text_cols = ['Notes', 'Closed Notes', 'Screenshot1', 'Screenshot2', 'Pair', 'Outcome', 'Status']
-                    for col in text_cols:
-                        if col in self.df.columns:
-                            self.df[col] = self.df[col].astype(str).fillna("")
-                except Exception as e:
-                    print(f"Error loading {self.trades_file}: {e}")
-                    self.df = pd.DataFrame(columns=[
-                        'Time', 'Pair', 'Notes', 'Screenshot1', 'Screenshot2', 'Trade Size', 'Leverage',
-                        'Take Profit %', 'Stop Loss %', 'Take Profit Amount', 'Stop Loss Amount',
-                        'Risk/Reward Ratio', 'Status', 'Outcome', 'PnL', 'PnL %',
-                        'Closed Notes', 'Position Type'
-                    ])
-            else:
-                self.df = pd.DataFrame(columns=[
-                    'Time', 'Pair', 'Notes', 'Screenshot1', 'Screenshot2', 'Trade Size', 'Leverage',
-                    'Take Profit %', 'Stop Loss %', 'Take Profit Amount', 'Stop Loss Amount',
-                    'Risk/Reward Ratio', 'Status', 'Outcome', 'PnL', 'PnL %',
-                    'Closed Notes', 'Position Type'
-                ])
+            # CRITICAL: Always use profile-specific trades (shared repository, text columns as str)
+            self.df = self.repository.frame()
         
 
     def populate_trades(self):
-        running_trades = self.df[self.df['Status'] == 'Running'] if 'Status' in self.df.columns else pd.DataFrame()
-        closed_trades = self.df[self.df['Status'] == 'Closed'] if 'Status' in self.df.columns else pd.DataFrame()
-        self.running_trades_list.clear()
-        self.closed_trades_list.clear()
-        for index, row in running_trades.iterrows():
-            self.running_trades_list.addItem(f"{row['Time']} - {row['Pair']}")
-        for index, row in closed_trades.iterrows():
-            self.closed_trades_list.addItem(f"{row['Time']} - {row['Pair']}")
+        self.trades_model.set_trades(self.df if 'Status' in self.df.columns else None)
+
+    def create_trades_table(self, status):
+        """Sortable table of one status over the shared trades model (only visible rows are painted)"""
+        proxy = TradeFilterProxy(status, self)
+        proxy.setSourceModel(self.trades_model)
+        table = QTableView(self)
+        table.setModel(proxy)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SingleSelection)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setWordWrap(False)
+        table.verticalHeader().setVisible(False)
+        # Fixed row heights: the view never measures rows it does not show
+        table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        table.horizontalHeader().setStretchLastSection(True)
+        table.setColumnWidth(0, 150)
+        table.setSortingEnabled(True)
+        table.sortByColumn(0, Qt.AscendingOrder)
+        table.doubleClicked.connect(self.load_trade)
+        table.selectionModel().currentRowChanged.connect(lambda current, previous: self.prefetch_screenshots(table))
+        return table
+
+    def prefetch_screenshots(self, table):
+        """Decode the screenshots of the current row and its neighbours into the pixmap cache"""
+        prefetcher = getattr(self, 'screenshot_prefetcher', None)
+        if prefetcher is None:
+            return
+        index = table.currentIndex()
+        if not index.isValid():
+            prefetcher.cancel()
+            return
+        proxy = table.model()
+        row = index.row()
+        # Current trade first, then outwards
+        rows = [row] + [r for step in range(1, PREFETCH_RADIUS + 1) for r in (row + step, row - step)]
+        size = self.screenshot1_label.size()
+        paths = []
+        for r in rows:
+            if not 0 <= r < proxy.rowCount():
+                continue
+            trade = self.repository.get_trade(proxy.trade_id(r))
+            if trade is None:
+                continue
+            for col in ('Screenshot1', 'Screenshot2'):
+                path = trade[col]
+                if (isinstance(path, str) and path and path not in paths
+                        and self.screenshot_cache.cached_pixmap(path, size) is None):
+                    paths.append(path)
+        if paths:
+            prefetcher.request(self.screenshot_cache, paths)
+        else:
+            prefetcher.cancel()
+
+    def on_screenshot_prefetched(self, result):
+        prefetcher = getattr(self, 'screenshot_prefetcher', None)
+        if prefetcher is None or not prefetcher.is_current(result['generation']):
+            return  # selection moved on (or profile switched)
+        self.screenshot_cache.insert_image(result['path'], self.screenshot1_label.size(), result['image'])
+
+    def init_gallery_tab(self):
+        layout = QVBoxLayout()
+        filter_layout = QHBoxLayout()
+        self.gallery_pair_dropdown = QComboBox(self)
+        self.gallery_pair_dropdown.addItem('All Pairs')
+        self.gallery_outcome_dropdown = QComboBox(self)
+        self.gallery_outcome_dropdown.addItems(['All Outcomes', 'Win', 'Loss', 'Break Even'])
+        self.gallery_date_dropdown = QComboBox(self)
+        self.gallery_date_dropdown.addItems(['All', 'Today', 'Last 7 Days', 'Last 30 Days'])
+        for label, dropdown in (('Pair:', self.gallery_pair_dropdown),
+                                ('Outcome:', self.gallery_outcome_dropdown),
+                                ('Date:', self.gallery_date_dropdown)):
+            dropdown.currentIndexChanged.connect(self.filter_gallery)
+            filter_layout.addWidget(QLabel(label))
+            filter_layout.addWidget(dropdown)
+        filter_layout.addStretch()
+        self.gallery_count_label = QLabel('')
+        filter_layout.addWidget(self.gallery_count_label)
+        layout.addLayout(filter_layout)
+
+        # Icon-mode list over a lazy model: only painted rows ask for a thumbnail
+        self.gallery_loader = ThumbnailLoader()
+        self.gallery_model = GalleryModel(self.gallery_loader, self.screenshot_cache, self)
+        self.gallery_view = QListView(self)
+        self.gallery_view.setModel(self.gallery_model)
+        self.gallery_view.setViewMode(QListView.IconMode)
+        self.gallery_view.setIconSize(ICON_SIZE)
+        self.gallery_view.setGridSize(QSize(ICON_SIZE.width() + 20, ICON_SIZE.height() + 40))
+        self.gallery_view.setUniformItemSizes(True)
+        self.gallery_view.setLayoutMode(QListView.Batched)
+        self.gallery_view.setBatchSize(500)
+        self.gallery_view.setResizeMode(QListView.Adjust)
+        self.gallery_view.setMovement(QListView.Static)
+        self.gallery_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.gallery_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.gallery_view.doubleClicked.connect(self.load_trade)
+        self.gallery_model.thumbnails_changed.connect(lambda: self.gallery_view.viewport().update())
+        layout.addWidget(self.gallery_view)
+        self.gallery_tab.setLayout(layout)
+        self.gallery_key = None
+
+    def on_tab_changed(self, index):
+        if self.tabs.widget(index) is self.gallery_tab:
+            self.refresh_gallery()
+
+    def refresh_gallery(self):
+        """Rebuild the gallery rows if the trades changed since it was last shown"""
+        key = (id(self.repository), self.repository.current_version())
+        if key == self.gallery_key:
+            return
+        self.gallery_key = key
+        self.gallery_model.set_trades(self.repository.frame())
+
+        # Keep the chosen pair if it still has screenshots
+        pair = self.gallery_pair_dropdown.currentText()
+        self.gallery_pair_dropdown.blockSignals(True)
+        self.gallery_pair_dropdown.clear()
+        self.gallery_pair_dropdown.addItems(['All Pairs'] + self.gallery_model.pairs())
+        self.gallery_pair_dropdown.setCurrentText(pair)
+        self.gallery_pair_dropdown.blockSignals(False)
+        self.filter_gallery()
+
+    def filter_gallery(self, index=None):
+        pair = self.gallery_pair_dropdown.currentText()
+        outcome = self.gallery_outcome_dropdown.currentText()
+        days = {'Today': 0, 'Last 7 Days': 7, 'Last 30 Days': 30}.get(self.gallery_date_dropdown.currentText())
+        start = None if days is None else pd.Timestamp(datetime.date.today()) - pd.Timedelta(days=days)
+        self.gallery_model.set_filter(
+            pair=None if pair == 'All Pairs' else pair,
+            outcome=None if outcome == 'All Outcomes' else outcome,
+            start=start,
+        )
+        self.gallery_count_label.setText(f"{self.gallery_model.rowCount()} screenshots")
+
+    def open_screenshot_cleanup(self):
+        """Report screenshot storage of all profiles and remove screenshots no trade references"""
+        # The dialog's worker opens each profile's repository and loads its trades
+        profiles = [
+            {
+                'id': profile['id'],
+                'name': profile['username'],
+                'folder': f"profiles/profile_{profile['id']}/screenshots",
+            }
+            for profile in self.profile_manager.get_all_profiles()
+        ]
+        # Screenshots attached in the form but not saved to a trade yet
+        keep = (getattr(self, 'screenshot1_path', ''), getattr(self, 'screenshot2_path', ''))
+        ScreenshotCleanupDialog(profiles, keep, self).exec_()
+
+    def export_trades_xlsx(self):
+        """Export the profile's trades to an Excel workbook"""
+        default_name = f"trades_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        exports_folder = f"{self.profile_path}/exports"
+        os.makedirs(exports_folder, exist_ok=True)
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export Trades",
+            os.path.join(exports_folder, default_name),
+            "Excel Files (*.xlsx)"
+        )
+        if not file_path:
+            return
+        
+        try:
+            # Include edits still queued on the save writer
+            if not self.repository.flush():
+                raise RuntimeError("Pending trade edits could not be saved")
+            self.trade_store.export_xlsx(file_path)
+            QMessageBox.information(self, "Export Successful", f"Trades exported to:\n{file_path}")
+        except Exception as e:
+            QMessageBox.warning(self, "Export Failed", f"Could not export trades:\n\n{e}")
 
     def edit_capital(self):
             new_balance, ok = QInputDialog.getDouble(
@@ -3200,22 +3372,40 @@ class TradeJournalApp(QWidget):
         layout = QVBoxLayout()
         filter_layout = QHBoxLayout()
         self.filter_dropdown = QComboBox(self)
-        self.filter_dropdown.addItems(['Today', 'Last 7 Days', 'Last 30 Days', 'All'])
+        self.filter_dropdown.addItems(['Today', 'Last 7 Days', 'Last 30 Days', 'All', 'Custom Range'])
         self.filter_dropdown.currentIndexChanged.connect(self.filter_trades)
         filter_layout.addWidget(QLabel('Filter Trades:'))
         filter_layout.addWidget(self.filter_dropdown)
+        
+        # Custom range (inclusive dates, shown only for 'Custom Range')
+        self.filter_from_date = QDateEdit(QDate.currentDate().addDays(-30), self)
+        self.filter_to_date = QDateEdit(QDate.currentDate(), self)
+        self.filter_from_label = QLabel('From:')
+        self.filter_to_label = QLabel('To:')
+        for widget in (self.filter_from_date, self.filter_to_date):
+            widget.setCalendarPopup(True)
+            widget.setDisplayFormat('yyyy-MM-dd')
+            widget.dateChanged.connect(self.filter_trades)
+        for widget in (self.filter_from_label, self.filter_from_date, self.filter_to_label, self.filter_to_date):
+            filter_layout.addWidget(widget)
+            widget.setVisible(False)
         layout.addLayout(filter_layout)
-        self.running_trades_list = QListWidget(self)
-        self.running_trades_list.itemDoubleClicked.connect(self.load_trade)
+        self.trades_model = TradeTableModel(self)
+        self.running_trades_table = self.create_trades_table('Running')
         layout.addWidget(QLabel('Running Trades:'))
-        layout.addWidget(self.running_trades_list)
-        self.closed_trades_list = QListWidget(self)
-        self.closed_trades_list.itemDoubleClicked.connect(self.load_trade)
+        layout.addWidget(self.running_trades_table)
+        self.closed_trades_table = self.create_trades_table('Closed')
         layout.addWidget(QLabel('Closed Trades:'))
-        layout.addWidget(self.closed_trades_list)      
+        layout.addWidget(self.closed_trades_table)      
         delete_btn = QPushButton('Delete Trade', self)
         delete_btn.clicked.connect(self.delete_trade)
         layout.addWidget(delete_btn)
+        export_btn = QPushButton('Export to Excel', self)
+        export_btn.clicked.connect(self.export_trades_xlsx)
+        layout.addWidget(export_btn)
+        cleanup_btn = QPushButton('🧹 Screenshot Cleanup', self)
+        cleanup_btn.clicked.connect(self.open_screenshot_cleanup)
+        layout.addWidget(cleanup_btn)
         self.account_balance_label = QLabel(f"Account Balance: ${self.account_balance:.2f}", self)
         layout.addWidget(self.account_balance_label)
         self.trades_tab.setLayout(layout)
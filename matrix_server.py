@@ -0,0 +1,488 @@
+"""
+Matrix Server
+One long-lived, threaded web server per process serving the Matrix page of every profile
+"""
+
+import hashlib
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from metrics_engine import compute_metrics
+from streak_analytics import StreakStats
+from matrix_cache import MatrixCache
+from period_rollup import PERIODS
+from report_export import REPORT_FORMATS, iter_report, json_value, trade_records
+
+# Try to import Flask-related modules
+try:
+    from flask import Flask, request, jsonify, render_template_string, Response, redirect
+    from werkzeug.serving import make_server
+    FLASK_AVAILABLE = True
+except Exception:
+    FLASK_AVAILABLE = False
+
+
+# Tried in order until one is free
+MATRIX_PORTS = range(5001, 5011)
+
+# Page results hold filtered trade frames; bound the cache by their size, not just their count
+MATRIX_CACHE_ENTRIES = 64
+MATRIX_CACHE_BYTES = 64 * 1024 * 1024
+
+# /api/trades paging
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# /api/equity points when the client does not send its chart width
+DEFAULT_CHART_POINTS = 1000
+
+MATRIX_TEMPLATE = '''
+<!doctype html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8">
+    <title>📈 Trade Metrics</title>
+    <style>
+    @import url('https://fonts.googleapis.com/css2?family=Open+Sans:wght@400;600&display=swap');
+    body { background-color: #121212; color: #ffffff; font-family: 'Open Sans', sans-serif; margin: 0; padding: 0; }
+    .header { display: flex; justify-content: space-around; align-items: center; padding: 20px; background-color: #1f1f1f; }
+    .container { display: flex; flex-wrap: wrap; justify-content: center; gap: 20px; padding: 20px; }
+    .card { background-color: #1f1f1f; border: 1px solid #333; border-radius: 8px; padding: 20px; width: 220px; text-align: center; }
+    </style>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+  </head>
+  <body>
+    <div class="header">
+      <div><h1>💸 Account Balance</h1><p>${{ "%.2f"|format(metrics['Account Balance']) }}</p></div>
+      <div><h1>📊 Total Trades</h1><p>{{ metrics['Trades'] }}</p></div>
+      <div><h1>🏆 Win Rate</h1><p>{{ "%.2f"|format(metrics['Win %']) }}%</p></div>
+    </div>
+    <div style="display:flex; justify-content:center; margin-top:10px;">
+      <form method="post" style="display:flex; gap:10px;">
+        <select name="filter">
+          <option value="all">All Time</option>
+          <option value="last_7_days">Last 7 Days</option>
+          <option value="last_30_days">Last 30 Days</option>
+        </select>
+        <button type="submit">Apply</button>
+      </form>
+      <form method="post" action="save_report" style="display:flex; gap:10px; margin-left:20px;">
+        <input type="hidden" name="filter" value="{{ filter_option }}">
+        <select name="format">
+          <option value="txt">TXT</option>
+          <option value="csv">CSV</option>
+          <option value="json">JSON</option>
+          <option value="xlsx">Excel</option>
+        </select>
+        <label><input type="checkbox" name="details" value="1"> Include trades</label>
+        <button type="submit">💾 Save Report</button>
+      </form>
+    </div>
+    <div class="container">
+      {% for key, value in metrics.items() %}
+        <div class="card">
+          <h3>{{ key }}</h3>
+          <p>{{ "%.2f"|format(value) if value is number else value }}</p>
+        </div>
+      {% endfor %}
+    </div>
+    <h2 style="text-align:center;">🔥 Streak Distribution</h2>
+    <div class="container">
+      {% for kind, counts in streaks['histogram'].items() %}
+        <div class="card">
+          <h3>{{ kind }} Streaks</h3>
+          {% for length, count in counts.items() %}
+            <p>{{ length }} in a row: {{ count }}×</p>
+          {% else %}
+            <p>-</p>
+          {% endfor %}
+        </div>
+      {% endfor %}
+    </div>
+    <h2 style="text-align:center;">📅 Monthly PnL</h2>
+    <div class="container">
+      {% for month in months %}
+        <div class="card">
+          <h3>{{ month['period'] }}</h3>
+          <p>{{ "%.2f"|format(month['pnl']) }} $ · {{ month['trades'] }} trades</p>
+          <p>{{ month['wins'] }}W / {{ month['losses'] }}L · Volume {{ "%.2f"|format(month['volume']) }}</p>
+        </div>
+      {% else %}
+        <p>-</p>
+      {% endfor %}
+    </div>
+    <div style="width:90%; margin: auto; max-width:1200px;">
+      <canvas id="pnlChart"></canvas>
+    </div>
+    <script>
+      var ctx = document.getElementById('pnlChart').getContext('2d');
+      // Series comes from the JSON API (ETag-cached by the browser), about one point per pixel
+      var points = Math.max(ctx.canvas.clientWidth, 200);
+      fetch('api/equity?filter={{ filter_option }}&points=' + points)
+        .then(function (response) { return response.json(); })
+        .then(function (equity) {
+          var pnlChart = new Chart(ctx, {
+            type: 'line',
+            data: {
+              labels: equity.time || equity.trade,
+              datasets: [{
+                label: 'Cumulative PnL Over Time 📈',
+                data: equity.cumulative,
+                pointRadius: 0,
+                borderColor: 'rgba(54, 162, 235, 1)',
+                borderWidth: 1,
+                fill: false,
+              }]
+            }
+          });
+        });
+    </script>
+  </body>
+</html>
+'''
+
+
+def filter_start(filter_option):
+    """Start of the Matrix page's 'last N days' filters (None = all trades)"""
+    # Whole minutes, so repeated loads within a minute share a cache entry
+    now = datetime.now().replace(second=0, microsecond=0)
+    if filter_option == 'last_7_days':
+        return now - timedelta(days=7)
+    if filter_option == 'last_30_days':
+        return now - timedelta(days=30)
+    return None
+
+
+def parse_date_arg(value):
+    """Date of a query-string argument such as 2024-01-31 (None when missing); ValueError if invalid"""
+    if not value:
+        return None
+    try:
+        parsed = pd.Timestamp(value)
+    except (ValueError, TypeError):
+        parsed = pd.NaT
+    if pd.isna(parsed):
+        raise ValueError(f"invalid date '{value}'")
+    return parsed.date()
+
+
+def data_etag(*parts):
+    """Short strong ETag for the data identified by parts (versions, filters, paging)"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:20]
+
+
+def sort_trades(df, sort):
+    """Trades ordered by sort ('Time', '-PnL', ...); unknown columns keep the frame order"""
+    if not sort:
+        return df
+    column = sort.lstrip('-')
+    if column not in df.columns:
+        return df
+    by_text = lambda s: s.astype(str) if isinstance(s.dtype, pd.CategoricalDtype) else s
+    return df.sort_values(column, ascending=not sort.startswith('-'), kind='stable',
+                          na_position='last', key=by_text)
+
+
+def create_matrix_app(open_repository, profile_balance, cache):
+    """Flask app serving /profile/<id>/ for every profile
+
+    open_repository(profile_id) returns the profile's shared TradeRepository and
+    profile_balance(profile_id) its current balance (None for unknown profiles).
+    """
+    app = Flask('matrix_app')
+    app.config['DEFAULT_PROFILE_ID'] = None
+
+    def load_data(repository, start=None):
+        # ALWAYS use profile-specific trades (shared, already-parsed frame)
+        try:
+            # Already typed by the trade schema (datetime Time, float PnL columns)
+            if start is None:
+                df = repository.frame().copy()
+            else:
+                # Time range via the repository's sorted time index
+                df = repository.trades_between(start).copy()
+            df['PnL'] = df['PnL'].fillna(0)
+            df['PnL %'] = df['PnL %'].fillna(0)
+            return df
+        except Exception as e:
+            print(f"Error loading trades: {e}")
+            # Return empty dataframe with proper columns
+            return pd.DataFrame(columns=['Time', 'Pair', 'PnL', 'Status', 'Outcome', 'Trade Size', 'PnL %'])
+
+    def metrics_for(repository, df, start, balance):
+        """All-time metrics come from the profile's running accumulator; date ranges are computed"""
+        # Current balance for display, and as the base of the % metrics
+        if start is None:
+            try:
+                return repository.matrix_metrics(balance, balance)
+            except Exception as e:
+                print(f"Error reading running metrics: {e}")
+        # Single vectorized pass (metrics_engine.compute_metrics); only CLOSED trades feed PnL stats
+        return compute_metrics(df, balance, balance)
+
+    def streaks_for(repository, df, start):
+        """Streak summary: running (all time) or one run-length pass over the range"""
+        if start is None:
+            try:
+                return repository.streak_summary()
+            except Exception as e:
+                print(f"Error reading running streaks: {e}")
+        return StreakStats.from_trades(df).summary()
+
+    def data_key(profile_id):
+        """(repository, balance, key prefix) of a profile, or None if unknown
+
+        The prefix changes whenever the trades or the balance do, so it keys
+        both the cache entries and the API ETags. id(repository) tells storage
+        backends of the same profile apart.
+        """
+        balance = profile_balance(profile_id)
+        if balance is None:
+            return None
+        repository = open_repository(profile_id)
+        return repository, balance, (profile_id, id(repository), repository.current_version(), balance)
+
+    def page_data(profile_id, filter_option):
+        """(trades, metrics, streaks) for a filter, from the cache while the trades are unchanged"""
+        context = data_key(profile_id)
+        if context is None:
+            return None
+        repository, balance, prefix = context
+        start = filter_start(filter_option)
+
+        def compute():
+            df = load_data(repository, start)
+            return df, metrics_for(repository, df, start, balance), streaks_for(repository, df, start)
+
+        return cache.get_or_compute(prefix + ('page', filter_option or 'all', start), compute)
+
+    def json_response(profile_id, params, build):
+        """JSON from build(key prefix) with an ETag of the data version; 304 if the client has it"""
+        try:
+            context = data_key(profile_id)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+        if context is None:
+            return jsonify({'error': f"Unknown profile {profile_id}"}), 404
+        etag = data_etag(context[2], params)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            try:
+                response = jsonify(build(context[2]))
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+        response.set_etag(etag)
+        # Revalidate every time; unchanged data costs a 304 and no body
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    @app.route('/')
+    def home():
+        profile_id = app.config['DEFAULT_PROFILE_ID']
+        if profile_id is None:
+            return "<h2>No profile opened yet</h2>", 404
+        return redirect(f"/profile/{profile_id}/")
+
+    @app.route('/profile/<int:profile_id>/', methods=['GET', 'POST'])
+    def index(profile_id):
+        filter_option = request.form.get('filter') if request.method == 'POST' else 'all'
+        try:
+            data = page_data(profile_id, filter_option)
+        except Exception as e:
+            return f"<h2>Could not load trades:</h2><pre>{e}</pre>"
+        if data is None:
+            return f"<h2>Unknown profile {profile_id}</h2>", 404
+        df, metrics, streaks = data
+        # O(months) from the profile's rollups, whatever the number of trades
+        months = open_repository(profile_id).rollup('month', filter_start(filter_option))
+        return render_template_string(MATRIX_TEMPLATE, metrics=metrics, streaks=streaks, months=months,
+                                      filter_option=filter_option or 'all')
+
+    @app.route('/profile/<int:profile_id>/save_report', methods=['GET', 'POST'])
+    def save_report(profile_id):
+        filter_option = request.values.get('filter')
+        fmt = request.values.get('format', 'txt')
+        details = request.values.get('details') in ('1', 'true', 'on')
+        if fmt not in REPORT_FORMATS:
+            return f"Unknown report format '{fmt}'", 400
+        try:
+            data = page_data(profile_id, filter_option)
+        except Exception as e:
+            return f"Error loading data: {e}"
+        if data is None:
+            return f"Unknown profile {profile_id}", 404
+        df, metrics, streaks = data
+
+        try:
+            chunks = iter_report(fmt, metrics, df if details else None)
+        except ValueError as e:
+            return str(e), 400
+        # Generator response: the report is sent chunk by chunk, never built whole
+        mimetype, filename = REPORT_FORMATS[fmt]
+        return Response(chunks, mimetype=mimetype, headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+    @app.route('/profile/<int:profile_id>/api/metrics')
+    def api_metrics(profile_id):
+        filter_option = request.args.get('filter', 'all')
+        start = filter_start(filter_option)
+
+        def build(prefix):
+            df, metrics, streaks = page_data(profile_id, filter_option)
+            return {
+                'filter': filter_option,
+                'metrics': {key: json_value(value) for key, value in metrics.items()},
+                'streaks': streaks,
+            }
+        return json_response(profile_id, ('metrics', filter_option, start), build)
+
+    @app.route('/profile/<int:profile_id>/api/trades')
+    def api_trades(profile_id):
+        filter_option = request.args.get('filter', 'all')
+        start = filter_start(filter_option)
+        sort = request.args.get('sort', '')
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+
+        def build(prefix):
+            df = page_data(profile_id, filter_option)[0]
+            # Sorted once per (version, filter, sort); pages are slices of it
+            ordered = cache.get_or_compute(prefix + ('sorted', filter_option, start, sort),
+                                           lambda: sort_trades(df, sort))
+            return {
+                'total': len(ordered),
+                'offset': offset,
+                'limit': limit,
+                'sort': sort,
+                'trades': trade_records(ordered.iloc[offset:offset + limit]),
+            }
+        return json_response(profile_id, ('trades', filter_option, start, sort, offset, limit), build)
+
+    @app.route('/profile/<int:profile_id>/api/rollup')
+    def api_rollup(profile_id):
+        period = request.args.get('period', 'day')
+        if period not in PERIODS:
+            return jsonify({'error': f"period must be one of {', '.join(PERIODS)}"}), 400
+        try:
+            start = parse_date_arg(request.args.get('start')) or filter_start(request.args.get('filter'))
+            end = parse_date_arg(request.args.get('end'))
+        except ValueError as e:
+            return jsonify({'error': f"start and end must be dates like 2024-01-31: {e}"}), 400
+
+        def build(prefix):
+            repository = open_repository(profile_id)
+            return {
+                'period': period,
+                'rows': repository.rollup(period, start, end),
+                'totals': repository.period_totals(start, end),
+            }
+        return json_response(profile_id, ('rollup', period, start, end), build)
+
+    @app.route('/profile/<int:profile_id>/api/equity')
+    def api_equity(profile_id):
+        filter_option = request.args.get('filter', 'all')
+        start = filter_start(filter_option)
+        points = request.args.get('points', DEFAULT_CHART_POINTS, type=int)
+
+        def build(prefix):
+            # LTTB-downsampled and cached by the repository (shared with the desktop chart)
+            curve = open_repository(profile_id).equity_curve(points=points, start=start)
+            times = curve['time']
+            return {
+                'filter': filter_option,
+                'total': curve['total'],
+                'time': [json_value(pd.Timestamp(t)) for t in times] if times is not None else None,
+                'trade': curve['trade'].tolist(),
+                'cumulative': curve['cumulative'].round(8).tolist(),
+            }
+        return json_response(profile_id, ('equity', filter_option, start, points), build)
+
+    @app.route('/cache_stats')
+    def cache_stats():
+        return jsonify(cache.stats())
+
+    return app
+
+
+class MatrixServer:
+    """Threaded WSGI server running the Matrix app on a background thread.
+
+    Started once and reused for every profile and every click; stop() shuts
+    it down and frees the port.
+    """
+
+    def __init__(self, open_repository, profile_balance, host='127.0.0.1'):
+        self.host = host
+        self.port = None
+        self.cache = MatrixCache(maxsize=MATRIX_CACHE_ENTRIES, max_bytes=MATRIX_CACHE_BYTES)
+        self.app = create_matrix_app(open_repository, profile_balance, self.cache)
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start serving if not already; returns (ok, base URL or error message)"""
+        with self._lock:
+            if self.is_running():
+                return True, self.base_url()
+            for port in MATRIX_PORTS:
+                try:
+                    server = make_server(self.host, port, self.app, threaded=True)
+                except OSError:
+                    continue  # port taken
+                self._server = server
+                self.port = port
+                self._thread = threading.Thread(target=server.serve_forever, name='matrix-server', daemon=True)
+                self._thread.start()
+                return True, self.base_url()
+            return False, f"No free port in {MATRIX_PORTS.start}-{MATRIX_PORTS.stop - 1}"
+
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    def profile_url(self, profile_id):
+        """Start (if needed) and return the Matrix URL of a profile; (ok, URL or error message)"""
+        ok, result = self.start()
+        if not ok:
+            return ok, result
+        self.app.config['DEFAULT_PROFILE_ID'] = profile_id
+        return True, f"{result}profile/{profile_id}/"
+
+    def stop(self, timeout=5.0):
+        with self._lock:
+            server, thread = self._server, self._thread
+            self._server = self._thread = None
+        if server is None:
+            return
+        try:
+            server.shutdown()
+            server.server_close()
+        except Exception as e:
+            print("Matrix server error:", e)
+        thread.join(timeout)
+
+
+_matrix_server = None
+_matrix_server_lock = threading.Lock()
+
+
+def get_matrix_server(open_repository, profile_balance):
+    """The process-wide MatrixServer (created on first use, not started)"""
+    global _matrix_server
+    with _matrix_server_lock:
+        if _matrix_server is None:
+            _matrix_server = MatrixServer(open_repository, profile_balance)
+        return _matrix_server
+
+
+def stop_matrix_server():
+    """Shut the process-wide server down, if one was created"""
+    with _matrix_server_lock:
+        server = _matrix_server
+    if server is not None:
+        server.stop()
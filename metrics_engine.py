@@ -0,0 +1,569 @@
+"""
+Metrics Engine
+Running per-profile trade statistics, updated in O(1) on every trade mutation
+"""
+
+import math
+import datetime
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from streak_analytics import StreakStats, streak_order, streak_key, WIN, LOSS, BREAK_EVEN
+from period_rollup import PeriodRollup
+
+
+# Keys of the Matrix metrics dictionary, in display order
+MATRIX_KEYS = [
+    'Acc. Return Net $', 'Acc. Return Gross $', 'Account Balance', 'Daily Return $',
+    'Return on Winners', 'Return on Losers', 'Return $ on Long', 'Return $ on Short',
+    'Biggest Profit $', 'Biggest Loss $', 'Profit/Loss Ratio', 'Profit Factor',
+    'Trade $ Expectancy', 'Win %', 'Loss %', 'BE %', 'Open %', 'Acc. Return %',
+    'Biggest % Profit', 'Biggest % Loser', 'Return per Share', 'Kelly Criterion',
+    'Avg Return', 'Avg Return $', 'Return/Size', 'Avg $ on Winners', 'Avg $ on Losers',
+    'Avg Daily P&L', 'Avg Return %', 'Avg % Return', 'Avg % on Shorts', 'Avg % on Long',
+    'Avg % on Winners', 'Avg % on Losers', 'Trades', 'Total Winner', 'Total Open Trades',
+    'Tot. Closed Trades', 'Total Losers', 'Total BE', 'Max Consec. Loss', 'Max Consec. Win',
+    'Max Consec. BE', 'Current Streak', 'Avg Win Streak', 'Avg Loss Streak',
+    'PnL Std Dev', 'PnL Std Dev (W)', 'PnL Std Dev (L)', 'SQN'
+]
+
+# Shares used for 'Return per Share'
+TOTAL_SHARES = 100
+
+NAN = float('nan')
+
+
+def empty_metrics(current_balance):
+    """Matrix metrics of a profile without trades"""
+    metrics = dict.fromkeys(MATRIX_KEYS, 0)
+    metrics['Account Balance'] = current_balance
+    return metrics
+
+
+def _codes(series, categories):
+    """Integer code per row (-1 for anything not in categories)"""
+    return pd.Index(categories).get_indexer(series.astype(object)).astype(np.intp)
+
+
+def _group_stats(codes, values, groups):
+    """Per-group count, sum, mean and sample std in two bincount passes"""
+    count = np.bincount(codes, minlength=groups).astype(float)
+    total = np.bincount(codes, weights=values, minlength=groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, total / count, np.nan)
+        deviation = values - mean[codes]
+        squares = np.bincount(codes, weights=deviation * deviation, minlength=groups)
+        std = np.where(count > 1, np.sqrt(squares / (count - 1)), np.nan)
+    return count, total, mean, std
+
+
+def _masked_max(values, mask):
+    return float(values[mask].max()) if mask.any() else NAN
+
+
+def _masked_min(values, mask):
+    return float(values[mask].min()) if mask.any() else NAN
+
+
+OUTCOMES = ['Win', 'Loss', 'Break Even']
+POSITIONS = ['Long Position', 'Short Position']
+
+
+def compute_metrics(df, current_balance, start_balance, today=None):
+    """Matrix metrics of a trades frame in one vectorized pass (same keys as MATRIX_KEYS)
+
+    Closed trades count a missing PnL / PnL % as 0.
+    """
+    if df is None or df.empty:
+        return empty_metrics(current_balance)
+    today = today or datetime.datetime.now().date()
+    trades = len(df)
+
+    # Column -> NumPy once; every statistic below is a bincount or a masked reduction
+    status = _codes(df['Status'], ['Running', 'Closed'])
+    outcome = _codes(df['Outcome'], OUTCOMES)
+    closed = status == 1
+    c_outcome = outcome[closed] + 1                       # 0 = other, 1 = Win, 2 = Loss, 3 = BE
+    c_position = _codes(df['Position Type'], POSITIONS)[closed] + 1
+    c_pnl = np.nan_to_num(pd.to_numeric(df['PnL'], errors='coerce').to_numpy(dtype=float)[closed], nan=0.0)
+    c_pct = np.nan_to_num(pd.to_numeric(df['PnL %'], errors='coerce').to_numpy(dtype=float)[closed], nan=0.0)
+    c_size = pd.to_numeric(df['Trade Size'], errors='coerce').to_numpy(dtype=float)[closed]
+    c_times = df['Time'].to_numpy(dtype='datetime64[ns]')[closed]
+
+    outcome_counts = np.bincount(outcome + 1, minlength=4)
+    status_counts = np.bincount(status + 1, minlength=3)
+    n_closed = len(c_pnl)
+    has_closed = n_closed > 0
+
+    pnl_total = c_pnl.sum()
+    pnl_mean = c_pnl.mean() if has_closed else NAN
+    pnl_std = c_pnl.std(ddof=1) if n_closed > 1 else NAN
+    pct_mean = c_pct.mean() if has_closed else NAN
+    _, pnl_by_outcome, pnl_mean_by_outcome, pnl_std_by_outcome = _group_stats(c_outcome, c_pnl, 4)
+    _, _, pct_mean_by_outcome, _ = _group_stats(c_outcome, c_pct, 4)
+    _, pnl_by_position, _, _ = _group_stats(c_position, c_pnl, 3)
+    _, _, pct_mean_by_position, _ = _group_stats(c_position, c_pct, 3)
+
+    day_start = np.datetime64(today, 'ns')
+    today_mask = (c_times >= day_start) & (c_times < day_start + np.timedelta64(1, 'D'))
+    streaks = StreakStats(c_pnl[streak_order(c_times, df.index.to_numpy()[closed])])
+
+    def when_closed(value):
+        return float(value) if has_closed else 0
+
+    m = {}
+    m['Acc. Return Net $'] = when_closed(pnl_total)
+    m['Acc. Return Gross $'] = when_closed(np.abs(c_pnl).sum())
+    m['Account Balance'] = current_balance
+    daily_return = when_closed(c_pnl[today_mask].sum())
+    m['Daily Return $'] = round(daily_return, 2)
+    m['Return on Winners'] = when_closed(pnl_by_outcome[1])
+    m['Return on Losers'] = when_closed(pnl_by_outcome[2])
+    m['Return $ on Long'] = when_closed(pnl_by_position[1])
+    m['Return $ on Short'] = when_closed(pnl_by_position[2])
+    m['Biggest Profit $'] = when_closed(_masked_max(c_pnl, c_pnl > 0))
+    m['Biggest Loss $'] = when_closed(_masked_min(c_pnl, c_pnl < 0))
+    if m['Return on Losers'] != 0:
+        m['Profit/Loss Ratio'] = abs(m['Return on Winners']) / abs(m['Return on Losers'])
+        m['Profit Factor'] = m['Return on Winners'] / abs(m['Return on Losers'])
+    else:
+        m['Profit/Loss Ratio'] = 0
+        m['Profit Factor'] = 0
+    m['Trade $ Expectancy'] = when_closed(pnl_mean)
+    m['Win %'] = outcome_counts[1] / trades * 100
+    m['Loss %'] = outcome_counts[2] / trades * 100
+    m['BE %'] = outcome_counts[3] / trades * 100
+    m['Open %'] = status_counts[1] / trades * 100
+    m['Acc. Return %'] = (m['Acc. Return Net $'] / start_balance) * 100 if start_balance else 0
+    m['Biggest % Profit'] = when_closed(_masked_max(c_pct, c_pct > 0))
+    m['Biggest % Loser'] = when_closed(_masked_min(c_pct, c_pct < 0))
+    m['Return per Share'] = m['Acc. Return Net $'] / TOTAL_SHARES
+    if m['Profit/Loss Ratio'] != 0:
+        m['Kelly Criterion'] = (m['Win %'] / 100 * (m['Profit/Loss Ratio'] + 1) - 1) / m['Profit/Loss Ratio']
+    else:
+        m['Kelly Criterion'] = 0
+    m['Avg Return'] = when_closed(pct_mean)
+    m['Avg Return $'] = when_closed(pnl_mean)
+    size_total = np.nansum(c_size)
+    m['Return/Size'] = m['Acc. Return Net $'] / size_total if has_closed and size_total != 0 else 0
+    m['Avg $ on Winners'] = when_closed(pnl_mean_by_outcome[1])
+    m['Avg $ on Losers'] = when_closed(pnl_mean_by_outcome[2])
+    m['Avg Daily P&L'] = daily_return
+    m['Avg Return %'] = m['Avg Return']
+    m['Avg % Return'] = m['Avg Return']
+    m['Avg % on Shorts'] = when_closed(pct_mean_by_position[2])
+    m['Avg % on Long'] = when_closed(pct_mean_by_position[1])
+    m['Avg % on Winners'] = when_closed(pct_mean_by_outcome[1])
+    m['Avg % on Losers'] = when_closed(pct_mean_by_outcome[2])
+    m['Trades'] = trades
+    m['Total Winner'] = int(outcome_counts[1])
+    m['Total Open Trades'] = int(status_counts[1])
+    m['Tot. Closed Trades'] = int(status_counts[2])
+    m['Total Losers'] = int(outcome_counts[2])
+    m['Total BE'] = int(outcome_counts[3])
+    _streak_metrics(m, streaks)
+    m['PnL Std Dev'] = when_closed(pnl_std)
+    m['PnL Std Dev (W)'] = when_closed(pnl_std_by_outcome[1])
+    m['PnL Std Dev (L)'] = when_closed(pnl_std_by_outcome[2])
+    pnl_std_dev = m['PnL Std Dev'] if m['PnL Std Dev'] else 0
+    m['SQN'] = (m['Avg Return $'] / pnl_std_dev * (m['Trades'] ** 0.5)) if pnl_std_dev != 0 else 0
+    return m
+
+
+def _streak_metrics(metrics, streaks):
+    metrics['Max Consec. Loss'] = streaks.longest[LOSS]
+    metrics['Max Consec. Win'] = streaks.longest[WIN]
+    metrics['Max Consec. BE'] = streaks.longest[BREAK_EVEN]
+    metrics['Current Streak'] = streaks.current()
+    metrics['Avg Win Streak'] = streaks.average(WIN)
+    metrics['Avg Loss Streak'] = streaks.average(LOSS)
+
+
+def _number(value):
+    """float, with missing values as NaN"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return NAN
+    return value
+
+
+def _text(value):
+    return '' if value is None or (isinstance(value, float) and math.isnan(value)) else str(value)
+
+
+def _day(value):
+    if value is None or pd.isna(value):
+        return None
+    return pd.Timestamp(value).date()
+
+
+class RunningStats:
+    """Count, sum, sum of squares and extremes of a stream of numbers
+
+    The extremes carry how often they occur, so taking out one of several
+    equal maxima (e.g. the 0 PnL of many running trades) stays O(1).
+    """
+    __slots__ = ('count', 'total', 'total_sq', 'high', 'low', 'high_count', 'low_count')
+
+    def __init__(self, values=None):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.high = None
+        self.low = None
+        self.high_count = 0
+        self.low_count = 0
+        if values is not None and len(values):
+            values = np.asarray(values, dtype=float)
+            self.count = len(values)
+            self.total = float(values.sum())
+            self.total_sq = float(np.dot(values, values))
+            self.high = float(values.max())
+            self.low = float(values.min())
+            self.high_count = int(np.count_nonzero(values == self.high))
+            self.low_count = int(np.count_nonzero(values == self.low))
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        if self.high is None or value > self.high:
+            self.high, self.high_count = value, 1
+        elif value == self.high:
+            self.high_count += 1
+        if self.low is None or value < self.low:
+            self.low, self.low_count = value, 1
+        elif value == self.low:
+            self.low_count += 1
+
+    def remove(self, value):
+        """Take a value out again; False if it was the last copy of an extreme (the stats must be rebuilt)"""
+        self.count -= 1
+        if self.count == 0:
+            self.total = self.total_sq = 0.0
+            self.high = self.low = None
+            self.high_count = self.low_count = 0
+            return True
+        self.total -= value
+        self.total_sq -= value * value
+        ok = True
+        if value == self.high:
+            self.high_count -= 1
+            ok = self.high_count > 0
+        if value == self.low:
+            self.low_count -= 1
+            ok = ok and self.low_count > 0
+        return ok
+
+    def mean(self):
+        return self.total / self.count if self.count else NAN
+
+    def std(self):
+        """Sample standard deviation (ddof=1, like pandas)"""
+        if self.count < 2:
+            return NAN
+        variance = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def max(self):
+        return NAN if self.high is None else self.high
+
+    def min(self):
+        return NAN if self.low is None else self.low
+
+
+class MetricsAccumulator:
+    """Running sums, counts, sums of squares, extremes and streak state for one profile.
+
+    add()/remove()/replace() adjust the aggregates for a single trade in O(1).
+    Removing a value that is currently a maximum or minimum cannot be undone
+    from the aggregates alone, so those calls fall back to rebuild() over the
+    frame they are given; so does the win/loss streak when a closed trade is
+    inserted, changed or removed anywhere but at the end of the closed trades
+    in time order.
+
+    Closed trades count a missing PnL / PnL % as 0, exactly like the Matrix page.
+    """
+
+    def __init__(self, df=None):
+        self.rebuild(df)
+
+    # ---------- full pass ----------
+    def rebuild(self, df, periods=None):
+        """Recompute every aggregate from a typed trades frame
+
+        periods: an up-to-date PeriodRollup (e.g. read back from disk) to use
+        instead of regrouping the frame.
+        """
+        self.trades = 0
+        self.outcomes = Counter()
+        self.statuses = Counter()
+        self.pnl_all = RunningStats()       # all trades, missing PnL as 0
+        self.pnl_all_wins = RunningStats()  # all trades with PnL > 0
+        self.pnl_all_losses = RunningStats()
+        self.pct_all = RunningStats()       # all trades with a PnL %
+        self.closed_pnl = RunningStats()
+        self.closed_pct = RunningStats()
+        self.closed_abs_total = 0.0
+        self.closed_size_total = 0.0
+        self.closed_gains = RunningStats()  # closed PnL > 0
+        self.closed_drops = RunningStats()  # closed PnL < 0
+        self.closed_pct_gains = RunningStats()
+        self.closed_pct_drops = RunningStats()
+        self.pnl_by_outcome = {}
+        self.pct_by_outcome = {}
+        self.pnl_by_position = {}
+        self.pct_by_position = {}
+        self.periods = PeriodRollup()       # closed trades per day / week / month
+        self._reset_streaks()
+        if df is None or df.empty:
+            return
+
+        status = df['Status'].astype(str).to_numpy()
+        outcome = df['Outcome'].astype(str).to_numpy()
+        position = df['Position Type'].astype(str).to_numpy()
+        pnl = pd.to_numeric(df['PnL'], errors='coerce').to_numpy(dtype=float)
+        pct = pd.to_numeric(df['PnL %'], errors='coerce').to_numpy(dtype=float)
+        size = pd.to_numeric(df['Trade Size'], errors='coerce').to_numpy(dtype=float)
+
+        self.trades = len(df)
+        self.outcomes.update(outcome.tolist())
+        self.statuses.update(status.tolist())
+        pnl0 = np.nan_to_num(pnl, nan=0.0)
+        self.pnl_all = RunningStats(pnl0)
+        self.pnl_all_wins = RunningStats(pnl0[pnl0 > 0])
+        self.pnl_all_losses = RunningStats(pnl0[pnl0 < 0])
+        self.pct_all = RunningStats(pct[~np.isnan(pct)])
+
+        closed = status == 'Closed'
+        c_pnl = pnl0[closed]
+        c_pct = np.nan_to_num(pct[closed], nan=0.0)
+        c_size = size[closed]
+        self.closed_pnl = RunningStats(c_pnl)
+        self.closed_pct = RunningStats(c_pct)
+        self.closed_abs_total = float(np.abs(c_pnl).sum())
+        self.closed_size_total = float(np.nansum(c_size))
+        self.closed_gains = RunningStats(c_pnl[c_pnl > 0])
+        self.closed_drops = RunningStats(c_pnl[c_pnl < 0])
+        self.closed_pct_gains = RunningStats(c_pct[c_pct > 0])
+        self.closed_pct_drops = RunningStats(c_pct[c_pct < 0])
+        for groups_pnl, groups_pct, keys in (
+            (self.pnl_by_outcome, self.pct_by_outcome, outcome[closed]),
+            (self.pnl_by_position, self.pct_by_position, position[closed]),
+        ):
+            for key in np.unique(keys):
+                mask = keys == key
+                groups_pnl[key] = RunningStats(c_pnl[mask])
+                groups_pct[key] = RunningStats(c_pct[mask])
+        self.periods = periods if periods is not None else PeriodRollup.from_trades(df)
+        self._rebuild_streaks(df)
+
+    # ---------- streaks ----------
+    def _reset_streaks(self):
+        self.streaks = StreakStats()
+        self.last_closed_key = None  # streak_key of the last closed trade
+
+    def _extend_streak(self, key, pnl):
+        self.streaks.push(pnl)
+        self.last_closed_key = key
+
+    def _rebuild_streaks(self, df):
+        self._reset_streaks()
+        if df is None or df.empty:
+            return
+        closed = df[df['Status'] == 'Closed']
+        if closed.empty:
+            return
+        times = pd.to_datetime(closed['Time'], errors='coerce')
+        order = streak_order(times, closed.index)
+        self.streaks = StreakStats(pd.to_numeric(closed['PnL'], errors='coerce').to_numpy(dtype=float)[order])
+        last = order[-1]
+        self.last_closed_key = streak_key(times.iloc[last], closed.index[last])
+
+    # ---------- single-trade updates ----------
+    def _contribute(self, row, remove=False):
+        """Add (or take out) one trade; returns False if an extreme was removed"""
+        ok = True
+
+        def put(stats, value):
+            nonlocal ok
+            if remove:
+                ok = stats.remove(value) and ok
+            else:
+                stats.add(value)
+
+        step = -1 if remove else 1
+        status = _text(row.get('Status'))
+        outcome = _text(row.get('Outcome'))
+        position = _text(row.get('Position Type'))
+        pnl = _number(row.get('PnL'))
+        pct = _number(row.get('PnL %'))
+        pnl0 = 0.0 if math.isnan(pnl) else pnl
+
+        self.trades += step
+        self.outcomes[outcome] += step
+        self.statuses[status] += step
+        put(self.pnl_all, pnl0)
+        if pnl0 > 0:
+            put(self.pnl_all_wins, pnl0)
+        elif pnl0 < 0:
+            put(self.pnl_all_losses, pnl0)
+        if not math.isnan(pct):
+            put(self.pct_all, pct)
+
+        if status == 'Closed':
+            pct0 = 0.0 if math.isnan(pct) else pct
+            size = _number(row.get('Trade Size'))
+            put(self.closed_pnl, pnl0)
+            put(self.closed_pct, pct0)
+            self.closed_abs_total += step * abs(pnl0)
+            if not math.isnan(size):
+                self.closed_size_total += step * size
+            if pnl0 > 0:
+                put(self.closed_gains, pnl0)
+            elif pnl0 < 0:
+                put(self.closed_drops, pnl0)
+            if pct0 > 0:
+                put(self.closed_pct_gains, pct0)
+            elif pct0 < 0:
+                put(self.closed_pct_drops, pct0)
+            put(self.pnl_by_outcome.setdefault(outcome, RunningStats()), pnl0)
+            put(self.pct_by_outcome.setdefault(outcome, RunningStats()), pct0)
+            put(self.pnl_by_position.setdefault(position, RunningStats()), pnl0)
+            put(self.pct_by_position.setdefault(position, RunningStats()), pct0)
+            day = _day(row.get('Time'))
+            size0 = 0.0 if math.isnan(size) else size
+            if remove:
+                ok = self.periods.remove(day, pnl0, pct0, size0) and ok
+            else:
+                self.periods.add(day, pnl0, pct0, size0)
+        return ok
+
+    def _is_last_closed(self, key):
+        return self.last_closed_key is None or key > self.last_closed_key
+
+    def add(self, trade_id, row, df):
+        """A trade was inserted; df is the frame after the insert"""
+        self._contribute(row)
+        if _text(row.get('Status')) == 'Closed':
+            key = streak_key(row.get('Time'), trade_id)
+            if self._is_last_closed(key):
+                self._extend_streak(key, _number(row.get('PnL')))
+            else:
+                self._rebuild_streaks(df)
+
+    def remove(self, trade_id, row, df):
+        """A trade was deleted; df is the frame after the delete"""
+        if not self._contribute(row, remove=True):
+            self.rebuild(df)
+        elif _text(row.get('Status')) == 'Closed':
+            self._rebuild_streaks(df)
+
+    def replace(self, trade_id, old_row, new_row, df):
+        """A trade was updated; df is the frame after the update"""
+        if not self._contribute(old_row, remove=True):
+            self.rebuild(df)
+            return
+        self._contribute(new_row)
+        was_closed = _text(old_row.get('Status')) == 'Closed'
+        is_closed = _text(new_row.get('Status')) == 'Closed'
+        if not was_closed and not is_closed:
+            return
+        key = streak_key(new_row.get('Time'), trade_id)
+        if not was_closed and self._is_last_closed(key):
+            new_pnl = _number(new_row.get('PnL'))
+            self._extend_streak(key, new_pnl)
+        else:
+            self._rebuild_streaks(df)
+
+    # ---------- results ----------
+    def dashboard(self):
+        """Numbers behind the dashboard cards"""
+        wins = self.outcomes['Win']
+        losses = self.outcomes['Loss']
+        loss_sum = abs(self.pnl_all_losses.total)
+        return {
+            'total_trades': self.trades,
+            'wins': wins,
+            'losses': losses,
+            'win_rate': wins / self.trades * 100 if self.trades else 0,
+            'avg_pnl': self.pct_all.mean() if self.pct_all.count else 0,
+            'profit_factor': self.pnl_all_wins.total / loss_sum if loss_sum else 0,
+            'biggest_win': self.pnl_all.max() if self.trades else 0,
+            'biggest_loss': self.pnl_all.min() if self.trades else 0,
+            'streaks': self.streaks.summary(),
+        }
+
+    def matrix(self, current_balance, start_balance, today=None):
+        """The Matrix page's metrics dictionary (same keys and values as calculate_metrics)"""
+        if not self.trades:
+            return empty_metrics(current_balance)
+        today = today or datetime.datetime.now().date()
+        closed = self.closed_pnl.count > 0
+        none = RunningStats()
+
+        def by(groups, key):
+            return groups.get(key, none)
+
+        def when_closed(value):
+            return value if closed else 0
+
+        m = {}
+        m['Acc. Return Net $'] = when_closed(self.closed_pnl.total)
+        m['Acc. Return Gross $'] = when_closed(self.closed_abs_total)
+        m['Account Balance'] = current_balance
+        daily_return = when_closed(self.periods.get('day', today).pnl)
+        m['Daily Return $'] = round(daily_return, 2)
+        m['Return on Winners'] = when_closed(by(self.pnl_by_outcome, 'Win').total)
+        m['Return on Losers'] = when_closed(by(self.pnl_by_outcome, 'Loss').total)
+        m['Return $ on Long'] = when_closed(by(self.pnl_by_position, 'Long Position').total)
+        m['Return $ on Short'] = when_closed(by(self.pnl_by_position, 'Short Position').total)
+        m['Biggest Profit $'] = when_closed(self.closed_gains.max())
+        m['Biggest Loss $'] = when_closed(self.closed_drops.min())
+        if m['Return on Losers'] != 0:
+            m['Profit/Loss Ratio'] = abs(m['Return on Winners']) / abs(m['Return on Losers'])
+            m['Profit Factor'] = m['Return on Winners'] / abs(m['Return on Losers'])
+        else:
+            m['Profit/Loss Ratio'] = 0
+            m['Profit Factor'] = 0
+        m['Trade $ Expectancy'] = when_closed(self.closed_pnl.mean())
+        m['Win %'] = self.outcomes['Win'] / self.trades * 100
+        m['Loss %'] = self.outcomes['Loss'] / self.trades * 100
+        m['BE %'] = self.outcomes['Break Even'] / self.trades * 100
+        m['Open %'] = self.statuses['Running'] / self.trades * 100
+        m['Acc. Return %'] = (m['Acc. Return Net $'] / start_balance) * 100 if start_balance else 0
+        m['Biggest % Profit'] = when_closed(self.closed_pct_gains.max())
+        m['Biggest % Loser'] = when_closed(self.closed_pct_drops.min())
+        m['Return per Share'] = m['Acc. Return Net $'] / TOTAL_SHARES
+        if m['Profit/Loss Ratio'] != 0:
+            m['Kelly Criterion'] = (m['Win %'] / 100 * (m['Profit/Loss Ratio'] + 1) - 1) / m['Profit/Loss Ratio']
+        else:
+            m['Kelly Criterion'] = 0
+        m['Avg Return'] = when_closed(self.closed_pct.mean())
+        m['Avg Return $'] = when_closed(self.closed_pnl.mean())
+        m['Return/Size'] = m['Acc. Return Net $'] / self.closed_size_total if closed and self.closed_size_total != 0 else 0
+        m['Avg $ on Winners'] = when_closed(by(self.pnl_by_outcome, 'Win').mean())
+        m['Avg $ on Losers'] = when_closed(by(self.pnl_by_outcome, 'Loss').mean())
+        m['Avg Daily P&L'] = daily_return
+        m['Avg Return %'] = when_closed(self.closed_pct.mean())
+        m['Avg % Return'] = m['Avg Return %']
+        m['Avg % on Shorts'] = when_closed(by(self.pct_by_position, 'Short Position').mean())
+        m['Avg % on Long'] = when_closed(by(self.pct_by_position, 'Long Position').mean())
+        m['Avg % on Winners'] = when_closed(by(self.pct_by_outcome, 'Win').mean())
+        m['Avg % on Losers'] = when_closed(by(self.pct_by_outcome, 'Loss').mean())
+        m['Trades'] = self.trades
+        m['Total Winner'] = self.outcomes['Win']
+        m['Total Open Trades'] = self.statuses['Running']
+        m['Tot. Closed Trades'] = self.statuses['Closed']
+        m['Total Losers'] = self.outcomes['Loss']
+        m['Total BE'] = self.outcomes['Break Even']
+        _streak_metrics(m, self.streaks)
+        m['PnL Std Dev'] = when_closed(self.closed_pnl.std())
+        m['PnL Std Dev (W)'] = when_closed(by(self.pnl_by_outcome, 'Win').std())
+        m['PnL Std Dev (L)'] = when_closed(by(self.pnl_by_outcome, 'Loss').std())
+        pnl_std = m['PnL Std Dev'] if m['PnL Std Dev'] else 0
+        m['SQN'] = (m['Avg Return $'] / pnl_std * (m['Trades'] ** 0.5)) if pnl_std != 0 else 0
+        return m
@@ -0,0 +1,280 @@
+"""
+Period Rollup
+Per-day, per-ISO-week and per-month aggregates of closed trades
+"""
+
+import os
+import json
+import datetime
+
+import numpy as np
+import pandas as pd
+
+
+PERIODS = ('day', 'week', 'month')
+
+
+def period_start(period, day):
+    """First day of the day / ISO week (Monday) / month containing a date"""
+    if period == 'day':
+        return day
+    if period == 'week':
+        return day - datetime.timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    raise ValueError(f"Unknown period '{period}'")
+
+
+def period_label(period, start):
+    """'2024-01-31', '2024-W05' or '2024-01'"""
+    if period == 'week':
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == 'month':
+        return start.strftime('%Y-%m')
+    return start.isoformat()
+
+
+def _to_date(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+class PeriodStats:
+    """Count, wins, losses, PnL / PnL % sums, PnL extremes and volume of one period
+
+    Like RunningStats, the PnL extremes carry how many trades share them.
+    """
+    __slots__ = ('count', 'wins', 'losses', 'pnl', 'pnl_pct', 'low', 'high', 'volume', 'low_count', 'high_count')
+
+    def __init__(self, count=0, wins=0, losses=0, pnl=0.0, pnl_pct=0.0, low=None, high=None, volume=0.0,
+                 low_count=None, high_count=None):
+        self.count = count
+        self.wins = wins
+        self.losses = losses
+        self.pnl = pnl
+        self.pnl_pct = pnl_pct
+        self.low = low
+        self.high = high
+        self.volume = volume
+        # Unknown counts (older rollups.json): assume one trade, which at worst rebuilds early
+        self.low_count = (1 if low is not None else 0) if low_count is None else low_count
+        self.high_count = (1 if high is not None else 0) if high_count is None else high_count
+
+    def add(self, pnl, pct, size):
+        self.count += 1
+        self.wins += pnl > 0
+        self.losses += pnl < 0
+        self.pnl += pnl
+        self.pnl_pct += pct
+        self.volume += size
+        if self.low is None or pnl < self.low:
+            self.low, self.low_count = pnl, 1
+        elif pnl == self.low:
+            self.low_count += 1
+        if self.high is None or pnl > self.high:
+            self.high, self.high_count = pnl, 1
+        elif pnl == self.high:
+            self.high_count += 1
+
+    def remove(self, pnl, pct, size):
+        """Take a trade out again; False if its PnL was the last copy of an extreme (the period must be rebuilt)"""
+        self.count -= 1
+        self.wins -= pnl > 0
+        self.losses -= pnl < 0
+        self.pnl -= pnl
+        self.pnl_pct -= pct
+        self.volume -= size
+        if self.count == 0:
+            self.pnl = self.pnl_pct = self.volume = 0.0
+            self.low = self.high = None
+            self.low_count = self.high_count = 0
+            return True
+        ok = True
+        if pnl == self.low:
+            self.low_count -= 1
+            ok = self.low_count > 0
+        if pnl == self.high:
+            self.high_count -= 1
+            ok = ok and self.high_count > 0
+        return ok
+
+    def to_dict(self):
+        return {
+            'trades': self.count, 'wins': self.wins, 'losses': self.losses,
+            'pnl': self.pnl, 'pnl_pct': self.pnl_pct,
+            'min_pnl': self.low, 'max_pnl': self.high, 'volume': self.volume,
+        }
+
+    def to_json(self):
+        """to_dict() plus the extreme counts, for rollups.json"""
+        data = self.to_dict()
+        data['min_pnl_trades'] = self.low_count
+        data['max_pnl_trades'] = self.high_count
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['trades'], data['wins'], data['losses'], data['pnl'], data['pnl_pct'],
+                   data['min_pnl'], data['max_pnl'], data['volume'],
+                   data.get('min_pnl_trades'), data.get('max_pnl_trades'))
+
+
+class PeriodRollup:
+    """Closed-trade aggregates per day, ISO week and month, keyed by the period's first day.
+
+    Built from a frame in one grouped pass, then kept current with add() and
+    remove() in O(1) per trade. A win / loss is a positive / negative PnL;
+    missing PnL, PnL % and Trade Size count as 0 and trades without a Time
+    are left out. Range queries touch only the periods, never the trades.
+    """
+
+    def __init__(self):
+        self.periods = {period: {} for period in PERIODS}
+
+    @classmethod
+    def from_trades(cls, df):
+        rollup = cls()
+        if df is None or df.empty:
+            return rollup
+        closed = (df['Status'] == 'Closed').to_numpy() & df['Time'].notna().to_numpy()
+        if not closed.any():
+            return rollup
+        days = df['Time'].to_numpy(dtype='datetime64[ns]')[closed].astype('datetime64[D]')
+        pnl = np.nan_to_num(df['PnL'].to_numpy(dtype=float, na_value=np.nan)[closed], nan=0.0)
+        frame = pd.DataFrame({
+            'pnl': pnl,
+            'pct': np.nan_to_num(df['PnL %'].to_numpy(dtype=float, na_value=np.nan)[closed], nan=0.0),
+            'size': np.nan_to_num(df['Trade Size'].to_numpy(dtype=float, na_value=np.nan)[closed], nan=0.0),
+            'win': pnl > 0,
+            'loss': pnl < 0,
+        })
+        # Monday of the ISO week: 1970-01-01 was a Thursday
+        weekday = (days.astype('int64') + 3) % 7
+        starts = {
+            'day': days,
+            'week': days - weekday.astype('timedelta64[D]'),
+            'month': days.astype('datetime64[M]').astype('datetime64[D]'),
+        }
+        for period, keys in starts.items():
+            by_period = frame.groupby(keys)['pnl']
+            frame['at_low'] = frame['pnl'] == by_period.transform('min')
+            frame['at_high'] = frame['pnl'] == by_period.transform('max')
+            groups = frame.groupby(keys).agg(
+                count=('pnl', 'size'), wins=('win', 'sum'), losses=('loss', 'sum'),
+                pnl=('pnl', 'sum'), pct=('pct', 'sum'), low=('pnl', 'min'), high=('pnl', 'max'),
+                volume=('size', 'sum'), low_count=('at_low', 'sum'), high_count=('at_high', 'sum'))
+            rollup.periods[period] = {
+                key.date(): PeriodStats(int(g.count), int(g.wins), int(g.losses), float(g.pnl),
+                                        float(g.pct), float(g.low), float(g.high), float(g.volume),
+                                        int(g.low_count), int(g.high_count))
+                for key, g in zip(groups.index, groups.itertuples(index=False))
+            }
+        return rollup
+
+    # ---------- single-trade updates ----------
+    def add(self, time, pnl, pct, size):
+        day = _to_date(time)
+        if day is None:
+            return
+        for period, stats in self.periods.items():
+            stats.setdefault(period_start(period, day), PeriodStats()).add(pnl, pct, size)
+
+    def remove(self, time, pnl, pct, size):
+        """False if an extreme was removed from some period (rebuild from the frame)"""
+        day = _to_date(time)
+        if day is None:
+            return True
+        ok = True
+        for period, stats in self.periods.items():
+            key = period_start(period, day)
+            bucket = stats.get(key)
+            if bucket is None:
+                continue
+            ok = bucket.remove(pnl, pct, size) and ok
+            if bucket.count == 0:
+                del stats[key]
+        return ok
+
+    # ---------- queries ----------
+    def get(self, period, day):
+        """PeriodStats of the period containing a date (empty stats if it has no trades)"""
+        day = _to_date(day)
+        return self.periods[period].get(period_start(period, day), PeriodStats())
+
+    def between(self, period, start=None, end=None):
+        """Rows for the periods starting in [start, end), oldest first"""
+        start, end = _to_date(start), _to_date(end)
+        rows = []
+        for key in sorted(self.periods[period]):
+            if (start is None or key >= period_start(period, start)) and (end is None or key < end):
+                row = {'period': period_label(period, key), 'start': key.isoformat()}
+                row.update(self.periods[period][key].to_dict())
+                rows.append(row)
+        return rows
+
+    def totals(self, start=None, end=None):
+        """One PeriodStats summing the days in [start, end)"""
+        start, end = _to_date(start), _to_date(end)
+        total = PeriodStats()
+        for key, stats in self.periods['day'].items():
+            if (start is None or key >= start) and (end is None or key < end):
+                total.count += stats.count
+                total.wins += stats.wins
+                total.losses += stats.losses
+                total.pnl += stats.pnl
+                total.pnl_pct += stats.pnl_pct
+                total.volume += stats.volume
+                total.low = stats.low if total.low is None else min(total.low, stats.low)
+                total.high = stats.high if total.high is None else max(total.high, stats.high)
+        return total
+
+    # ---------- persistence ----------
+    def to_json(self):
+        return {period: {key.isoformat(): stats.to_json() for key, stats in buckets.items()}
+                for period, buckets in self.periods.items()}
+
+    @classmethod
+    def from_json(cls, data):
+        rollup = cls()
+        for period in PERIODS:
+            rollup.periods[period] = {datetime.date.fromisoformat(key): PeriodStats.from_dict(stats)
+                                      for key, stats in data.get(period, {}).items()}
+        return rollup
+
+
+class RollupSidecar:
+    """rollups.json next to the trade store, stamped with the store's (mtime, size)"""
+
+    def __init__(self, profile_path):
+        self.path = os.path.join(profile_path, 'rollups.json')
+
+    def read(self, stamp):
+        """Persisted rollup if it was written for this store stamp, else None"""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except Exception:
+            return None
+        if data.get('source_stamp') != json.loads(json.dumps(stamp)):
+            return None
+        try:
+            return PeriodRollup.from_json(data['periods'])
+        except Exception as e:
+            print(f"Error reading {self.path}: {e}")
+            return None
+
+    def write(self, periods_json, stamp):
+        """Write a PeriodRollup.to_json() snapshot for a store stamp"""
+        try:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'source_stamp': stamp, 'periods': periods_json}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error writing {self.path}: {e}")
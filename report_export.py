@@ -0,0 +1,158 @@
+"""
+Report Export
+Streaming txt / csv / json / xlsx Matrix reports, one chunk of trades at a time
+"""
+
+import os
+import csv
+import json
+import tempfile
+from io import StringIO
+from datetime import datetime
+
+import pandas as pd
+
+from trade_schema import TIME_FORMAT
+
+# Write-only workbooks for the xlsx variant (optional)
+try:
+    from openpyxl import Workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+
+# format -> (mimetype, download name)
+REPORT_FORMATS = {
+    'txt': ('text/plain', 'report.txt'),
+    'csv': ('text/csv', 'report.csv'),
+    'json': ('application/json', 'report.json'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'report.xlsx'),
+}
+
+# Trades converted per chunk; bounds the memory of a detailed export
+CHUNK_ROWS = 5000
+
+# Bytes per chunk when streaming the finished workbook
+FILE_CHUNK_BYTES = 64 * 1024
+
+
+def json_value(value):
+    """JSON-safe scalar: NaN/NaT -> None, timestamps as TIME_FORMAT text, numpy -> Python"""
+    if value is None:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return None if pd.isna(value) else value.strftime(TIME_FORMAT)
+    if isinstance(value, float) and value != value:
+        return None
+    if hasattr(value, 'item'):
+        return json_value(value.item())
+    return value
+
+
+def trade_records(df):
+    """Trades as JSON-ready dicts, id first"""
+    rows = df.reset_index()
+    return [{col: json_value(value) for col, value in row.items()} for row in rows.to_dict('records')]
+
+
+def _trade_chunks(trades):
+    """Trades in frames of CHUNK_ROWS: id as the first column, Time as TIME_FORMAT text"""
+    for offset in range(0, len(trades), CHUNK_ROWS):
+        chunk = trades.iloc[offset:offset + CHUNK_ROWS].reset_index()
+        for col in chunk.columns:
+            if pd.api.types.is_datetime64_any_dtype(chunk[col]):
+                chunk[col] = chunk[col].dt.strftime(TIME_FORMAT)
+        yield chunk
+
+
+def _trade_rows(chunk):
+    """Row lists of a chunk with NaN/NaT as None"""
+    values = chunk.astype(object)
+    return values.where(values.notna(), None).values.tolist()
+
+
+def _iter_txt(metrics, trades):
+    yield "📊 Trade Metrics Report 📊\n"
+    yield "="*50 + "\n"
+    yield ''.join(f"{key}: {value}\n" for key, value in metrics.items())
+    if trades is None:
+        return
+    yield "\n📋 Trades\n" + "="*50 + "\n"
+    for chunk in _trade_chunks(trades):
+        columns = list(chunk.columns)
+        yield ''.join(
+            ' | '.join(f"{col}: {'' if value is None else value}" for col, value in zip(columns, row)) + "\n"
+            for row in _trade_rows(chunk)
+        )
+
+
+def _csv_rows(rows):
+    buffer = StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def _iter_csv(metrics, trades):
+    yield _csv_rows([['Metric', 'Value']] + [[key, json_value(value)] for key, value in metrics.items()])
+    if trades is None:
+        return
+    yield _csv_rows([[], [trades.index.name or 'id'] + list(trades.columns)])
+    for chunk in _trade_chunks(trades):
+        yield chunk.to_csv(index=False, header=False, lineterminator='\r\n')
+
+
+def _iter_json(metrics, trades):
+    yield '{"metrics": ' + json.dumps({key: json_value(value) for key, value in metrics.items()})
+    if trades is not None:
+        yield ', "trades": ['
+        first = True
+        for chunk in _trade_chunks(trades):
+            # '[{...}, {...}]' without the brackets
+            yield ('' if first else ', ') + chunk.to_json(orient='records', force_ascii=False)[1:-1]
+            first = False
+        yield ']'
+    yield '}'
+
+
+def _iter_xlsx(metrics, trades):
+    # Write-only workbook: rows go straight to the temporary file, not into a worksheet tree
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Metrics')
+    sheet.append(['Metric', 'Value'])
+    for key, value in metrics.items():
+        sheet.append([key, json_value(value)])
+    if trades is not None:
+        sheet = workbook.create_sheet('Trades')
+        sheet.append([trades.index.name or 'id'] + list(trades.columns))
+        for chunk in _trade_chunks(trades):
+            for row in _trade_rows(chunk):
+                sheet.append(row)
+
+    handle, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(handle)
+    try:
+        workbook.save(path)
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(FILE_CHUNK_BYTES)
+                if not data:
+                    break
+                yield data
+    finally:
+        os.remove(path)
+
+
+def iter_report(fmt, metrics, trades=None):
+    """Chunks (str, or bytes for xlsx) of a report; trades=None leaves out the per-trade rows"""
+    if fmt == 'txt':
+        return _iter_txt(metrics, trades)
+    if fmt == 'csv':
+        return _iter_csv(metrics, trades)
+    if fmt == 'json':
+        return _iter_json(metrics, trades)
+    if fmt == 'xlsx':
+        if not OPENPYXL_AVAILABLE:
+            raise ValueError("openpyxl is not installed")
+        return _iter_xlsx(metrics, trades)
+    raise ValueError(f"Unknown report format '{fmt}'")
@@ -0,0 +1,138 @@
+"""
+Screenshot Cache
+Downscaled on-disk screenshot thumbnails plus an in-memory QPixmapCache tier
+"""
+
+import os
+import hashlib
+import threading
+
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QImage, QImageReader, QImageWriter, QPixmap, QPixmapCache
+
+
+# Folder (inside the profile's screenshots folder) holding the thumbnails
+THUMB_DIR = '.thumbs'
+
+# Largest thumbnail; twice the journal's 350x180 preview so it stays sharp on HiDPI screens
+THUMB_MAX_SIZE = QSize(720, 360)
+
+THUMB_QUALITY = 85
+
+# Memory budget of the pixmap tier (QPixmapCache is process-wide and LRU)
+PIXMAP_CACHE_KB = 64 * 1024
+
+
+def thumbnail_format():
+    """'webp' when Qt's image plugins can write it, else 'jpg'"""
+    formats = {bytes(fmt).decode() for fmt in QImageWriter.supportedImageFormats()}
+    return 'webp' if 'webp' in formats else 'jpg'
+
+
+def thumbnail_stem(screenshot_folder, source):
+    """Thumbnail name (no extension): the screenshot's own for files of this folder, else a path hash"""
+    source = os.path.abspath(source)
+    if os.path.dirname(source) == os.path.abspath(screenshot_folder):
+        return os.path.splitext(os.path.basename(source))[0]
+    return hashlib.blake2b(source.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ScreenshotCache:
+    """Thumbnails of one profile's screenshots, on disk and as cached pixmaps.
+
+    A thumbnail is written once per screenshot under screenshots/.thumbs and
+    rewritten only if the screenshot is newer. thumbnail_image() is safe to
+    call from worker threads; pixmap() and everything touching QPixmapCache
+    must run on the GUI thread. Full-resolution images are only decoded by
+    full_pixmap(), i.e. when the user zooms in.
+    """
+
+    def __init__(self, screenshot_folder, cache_limit_kb=PIXMAP_CACHE_KB):
+        self.screenshot_folder = screenshot_folder
+        self.thumb_folder = os.path.join(screenshot_folder, THUMB_DIR)
+        self.format = thumbnail_format()
+        self._lock = threading.Lock()
+        self._sizes = set()   # (w, h) the pixmap tier holds thumbnails for
+        if QPixmapCache.cacheLimit() < cache_limit_kb:
+            QPixmapCache.setCacheLimit(cache_limit_kb)
+
+    # ---------- thumbnail files ----------
+    def thumbnail_path(self, source):
+        """Thumbnail file of a screenshot"""
+        return os.path.join(self.thumb_folder, f"{thumbnail_stem(self.screenshot_folder, source)}.{self.format}")
+
+    def ensure_thumbnail(self, source):
+        """Path of an up-to-date thumbnail, generating it if needed (None if the screenshot is unreadable)"""
+        thumb_path = self.thumbnail_path(source)
+        try:
+            source_mtime = os.stat(source).st_mtime
+        except OSError:
+            return None
+        try:
+            if os.stat(thumb_path).st_mtime >= source_mtime:
+                return thumb_path
+        except OSError:
+            pass
+
+        image = QImageReader(source).read()
+        if image.isNull():
+            return None
+        if image.width() > THUMB_MAX_SIZE.width() or image.height() > THUMB_MAX_SIZE.height():
+            image = image.scaled(THUMB_MAX_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        if image.hasAlphaChannel() and self.format == 'jpg':
+            image = image.convertToFormat(QImage.Format_RGB32)
+
+        with self._lock:
+            os.makedirs(self.thumb_folder, exist_ok=True)
+        # Unique temporary name: two threads may build the same thumbnail
+        tmp_path = f"{thumb_path}.{threading.get_ident()}.tmp"
+        if not image.save(tmp_path, self.format, THUMB_QUALITY):
+            print(f"Error writing thumbnail {thumb_path}")
+            return None
+        os.replace(tmp_path, thumb_path)
+        return thumb_path
+
+    def thumbnail_image(self, source):
+        """Thumbnail as a QImage (thread-safe); a null image if the screenshot is unreadable"""
+        thumb_path = self.ensure_thumbnail(source)
+        return QImage(thumb_path) if thumb_path else QImage()
+
+    def remove(self, source):
+        """Forget a screenshot: its thumbnail file and cached pixmaps"""
+        thumb_path = self.thumbnail_path(source)
+        try:
+            os.remove(thumb_path)
+        except OSError:
+            pass
+        for width, height in list(self._sizes):
+            QPixmapCache.remove(self._key(source, QSize(width, height)))
+
+    # ---------- pixmap tier (GUI thread) ----------
+    def _key(self, source, size):
+        return f"thumb:{os.path.abspath(source)}:{size.width()}x{size.height()}"
+
+    def cached_pixmap(self, source, size):
+        """Pixmap from the memory tier only (None if not cached)"""
+        return QPixmapCache.find(self._key(source, size))
+
+    def insert_image(self, source, size, image):
+        """Cache a thumbnail QImage (e.g. decoded by a worker) as a pixmap scaled for size"""
+        if image.isNull():
+            return QPixmap()
+        self._sizes.add((size.width(), size.height()))
+        pixmap = QPixmap.fromImage(image)
+        if pixmap.width() > size.width() or pixmap.height() > size.height():
+            pixmap = pixmap.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        QPixmapCache.insert(self._key(source, size), pixmap)
+        return pixmap
+
+    def pixmap(self, source, size):
+        """Thumbnail pixmap fitting size, from memory, the thumbnail file, or the screenshot (in that order)"""
+        pixmap = self.cached_pixmap(source, size)
+        if pixmap is not None:
+            return pixmap
+        return self.insert_image(source, size, self.thumbnail_image(source))
+
+    def full_pixmap(self, source):
+        """Full-resolution screenshot (not cached)"""
+        return QPixmap(source)
@@ -0,0 +1,216 @@
+"""
+Screenshot Gallery
+Virtualized screenshot gallery model with lazily loaded thumbnails
+"""
+
+import os
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from PyQt5.QtCore import Qt, QSize, QObject, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui import QPixmap, QColor
+
+
+ICON_SIZE = QSize(240, 135)
+
+# Loader threads; one core is left to the GUI thread
+GALLERY_LOADERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+# Queued thumbnail requests; older ones (rows long scrolled past) are dropped first
+MAX_PENDING = 256
+
+
+class ThumbnailLoader(QObject):
+    """Decodes gallery thumbnails on a small pool of threads.
+
+    Requests are served newest first, so the rows the user is looking at
+    now load before the ones scrolled past, and the queue is capped at
+    MAX_PENDING: a dropped request is simply made again if its row becomes
+    visible again.
+    """
+    loaded = pyqtSignal(object)   # {'path', 'image'} (a null image if unreadable)
+
+    def __init__(self, size=ICON_SIZE, workers=GALLERY_LOADERS):
+        super().__init__()
+        self.size = size
+        self._cond = threading.Condition()
+        self._stack = deque()     # (cache, path)
+        self._pending = set()
+        self._stopping = False
+        self._threads = [threading.Thread(target=self._run, name=f'gallery-thumbs-{i}', daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def request(self, cache, path):
+        with self._cond:
+            if path in self._pending:
+                return
+            self._pending.add(path)
+            self._stack.append((cache, path))
+            if len(self._stack) > MAX_PENDING:
+                _, dropped = self._stack.popleft()
+                self._pending.discard(dropped)
+            self._cond.notify()
+
+    def clear(self):
+        with self._cond:
+            self._stack.clear()
+            self._pending.clear()
+
+    def stop(self, timeout=5.0):
+        with self._cond:
+            self._stopping = True
+            self._stack.clear()
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stack and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                cache, path = self._stack.pop()
+            try:
+                image = cache.thumbnail_image(path)
+                if not image.isNull():
+                    image = image.scaled(self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            except Exception as e:
+                print(f"Error loading thumbnail {path}: {e}")
+                image = None
+            with self._cond:
+                self._pending.discard(path)
+                if self._stopping:
+                    return
+            self.loaded.emit({'path': path, 'image': image})
+
+
+class GalleryModel(QAbstractListModel):
+    """One row per trade screenshot, newest trade first, filterable by pair, outcome and date.
+
+    Rows are plain numpy arrays; filtering recomputes an index array. A
+    thumbnail is requested from the loader the first time the view asks for
+    a row's icon, which QListView only does for rows it paints, and shown
+    once it arrives. Qt.UserRole holds the trade id.
+
+    An arriving thumbnail emits thumbnails_changed rather than dataChanged:
+    one file can back rows all over a 20k-row model, and QListView walks
+    every row of a dataChanged range, whereas repainting the viewport only
+    asks for the rows on screen.
+    """
+    thumbnails_changed = pyqtSignal()
+
+    def __init__(self, loader, cache, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self.cache = cache
+        self.placeholder = QPixmap(loader.size)
+        self.placeholder.fill(QColor(128, 128, 128, 60))
+        self._failed = set()
+        self._filter = {}
+        self.set_trades(None)
+        loader.loaded.connect(self.on_thumbnail_loaded)
+
+    def set_cache(self, cache):
+        self.beginResetModel()
+        self.cache = cache
+        self.loader.clear()
+        self._failed.clear()
+        self.endResetModel()
+
+    def set_trades(self, df):
+        """Rows for the Screenshot1 / Screenshot2 of every trade"""
+        columns = {'id': [], 'path': [], 'pair': [], 'outcome': [], 'time': []}
+        if df is not None and not df.empty:
+            ids = df.index.to_numpy(dtype=np.int64)
+            times = df['Time'].to_numpy(dtype='datetime64[ns]')
+            pairs = df['Pair'].to_numpy(dtype=str)
+            outcomes = df['Outcome'].fillna('').to_numpy(dtype=str)
+            for col in ('Screenshot1', 'Screenshot2'):
+                paths = df[col].fillna('').to_numpy(dtype=str)
+                has = paths != ''
+                columns['id'].append(ids[has])
+                columns['path'].append(paths[has])
+                columns['pair'].append(pairs[has])
+                columns['outcome'].append(outcomes[has])
+                columns['time'].append(times[has])
+        self.beginResetModel()
+        if columns['id']:
+            self.rows = {key: np.concatenate(values) for key, values in columns.items()}
+            # Newest first, trades without a time last
+            keys = self.rows['time'].view('int64').astype(float)
+            keys[np.isnat(self.rows['time'])] = -np.inf
+            order = np.argsort(-keys, kind='stable')
+            self.rows = {key: values[order] for key, values in self.rows.items()}
+        else:
+            self.rows = {
+                'id': np.array([], dtype=np.int64), 'path': np.array([], dtype=str),
+                'pair': np.array([], dtype=str), 'outcome': np.array([], dtype=str),
+                'time': np.array([], dtype='datetime64[ns]'),
+            }
+        self.visible = self._matching(**self._filter)
+        self.endResetModel()
+
+    def set_filter(self, pair=None, outcome=None, start=None, end=None):
+        """Show only rows matching a pair / outcome with start <= Time < end (None = any)"""
+        self._filter = {'pair': pair, 'outcome': outcome, 'start': start, 'end': end}
+        self.beginResetModel()
+        self.visible = self._matching(**self._filter)
+        self.endResetModel()
+
+    def _matching(self, pair=None, outcome=None, start=None, end=None):
+        mask = np.ones(len(self.rows['id']), dtype=bool)
+        if pair:
+            mask &= self.rows['pair'] == pair
+        if outcome:
+            mask &= self.rows['outcome'] == outcome
+        if start is not None:
+            mask &= self.rows['time'] >= np.datetime64(pd.Timestamp(start))
+        if end is not None:
+            mask &= self.rows['time'] < np.datetime64(pd.Timestamp(end))
+        return np.flatnonzero(mask)
+
+    def pairs(self):
+        return sorted(set(self.rows['pair'].tolist()))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.visible)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.visible[index.row()]
+        if role == Qt.DecorationRole:
+            path = self.rows['path'][row]
+            pixmap = self.cache.cached_pixmap(path, self.loader.size)
+            if pixmap is not None:
+                return pixmap
+            if path not in self._failed:
+                self.loader.request(self.cache, path)
+            return self.placeholder
+        if role == Qt.DisplayRole:
+            time = self.rows['time'][row]
+            date = '' if np.isnat(time) else pd.Timestamp(time).strftime('%Y-%m-%d')
+            return f"{self.rows['pair'][row]}  {date}"
+        if role == Qt.ToolTipRole:
+            time = self.rows['time'][row]
+            when = '' if np.isnat(time) else pd.Timestamp(time).strftime('%Y-%m-%d %H:%M')
+            outcome = self.rows['outcome'][row] or 'Running'
+            return f"{self.rows['pair'][row]} · {outcome} · {when}\n{self.rows['path'][row]}"
+        if role == Qt.UserRole:
+            return int(self.rows['id'][row])
+        return None
+
+    def on_thumbnail_loaded(self, result):
+        path = result['path']
+        if result['image'] is None or result['image'].isNull():
+            self._failed.add(path)
+        else:
+            self.cache.insert_image(path, self.loader.size, result['image'])
+        self.thumbnails_changed.emit()
@@ -0,0 +1,210 @@
+"""
+Screenshot GC
+Screenshot storage report and cleanup of files no trade references
+"""
+
+import os
+import time
+import zipfile
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from screenshot_cache import THUMB_DIR, thumbnail_stem
+
+
+SCREENSHOT_COLUMNS = ('Screenshot1', 'Screenshot2')
+
+SCAN_WORKERS = 4
+STAT_CHUNK_FILES = 512
+
+# Files deleted / archived per step (progress and a fresh reference check in between)
+GC_BATCH_FILES = 200
+
+# Newer files are never collected: an upload may not be saved to a trade yet
+GRACE_SECONDS = 3600
+
+
+def _norm(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def referenced_screenshots(df):
+    """Normalized paths named in a trade frame's Screenshot1 / Screenshot2 columns"""
+    refs = set()
+    if df is None or df.empty:
+        return refs
+    for col in SCREENSHOT_COLUMNS:
+        if col in df.columns:
+            refs.update(_norm(path) for path in df[col].dropna().unique() if isinstance(path, str) and path)
+    return refs
+
+
+def _all_references(repositories, keep):
+    """Screenshots referenced by any of the repositories' trades, plus keep.
+
+    Imported profiles keep pointing at the source profile's files, so a
+    screenshot is only an orphan if no profile at all uses it.
+    """
+    refs = set(keep)
+    for repository in repositories:
+        refs |= referenced_screenshots(repository.frame())
+    return refs
+
+
+def _stat_chunk(paths):
+    stats = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        stats.append((path, st.st_size, st.st_mtime))
+    return stats
+
+
+def _scan_files(folder, pool):
+    """(path, size, mtime) of the regular, non-hidden files in a folder, stat'ed in parallel"""
+    try:
+        with os.scandir(folder) as entries:
+            paths = [entry.path for entry in entries if entry.is_file() and not entry.name.startswith('.')]
+    except FileNotFoundError:
+        return []
+    chunks = [paths[i:i + STAT_CHUNK_FILES] for i in range(0, len(paths), STAT_CHUNK_FILES)]
+    return [stat for stats in pool.map(_stat_chunk, chunks) for stat in stats]
+
+
+def scan_profiles(profiles, keep=(), progress=None, workers=SCAN_WORKERS, open_repository=None):
+    """Storage report per profile.
+
+    profiles are dicts with 'id', 'name', 'folder' (the screenshots folder)
+    and optionally 'repository'; profiles without one are opened here with
+    open_repository(profile_id), so loading their trades happens on the
+    scanning thread too. A file counts as referenced when a trade of any of
+    the given profiles names it. keep lists extra paths to treat as referenced
+    (e.g. the screenshots shown in the unsaved journal form). progress counts
+    one step per profile loaded and one per folder scanned.
+    """
+    total = 2 * len(profiles)
+    refs = {_norm(path) for path in keep if path}
+    repositories = []
+    for done, profile in enumerate(profiles):
+        repository = profile.get('repository')
+        if repository is None:
+            repository = open_repository(profile['id'])
+        refs |= referenced_screenshots(repository.frame())
+        repositories.append(repository)
+        if progress:
+            progress(done + 1, total)
+
+    now = time.time()
+    reports = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='screenshot-scan') as pool:
+        for done, (profile, repository) in enumerate(zip(profiles, repositories), len(profiles)):
+            folder = profile['folder']
+            report = {
+                'id': profile['id'], 'name': profile['name'], 'folder': folder,
+                'repository': repository,
+                'files': 0, 'bytes': 0, 'referenced_files': 0, 'referenced_bytes': 0,
+                'recent_files': 0, 'orphans': [], 'orphan_bytes': 0,
+                'thumb_bytes': 0, 'orphan_thumbs': [], 'orphan_thumb_bytes': 0,
+            }
+            kept_stems = {thumbnail_stem(folder, path) for path in refs}
+            for path, size, mtime in _scan_files(folder, pool):
+                report['files'] += 1
+                report['bytes'] += size
+                if _norm(path) in refs:
+                    report['referenced_files'] += 1
+                    report['referenced_bytes'] += size
+                elif now - mtime < GRACE_SECONDS:
+                    report['recent_files'] += 1
+                    kept_stems.add(thumbnail_stem(folder, path))
+                else:
+                    report['orphans'].append((path, size))
+                    report['orphan_bytes'] += size
+            for path, size, _ in _scan_files(os.path.join(folder, THUMB_DIR), pool):
+                report['thumb_bytes'] += size
+                if os.path.splitext(os.path.basename(path))[0] not in kept_stems:
+                    report['orphan_thumbs'].append((path, size))
+                    report['orphan_thumb_bytes'] += size
+            reports.append(report)
+            if progress:
+                progress(done + 1, total)
+    return reports
+
+
+def collect(reports, mode='delete', keep=(), progress=None, batch_files=GC_BATCH_FILES):
+    """Delete (mode='delete') or zip into the profile's exports folder (mode='archive') the orphans of a scan.
+
+    The trade references of every scanned profile are re-read before every
+    batch, so a file that a trade started using since the scan is left
+    alone. Orphaned thumbnails are always deleted, never archived.
+    """
+    keep = {_norm(path) for path in keep if path}
+    repositories = [report['repository'] for report in reports]
+    total = sum(len(r['orphans']) + len(r['orphan_thumbs']) for r in reports)
+    result = {'files': 0, 'bytes': 0, 'archives': [], 'errors': 0}
+    done = 0
+    stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    for report in reports:
+        archive_path = None
+        if mode == 'archive' and report['orphans']:
+            exports_folder = os.path.join(os.path.dirname(report['folder']), 'exports')
+            os.makedirs(exports_folder, exist_ok=True)
+            archive_path = os.path.join(exports_folder, f"orphaned_screenshots_{stamp}.zip")
+
+        for files, screenshots in ((report['orphans'], True), (report['orphan_thumbs'], False)):
+            for offset in range(0, len(files), batch_files):
+                chunk = files[offset:offset + batch_files]
+                done += len(chunk)
+                if screenshots:
+                    refs = _all_references(repositories, keep)
+                    chunk = [(path, size) for path, size in chunk if _norm(path) not in refs]
+                    if archive_path and chunk:
+                        # Screenshots are already compressed images: store, don't deflate
+                        with zipfile.ZipFile(archive_path, 'a', zipfile.ZIP_STORED) as zf:
+                            for path, _ in chunk:
+                                zf.write(path, os.path.basename(path))
+                for path, size in chunk:
+                    try:
+                        os.remove(path)
+                        result['files'] += 1
+                        result['bytes'] += size
+                    except OSError as e:
+                        print(f"Error removing {path}: {e}")
+                        result['errors'] += 1
+                if progress:
+                    progress(done, total)
+        if archive_path and os.path.exists(archive_path):
+            result['archives'].append(archive_path)
+    return result
+
+
+class ScreenshotGCWorker(QThread):
+    """Runs scan_profiles() or collect() off the GUI thread"""
+    progress = pyqtSignal(int, int)
+    finished_with = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, task, *args, **kwargs):
+        super().__init__()
+        self.task = task
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            result = self.task(*self.args, progress=self.progress.emit, **self.kwargs)
+        except Exception as e:
+            print(f"Error cleaning up screenshots: {e}")
+            self.failed.emit(str(e))
+            return
+        self.finished_with.emit(result)
@@ -0,0 +1,84 @@
+"""
+Screenshot Prefetch
+Background decoding of the screenshots next to the selected trade
+"""
+
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+# Trades on each side of the selection whose screenshots are prefetched
+PREFETCH_RADIUS = 2
+
+# Decoded bytes one prefetch may produce before it stops
+PREFETCH_BUDGET_BYTES = 16 * 1024 * 1024
+
+
+class ScreenshotPrefetcher(QThread):
+    """Decodes thumbnails for the trades around the selection off the GUI thread.
+
+    request() replaces whatever was queued; the thread checks between images
+    whether a newer request (or cancel()) superseded the one it works on and
+    drops it if so. Decoded QImages are emitted; turning them into pixmaps
+    and caching them happens on the GUI thread.
+    """
+    image_ready = pyqtSignal(object)   # {'generation', 'path', 'image'}
+
+    def __init__(self, budget_bytes=PREFETCH_BUDGET_BYTES):
+        super().__init__()
+        self.budget_bytes = budget_bytes
+        self._cond = threading.Condition()
+        self._request = None     # (generation, cache, paths)
+        self._generation = 0
+        self._stopping = False
+
+    # ---------- called from the UI thread ----------
+    def request(self, cache, paths):
+        """Prefetch paths (nearest first), replacing any queued prefetch; returns its generation"""
+        with self._cond:
+            self._generation += 1
+            self._request = (self._generation, cache, list(paths))
+            self._cond.notify_all()
+            return self._generation
+
+    def cancel(self):
+        with self._cond:
+            self._generation += 1
+            self._request = None
+
+    def is_current(self, generation):
+        with self._cond:
+            return generation == self._generation
+
+    def stop(self, timeout=5.0):
+        with self._cond:
+            self._stopping = True
+            self._request = None
+            self._cond.notify_all()
+        self.wait(int(timeout * 1000))
+
+    # ---------- worker thread ----------
+    def run(self):
+        while True:
+            with self._cond:
+                while self._request is None and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                generation, cache, paths = self._request
+                self._request = None
+
+            used = 0
+            for path in paths:
+                if not self.is_current(generation) or used >= self.budget_bytes:
+                    break
+                try:
+                    image = cache.thumbnail_image(path)
+                except Exception as e:
+                    print(f"Error prefetching {path}: {e}")
+                    continue
+                if image.isNull():
+                    continue
+                used += image.sizeInBytes()
+                self.image_ready.emit({'generation': generation, 'path': path, 'image': image})
@@ -0,0 +1,95 @@
+"""
+Screenshot Store
+Content-addressed screenshot ingestion on a small worker pool
+"""
+
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+HASH_CHUNK_BYTES = 1024 * 1024
+INGEST_WORKERS = 2
+
+
+def content_hash(path):
+    """BLAKE2b (160-bit) hex digest of a file"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ScreenshotStore:
+    """A profile's screenshots, each unique image stored once as <blake2b>.png.
+
+    The name is derived from the content, so the same chart attached to
+    several trades (or uploaded twice) is one file, names never collide and
+    nothing has to scan the folder to pick a name. The .png suffix keeps the
+    folder compatible with profile export / import, which copy *.png.
+    """
+
+    def __init__(self, screenshot_folder, cache):
+        self.screenshot_folder = screenshot_folder
+        self.cache = cache
+
+    def path_for(self, digest):
+        return os.path.join(self.screenshot_folder, f"{digest}.png")
+
+    def ingest(self, source):
+        """Store a screenshot and its thumbnail; returns the stored path (thread-safe)"""
+        # Hash while copying: the source is read once
+        digest = hashlib.blake2b(digest_size=20)
+        tmp_path = os.path.join(self.screenshot_folder, f".ingest.{threading.get_ident()}.tmp")
+        try:
+            with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+                for chunk in iter(lambda: src.read(HASH_CHUNK_BYTES), b''):
+                    digest.update(chunk)
+                    dst.write(chunk)
+            path = self.path_for(digest.hexdigest())
+            if os.path.exists(path):
+                os.remove(tmp_path)   # already stored
+            else:
+                os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.cache.ensure_thumbnail(path)
+        return path
+
+
+class ScreenshotIngestor(QObject):
+    """Runs ScreenshotStore.ingest on a thread pool.
+
+    Results are emitted as signals, which Qt delivers on the GUI thread.
+    Each submission carries an opaque request the caller uses to tell
+    whether the result is still wanted.
+    """
+    ingested = pyqtSignal(object)   # {'request', 'path'}
+    failed = pyqtSignal(object)     # {'request', 'error'}
+
+    def __init__(self, workers=INGEST_WORKERS):
+        super().__init__()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='screenshot-ingest')
+
+    def submit(self, store, source, request):
+        """Queue an ingestion; returns its Future (result() is the stored path)"""
+        return self._pool.submit(self._run, store, source, request)
+
+    def _run(self, store, source, request):
+        try:
+            path = store.ingest(source)
+        except Exception as e:
+            print(f"Error importing screenshot {source}: {e}")
+            self.failed.emit({'request': request, 'error': str(e)})
+            raise
+        self.ingested.emit({'request': request, 'path': path})
+        return path
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,117 @@
+"""
+Streak Analytics
+Run-length encoded win / loss / break-even streaks of closed trades
+"""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+
+WIN, LOSS, BREAK_EVEN = 1, -1, 0
+
+STREAK_KINDS = {WIN: 'Win', LOSS: 'Loss', BREAK_EVEN: 'Break Even'}
+
+
+def run_lengths(signs):
+    """Run-length encode a sequence of -1/0/+1 values: (run signs, run lengths)"""
+    signs = np.asarray(signs)
+    if len(signs) == 0:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(signs)) + 1))
+    lengths = np.diff(np.append(starts, len(signs)))
+    return signs[starts].astype(int), lengths
+
+
+def streak_order(times, ids):
+    """Positions that put trades in streak order: by Time (missing times last), then by id"""
+    times = np.asarray(times, dtype='datetime64[ns]')
+    return np.lexsort((np.asarray(ids), times.view('i8'), np.isnat(times)))
+
+
+def streak_key(time, trade_id):
+    """Sort key of one trade in streak order (see streak_order)"""
+    time = pd.Timestamp(time) if time is not None else pd.NaT
+    if pd.isna(time):
+        return (True, 0, trade_id)
+    return (False, time.value, trade_id)
+
+
+class StreakStats:
+    """Longest, current and average streaks plus the streak-length histogram.
+
+    Trades are taken in time order (ties and missing times by id). A closed
+    trade is a win when its PnL is positive, a loss when negative and
+    break-even at 0 (missing PnL counts as 0). The constructor encodes the whole
+    sequence in one vectorized pass; push() extends it by one trade in O(1).
+    The histogram counts the still-running last streak at its current length.
+    """
+
+    def __init__(self, pnl=None):
+        self.runs = Counter()        # kind -> number of streaks
+        self.trades = Counter()      # kind -> trades inside those streaks
+        self.longest = Counter()     # kind -> longest streak
+        self.histogram = {kind: Counter() for kind in STREAK_KINDS}  # kind -> {length: count}
+        self.current_kind = None
+        self.current_length = 0
+        if pnl is not None and len(pnl):
+            self._encode(np.sign(np.nan_to_num(np.asarray(pnl, dtype=float), nan=0.0)).astype(int))
+
+    @classmethod
+    def from_trades(cls, df):
+        """Streaks of the closed trades of a trades frame, in streak order (Time, then id)"""
+        if df is None or df.empty:
+            return cls()
+        closed = df[df['Status'] == 'Closed']
+        order = streak_order(pd.to_datetime(closed['Time'], errors='coerce'), closed.index)
+        return cls(closed['PnL'].to_numpy(dtype=float, na_value=np.nan)[order])
+
+    def _encode(self, signs):
+        run_signs, lengths = run_lengths(signs)
+        for kind in STREAK_KINDS:
+            kind_lengths = lengths[run_signs == kind]
+            if len(kind_lengths):
+                values, counts = np.unique(kind_lengths, return_counts=True)
+                self.histogram[kind] = Counter(dict(zip(values.tolist(), counts.tolist())))
+                self.runs[kind] = len(kind_lengths)
+                self.trades[kind] = int(kind_lengths.sum())
+                self.longest[kind] = int(kind_lengths.max())
+        self.current_kind = int(run_signs[-1])
+        self.current_length = int(lengths[-1])
+
+    def push(self, pnl):
+        """Append one closed trade's PnL"""
+        kind = 0 if pnl != pnl else int(np.sign(pnl))  # NaN counts as break-even
+        histogram = self.histogram[kind]
+        if kind == self.current_kind:
+            histogram[self.current_length] -= 1
+            if not histogram[self.current_length]:
+                del histogram[self.current_length]
+            self.current_length += 1
+        else:
+            self.current_kind = kind
+            self.current_length = 1
+            self.runs[kind] += 1
+        histogram[self.current_length] += 1
+        self.trades[kind] += 1
+        self.longest[kind] = max(self.longest[kind], self.current_length)
+
+    def average(self, kind):
+        return self.trades[kind] / self.runs[kind] if self.runs[kind] else 0
+
+    def current(self):
+        """e.g. '3 Win', or '-' before the first closed trade"""
+        if self.current_kind is None:
+            return '-'
+        return f"{self.current_length} {STREAK_KINDS[self.current_kind]}"
+
+    def summary(self):
+        return {
+            'current': self.current(),
+            'current_kind': STREAK_KINDS.get(self.current_kind),
+            'current_length': self.current_length,
+            'longest': {STREAK_KINDS[k]: self.longest[k] for k in STREAK_KINDS},
+            'average': {STREAK_KINDS[k]: self.average(k) for k in STREAK_KINDS},
+            'histogram': {STREAK_KINDS[k]: dict(sorted(self.histogram[k].items())) for k in STREAK_KINDS},
+        }
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from downsample import MIN_POINTS, equity_curve, lttb
+from time_index import TimeRangeIndex
+from trade_schema import apply_schema
+
+
+def test_short_series_is_kept_whole():
+    assert lttb(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+    assert lttb(np.arange(5), np.arange(5), None).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_keeps_threshold_points_in_order_with_both_ends():
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.normal(size=10_000))
+    keep = lttb(np.arange(len(y)), y, 500)
+    assert len(keep) == 500
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_keeps_isolated_extremes():
+    y = np.zeros(1_000)
+    y[437] = 100.0
+    y[801] = -100.0
+    keep = lttb(np.arange(len(y)), y, 50)
+    assert 437 in keep
+    assert 801 in keep
+
+
+def test_equity_curve_is_in_time_order():
+    df = apply_schema(pd.DataFrame({
+        'Time': ['2024-01-03 00:00:00', '2024-01-01 00:00:00', None, '2024-01-02 00:00:00'],
+        'Status': ['Closed'] * 4,
+        'PnL': [1.0, 10.0, 99.0, 100.0],
+    }, index=pd.Index([1, 2, 3, 4], name='id')))
+    curve = equity_curve(df, TimeRangeIndex(df['Time']), points=MIN_POINTS)
+    assert curve['total'] == 3            # the trade without a Time is left out
+    assert curve['cumulative'].tolist() == [10.0, 110.0, 111.0]
+    assert curve['trade'].tolist() == [1, 2, 3]
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from matrix_cache import MatrixCache, estimate_size
+
+
+def test_hit_and_miss_counters():
+    cache = MatrixCache(maxsize=2)
+    assert cache.get_or_compute('a', lambda: 1) == 1
+    assert cache.get_or_compute('a', lambda: 2) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_evicts_least_recently_used_entry():
+    cache = MatrixCache(maxsize=2)
+    cache.get_or_compute('a', lambda: 1)
+    cache.get_or_compute('b', lambda: 2)
+    cache.get_or_compute('a', lambda: 0)   # 'a' is now the most recent
+    cache.get_or_compute('c', lambda: 3)
+    assert cache.get_or_compute('a', lambda: 'recomputed') == 1
+    assert cache.get_or_compute('b', lambda: 'recomputed') == 'recomputed'
+
+
+def test_bounded_by_estimated_bytes():
+    frame = pd.DataFrame({'PnL': range(10_000)}, dtype='float64')
+    size = estimate_size(frame)
+    cache = MatrixCache(maxsize=100, max_bytes=int(size * 2.5))
+    for key in range(5):
+        cache.get_or_compute(key, frame.copy)
+    stats = cache.stats()
+    assert stats['entries'] == 2
+    assert stats['bytes'] <= stats['max_bytes']
+
+
+def test_value_larger_than_budget_is_not_cached():
+    frame = pd.DataFrame({'PnL': range(1_000)}, dtype='float64')
+    cache = MatrixCache(maxsize=10, max_bytes=100)
+    assert cache.get_or_compute('big', lambda: frame) is frame
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['bytes'] == 0
@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+
+from matrix_cache import MatrixCache
+from matrix_server import create_matrix_app, parse_date_arg
+
+
+class FakeRepository:
+    def __init__(self):
+        self.rollup_calls = []
+
+    def current_version(self):
+        return 1
+
+    def rollup(self, period, start=None, end=None):
+        self.rollup_calls.append((period, start, end))
+        return []
+
+    def period_totals(self, start=None, end=None):
+        return {}
+
+
+@pytest.fixture
+def repository():
+    return FakeRepository()
+
+
+@pytest.fixture
+def client(repository):
+    app = create_matrix_app(lambda profile_id: repository, lambda profile_id: 1000.0, MatrixCache())
+    return app.test_client()
+
+
+def test_parse_date_arg():
+    assert parse_date_arg(None) is None
+    assert parse_date_arg('') is None
+    assert parse_date_arg('2024-01-31') == datetime.date(2024, 1, 31)
+    with pytest.raises(ValueError):
+        parse_date_arg('garbage')
+
+
+@pytest.mark.parametrize('query', ['start=garbage', 'end=garbage', 'start=2024-01-01&end=2024-13-45'])
+def test_rollup_rejects_invalid_dates(client, repository, query):
+    response = client.get(f'/profile/1/api/rollup?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+    assert repository.rollup_calls == []
+
+
+def test_rollup_rejects_unknown_period(client):
+    assert client.get('/profile/1/api/rollup?period=year').status_code == 400
+
+
+def test_rollup_passes_parsed_dates(client, repository):
+    response = client.get('/profile/1/api/rollup?period=month&start=2024-01-01&end=2024-03-01')
+    assert response.status_code == 200
+    assert repository.rollup_calls == [('month', datetime.date(2024, 1, 1), datetime.date(2024, 3, 1))]
+
+
+def test_rollup_revalidates_with_etag(client):
+    first = client.get('/profile/1/api/rollup')
+    etag = first.headers['ETag']
+    second = client.get('/profile/1/api/rollup', headers={'If-None-Match': etag})
+    assert second.status_code == 304
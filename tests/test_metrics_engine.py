@@ -0,0 +1,135 @@
+import math
+import random
+import warnings
+
+import pandas as pd
+import pytest
+
+from metrics_engine import MATRIX_KEYS, MetricsAccumulator, RunningStats, compute_metrics
+from trade_schema import apply_schema, set_trade
+
+TODAY = pd.Timestamp('2024-03-10').date()
+
+# Deprecations that turn into errors in the next pandas major version
+PANDAS_DEPRECATION = getattr(pd.errors, 'Pandas4Warning', FutureWarning)
+
+
+def random_trade(rng):
+    status = rng.choice(['Running', 'Closed', 'Closed', 'Closed'])
+    pnl = round(rng.uniform(-50, 80), 2) if status == 'Closed' else None
+    return {
+        'Time': f"2024-03-{rng.randint(1, 10):02d} {rng.randint(0, 23):02d}:00:00",
+        'Pair': rng.choice(['BTC/USDT', 'ETH/USDT']),
+        'Trade Size': float(rng.randint(10, 500)),
+        'Status': status,
+        'Outcome': '' if pnl is None else ('Win' if pnl > 0 else 'Loss' if pnl < 0 else 'Break Even'),
+        'PnL': pnl,
+        'PnL %': None if pnl is None else round(pnl / 10, 2),
+        'Position Type': rng.choice(['Long Position', 'Short Position']),
+    }
+
+
+def random_frame(rng, count):
+    rows = [random_trade(rng) for _ in range(count)]
+    return apply_schema(pd.DataFrame(rows, index=pd.Index(range(1, count + 1), name='id')))
+
+
+def assert_same_metrics(actual, expected):
+    assert list(actual) == MATRIX_KEYS
+    for key in MATRIX_KEYS:
+        a, e = actual[key], expected[key]
+        if isinstance(e, str):
+            assert a == e, key
+        elif isinstance(e, float) and math.isnan(e):
+            assert math.isnan(a), key
+        else:
+            assert a == pytest.approx(e, rel=1e-9, abs=1e-9), key
+
+
+def assert_same_dashboard(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert actual[key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+        else:
+            assert actual[key] == value, key
+
+
+def test_running_stats_matches_numpy():
+    stats = RunningStats([1.0, 4.0, -2.0])
+    stats.add(3.0)
+    assert stats.remove(1.0)           # not an extreme
+    assert not stats.remove(4.0)       # was the maximum
+    assert stats.count == 2
+    assert stats.total == pytest.approx(1.0)
+
+
+def test_kernel_uses_no_deprecated_pandas_behaviour():
+    # Running trades have Outcome '' and real journals hold unknown values
+    df = random_frame(random.Random(6), 40)
+    df = set_trade(df, 41, {'Time': '2024-03-09 12:00:00', 'Status': 'Closed', 'PnL': 1.0,
+                            'Outcome': 'Scratched', 'Position Type': ''})
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', PANDAS_DEPRECATION)
+        metrics = compute_metrics(df, 1000.0, 1000.0, today=TODAY)
+    assert metrics['Trades'] == 41
+
+
+def test_removing_one_of_several_equal_extremes_stays_incremental():
+    stats = RunningStats([0.0, 0.0, 5.0, 5.0])
+    assert stats.remove(0.0)
+    assert stats.remove(5.0)
+    assert (stats.min(), stats.max()) == (0.0, 5.0)
+    stats.add(5.0)
+    assert stats.remove(5.0)
+    assert not stats.remove(5.0)       # last copy of the maximum
+
+
+def test_editing_a_running_trade_does_not_rebuild(monkeypatch):
+    df = random_frame(random.Random(7), 30)
+    acc = MetricsAccumulator(df)
+    running = [trade_id for trade_id in df.index if df.at[trade_id, 'Status'] == 'Running']
+    monkeypatch.setattr(acc, 'rebuild', lambda *args, **kwargs: pytest.fail('full rebuild'))
+    trade_id = running[0]
+    old_row = df.loc[trade_id].to_dict()
+    df = set_trade(df, trade_id, {'Notes': 'moved stop'})
+    acc.replace(trade_id, old_row, df.loc[trade_id].to_dict(), df)
+
+
+def test_empty_frame_matches_kernel():
+    assert MetricsAccumulator(None).matrix(1000.0, 500.0, today=TODAY) == compute_metrics(None, 1000.0, 500.0)
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_rebuild_matches_kernel(seed):
+    df = random_frame(random.Random(seed), 60)
+    expected = compute_metrics(df, 1200.0, 1000.0, today=TODAY)
+    assert_same_metrics(MetricsAccumulator(df).matrix(1200.0, 1000.0, today=TODAY), expected)
+
+
+@pytest.mark.parametrize('seed', [4, 5])
+def test_incremental_updates_match_kernel(seed):
+    rng = random.Random(seed)
+    df = random_frame(rng, 20)
+    acc = MetricsAccumulator(df)
+    next_id = len(df) + 1
+    for _ in range(60):
+        action = rng.choice(['add', 'update', 'delete'])
+        if action == 'add' or len(df) < 2:
+            df = set_trade(df, next_id, random_trade(rng))
+            acc.add(next_id, df.loc[next_id].to_dict(), df)
+            next_id += 1
+        elif action == 'update':
+            trade_id = rng.choice(list(df.index))
+            old_row = df.loc[trade_id].to_dict()
+            df = set_trade(df, trade_id, random_trade(rng))
+            acc.replace(trade_id, old_row, df.loc[trade_id].to_dict(), df)
+        else:
+            trade_id = rng.choice(list(df.index))
+            old_row = df.loc[trade_id].to_dict()
+            df = df.drop(trade_id)
+            acc.remove(trade_id, old_row, df)
+
+        expected = compute_metrics(df, 1000.0, 1000.0, today=TODAY)
+        assert_same_metrics(acc.matrix(1000.0, 1000.0, today=TODAY), expected)
+        assert_same_dashboard(acc.dashboard(), MetricsAccumulator(df).dashboard())
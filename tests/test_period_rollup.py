@@ -0,0 +1,95 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from period_rollup import PeriodRollup, RollupSidecar, period_label, period_start
+from trade_schema import apply_schema
+
+JAN_31 = datetime.date(2024, 1, 31)   # a Wednesday
+
+
+def frame(rows):
+    return apply_schema(pd.DataFrame(rows, index=pd.Index(range(1, len(rows) + 1), name='id')))
+
+
+def closed(time, pnl, size=100.0):
+    return {'Time': time, 'Status': 'Closed', 'PnL': pnl, 'PnL %': pnl / 10, 'Trade Size': size}
+
+
+TRADES = [
+    closed('2024-01-30 09:00:00', 10.0),
+    closed('2024-01-31 09:00:00', -4.0),
+    closed('2024-01-31 18:00:00', 6.0),
+    closed('2024-02-01 09:00:00', 2.0),
+    {'Time': '2024-02-01 10:00:00', 'Status': 'Running', 'PnL': None, 'Trade Size': 50.0},
+    closed(None, 99.0),
+]
+
+
+def test_period_start_and_label():
+    assert period_start('day', JAN_31) == JAN_31
+    assert period_start('week', JAN_31) == datetime.date(2024, 1, 29)
+    assert period_start('month', JAN_31) == datetime.date(2024, 1, 1)
+    assert period_label('week', datetime.date(2024, 1, 29)) == '2024-W05'
+    assert period_label('month', datetime.date(2024, 1, 1)) == '2024-01'
+    with pytest.raises(ValueError):
+        period_start('year', JAN_31)
+
+
+def test_grouped_build_matches_single_adds():
+    df = frame(TRADES)
+    built = PeriodRollup.from_trades(df)
+    added = PeriodRollup()
+    for _, row in df[df['Status'] == 'Closed'].iterrows():
+        if pd.notna(row['Time']):
+            added.add(row['Time'], row['PnL'], row['PnL %'], row['Trade Size'])
+    assert built.to_json() == added.to_json()
+
+
+def test_closed_trades_with_time_only():
+    rollup = PeriodRollup.from_trades(frame(TRADES))
+    day = rollup.get('day', JAN_31)
+    assert (day.count, day.wins, day.losses, day.pnl) == (2, 1, 1, 2.0)
+    assert (day.low, day.high) == (-4.0, 6.0)
+    assert rollup.get('week', JAN_31).count == 4
+    assert [row['period'] for row in rollup.between('month')] == ['2024-01', '2024-02']
+
+
+def test_between_and_totals_use_half_open_ranges():
+    rollup = PeriodRollup.from_trades(frame(TRADES))
+    rows = rollup.between('day', '2024-01-31', '2024-02-01')
+    assert [row['start'] for row in rows] == ['2024-01-31']
+    totals = rollup.totals('2024-01-30', '2024-02-01')
+    assert (totals.count, totals.pnl) == (3, 12.0)
+
+
+def test_removing_an_extreme_asks_for_a_rebuild():
+    rollup = PeriodRollup.from_trades(frame(TRADES[:3]))
+    assert rollup.remove('2024-01-31 18:00:00', 6.0, 0.6, 100.0) is False
+
+
+def test_removing_one_of_equal_extremes_keeps_the_period():
+    rollup = PeriodRollup.from_trades(frame(TRADES[:3] + [closed('2024-01-31 20:00:00', 6.0)]))
+    assert rollup.get('day', JAN_31).high_count == 2
+    assert rollup.remove('2024-01-31 18:00:00', 6.0, 0.6, 100.0) is True
+    assert rollup.get('day', JAN_31).high == 6.0
+
+
+def test_removing_the_only_trade_empties_the_periods():
+    rollup = PeriodRollup.from_trades(frame(TRADES[:1]))
+    assert rollup.remove('2024-01-30 09:00:00', 10.0, 1.0, 100.0) is True
+    assert rollup.between('day') == rollup.between('week') == rollup.between('month') == []
+
+
+def test_json_round_trip():
+    rollup = PeriodRollup.from_trades(frame(TRADES))
+    assert PeriodRollup.from_json(rollup.to_json()).to_json() == rollup.to_json()
+
+
+def test_sidecar_only_returns_rollups_of_the_same_stamp(tmp_path):
+    sidecar = RollupSidecar(str(tmp_path))
+    rollup = PeriodRollup.from_trades(frame(TRADES))
+    sidecar.write(rollup.to_json(), ((1, 2),))
+    assert sidecar.read(((1, 2),)).to_json() == rollup.to_json()
+    assert sidecar.read(((1, 3),)) is None
@@ -0,0 +1,153 @@
+import os
+import time
+import threading
+import zipfile
+
+import pandas as pd
+import pytest
+
+from screenshot_cache import THUMB_DIR
+from screenshot_gc import GRACE_SECONDS, collect, scan_profiles
+
+
+class FakeRepository:
+    def __init__(self, *screenshots):
+        self.screenshots = list(screenshots)
+
+    def frame(self):
+        return pd.DataFrame({'Screenshot1': self.screenshots, 'Screenshot2': [''] * len(self.screenshots)})
+
+
+def make_file(folder, name, age=GRACE_SECONDS * 2, size=10):
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, name)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def profile(profile_id, folder, repository):
+    return {'id': profile_id, 'name': f'p{profile_id}', 'folder': folder, 'repository': repository}
+
+
+@pytest.fixture
+def folders(tmp_path):
+    return str(tmp_path / 'profile_1' / 'screenshots'), str(tmp_path / 'profile_2' / 'screenshots')
+
+
+def orphan_paths(report):
+    return sorted(path for path, _ in report['orphans'])
+
+
+def test_scan_classifies_referenced_recent_and_orphaned(folders):
+    folder, _ = folders
+    used = make_file(folder, 'used.png')
+    old = make_file(folder, 'old.png')
+    make_file(folder, 'fresh.png', age=10)
+
+    [report] = scan_profiles([profile(1, folder, FakeRepository(used))])
+    assert report['files'] == 3
+    assert report['referenced_files'] == 1
+    assert report['recent_files'] == 1
+    assert orphan_paths(report) == [old]
+    assert report['orphan_bytes'] == 10
+
+
+def test_keep_paths_are_never_orphans(folders):
+    folder, _ = folders
+    pending = make_file(folder, 'pending.png')
+    [report] = scan_profiles([profile(1, folder, FakeRepository())], keep=[pending])
+    assert report['orphans'] == []
+
+
+def test_files_used_by_another_profile_are_kept(folders):
+    source_folder, imported_folder = folders
+    shared = make_file(source_folder, 'shared.png')
+    os.makedirs(imported_folder)
+
+    reports = scan_profiles([
+        profile(1, source_folder, FakeRepository()),
+        profile(2, imported_folder, FakeRepository(shared)),
+    ])
+    assert reports[0]['orphans'] == []
+    assert reports[0]['referenced_files'] == 1
+
+
+def test_stale_thumbnails_are_orphans(folders):
+    folder, _ = folders
+    used = make_file(folder, 'used.png')
+    thumbs = os.path.join(folder, THUMB_DIR)
+    make_file(thumbs, 'used.jpg')
+    stale = make_file(thumbs, 'gone.jpg')
+
+    [report] = scan_profiles([profile(1, folder, FakeRepository(used))])
+    assert [path for path, _ in report['orphan_thumbs']] == [stale]
+
+
+def test_collect_deletes_orphans(folders):
+    folder, _ = folders
+    used = make_file(folder, 'used.png')
+    old = make_file(folder, 'old.png')
+    reports = scan_profiles([profile(1, folder, FakeRepository(used))])
+
+    result = collect(reports, mode='delete')
+    assert result['files'] == 1
+    assert not os.path.exists(old)
+    assert os.path.exists(used)
+
+
+def test_collect_skips_files_referenced_since_the_scan(folders):
+    folder, _ = folders
+    old = make_file(folder, 'old.png')
+    repository = FakeRepository()
+    reports = scan_profiles([profile(1, folder, repository)])
+    assert orphan_paths(reports[0]) == [old]
+
+    repository.screenshots.append(old)
+    result = collect(reports, mode='delete')
+    assert result['files'] == 0
+    assert os.path.exists(old)
+
+
+def test_collect_skips_keep_paths(folders):
+    folder, _ = folders
+    old = make_file(folder, 'old.png')
+    reports = scan_profiles([profile(1, folder, FakeRepository())])
+    collect(reports, mode='delete', keep=[old])
+    assert os.path.exists(old)
+
+
+def test_collect_archives_into_exports(folders):
+    folder, _ = folders
+    old = make_file(folder, 'old.png')
+    reports = scan_profiles([profile(1, folder, FakeRepository())])
+
+    result = collect(reports, mode='archive')
+    [archive] = result['archives']
+    assert os.path.dirname(archive) == os.path.join(os.path.dirname(folder), 'exports')
+    with zipfile.ZipFile(archive) as zf:
+        assert zf.namelist() == ['old.png']
+    assert not os.path.exists(old)
+
+
+def test_scan_opens_repositories_and_reports_progress(folders):
+    folder, other = folders
+    used = make_file(folder, 'used.png')
+    make_file(other, 'old.png')
+    repositories = {1: FakeRepository(used), 2: FakeRepository()}
+    opened, steps = [], []
+
+    def open_repository(profile_id):
+        opened.append((profile_id, threading.current_thread().name))
+        return repositories[profile_id]
+
+    profiles = [{'id': 1, 'name': 'p1', 'folder': folder}, {'id': 2, 'name': 'p2', 'folder': other}]
+    reports = scan_profiles(profiles, progress=lambda done, total: steps.append((done, total)),
+                            open_repository=open_repository)
+
+    assert opened == [(1, threading.current_thread().name), (2, threading.current_thread().name)]
+    assert steps == [(1, 4), (2, 4), (3, 4), (4, 4)]
+    assert [report['repository'] for report in reports] == [repositories[1], repositories[2]]
+    assert [len(report['orphans']) for report in reports] == [0, 1]
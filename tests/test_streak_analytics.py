@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from metrics_engine import MetricsAccumulator, compute_metrics
+from streak_analytics import StreakStats, run_lengths, WIN, LOSS
+from trade_schema import apply_schema, set_trade
+
+
+def frame(rows):
+    df = pd.DataFrame(rows, index=pd.Index(range(1, len(rows) + 1), name='id'))
+    return apply_schema(df)
+
+
+def closed(time, pnl):
+    return {'Time': time, 'Pair': 'BTC', 'Status': 'Closed', 'PnL': pnl}
+
+
+def test_run_lengths():
+    signs, lengths = run_lengths([1, 1, -1, 0, 0, 0, 1])
+    assert signs.tolist() == [1, -1, 0, 1]
+    assert lengths.tolist() == [2, 1, 3, 1]
+
+
+def test_push_matches_batch_encoding():
+    pnl = [5.0, 3.0, -1.0, float('nan'), -2.0, -4.0, 1.0]
+    pushed = StreakStats()
+    for value in pnl:
+        pushed.push(value)
+    assert pushed.summary() == StreakStats(np.array(pnl)).summary()
+
+
+def test_streaks_follow_time_not_id_order():
+    # Trade 3 is back-dated between trades 1 and 2
+    df = frame([
+        closed('2024-01-01 10:00:00', 10.0),
+        closed('2024-01-03 10:00:00', 10.0),
+        closed('2024-01-02 10:00:00', -5.0),
+    ])
+    stats = StreakStats.from_trades(df)
+    assert stats.longest[WIN] == 1
+    assert stats.longest[LOSS] == 1
+    assert stats.current() == '1 Win'
+
+
+def test_all_time_and_range_streaks_agree():
+    df = frame([
+        closed('2024-01-05 10:00:00', 1.0),
+        closed('2024-01-01 10:00:00', -1.0),
+        closed('2024-01-03 10:00:00', 2.0),
+        closed('2024-01-02 10:00:00', -3.0),
+        {'Time': '2024-01-04 10:00:00', 'Pair': 'ETH', 'Status': 'Running'},
+    ])
+    time_ordered = df.sort_values('Time', kind='stable')
+    expected = StreakStats.from_trades(time_ordered).summary()
+
+    assert StreakStats.from_trades(df).summary() == expected
+    assert MetricsAccumulator(df).streaks.summary() == expected
+    metrics = compute_metrics(df, 1000.0, 1000.0)
+    assert metrics['Current Streak'] == expected['current']
+    assert metrics['Max Consec. Loss'] == expected['longest']['Loss']
+
+
+def test_accumulator_rebuilds_streaks_for_back_dated_insert():
+    df = frame([
+        closed('2024-01-01 10:00:00', 1.0),
+        closed('2024-01-03 10:00:00', 1.0),
+    ])
+    acc = MetricsAccumulator(df)
+
+    back_dated = closed('2024-01-02 10:00:00', -1.0)
+    df = set_trade(df, 3, back_dated)
+    acc.add(3, df.loc[3].to_dict(), df)
+    assert acc.streaks.summary() == StreakStats.from_trades(df).summary()
+    assert acc.streaks.current() == '1 Win'
+
+    newest = closed('2024-01-04 10:00:00', 2.0)
+    df = set_trade(df, 4, newest)
+    acc.add(4, df.loc[4].to_dict(), df)
+    assert acc.streaks.current() == '2 Win'
@@ -0,0 +1,59 @@
+import os
+import time
+
+import pytest
+
+from trade_repository import TradeRepository
+from trade_store import SqliteTradeStore
+
+
+def trade(pair, pnl=None, status='Running'):
+    return {'Time': '2024-01-02 10:00:00', 'Pair': pair, 'Trade Size': 100.0,
+            'Status': status, 'PnL': pnl}
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = TradeRepository(SqliteTradeStore(str(tmp_path)))
+    repository.SIDECAR_DELAY_SECONDS = 0.2
+    repository.dashboard_metrics()   # load the frame and start tracking metrics
+    yield repository
+    repository.close()
+
+
+def sidecar_mtimes(repository):
+    return [os.stat(path).st_mtime_ns if os.path.exists(path) else None
+            for path in (repository.sidecar.path, repository.rollup_sidecar.path)]
+
+
+def test_edits_do_not_rewrite_sidecars_until_flush(repository):
+    before = sidecar_mtimes(repository)
+    trade_id = repository.add(trade('BTC'))
+    repository.update(trade_id, {'Status': 'Closed', 'PnL': 5.0})
+    assert sidecar_mtimes(repository) == before
+
+    assert repository.flush()
+    assert repository.sidecar.read(repository.store.stamp()) is not None
+    periods = repository.rollup_sidecar.read(repository.store.stamp())
+    assert periods is not None and periods.totals().to_dict()['pnl'] == 5.0
+
+
+def test_sidecars_are_written_once_edits_are_quiet(repository):
+    repository.add(trade('BTC'))
+    deadline = time.monotonic() + 5
+    while repository.sidecar.read(repository.store.stamp()) is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert repository.rollup_sidecar.read(repository.store.stamp()) is not None
+
+
+def test_close_writes_pending_sidecars(tmp_path):
+    repository = TradeRepository(SqliteTradeStore(str(tmp_path)))
+    repository.SIDECAR_DELAY_SECONDS = 60
+    repository.frame()
+    trade_id = repository.add(trade('ETH'))
+    repository.close()
+
+    reopened = TradeRepository(SqliteTradeStore(str(tmp_path)))
+    assert reopened.sidecar.read(reopened.store.stamp()) is not None
+    assert list(reopened.frame().index) == [trade_id]
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from trade_schema import TradeSchemaError, apply_schema, coerce_trade, format_value, set_trade
+
+
+def typed_frame():
+    df = pd.DataFrame([{'Time': '2024-01-01 09:30:00', 'Pair': 'BTC', 'Status': 'Closed', 'PnL': '12.5'}],
+                      index=pd.Index([1], name='id'))
+    return apply_schema(df)
+
+
+def test_apply_schema_types():
+    df = typed_frame()
+    assert pd.api.types.is_datetime64_any_dtype(df['Time'])
+    assert df['PnL'].dtype == 'float64'
+    assert isinstance(df['Pair'].dtype, pd.CategoricalDtype)
+    assert df.at[1, 'Notes'] == ''
+
+
+def test_coerce_trade_rejects_bad_values():
+    assert coerce_trade({'PnL': '3', 'Time': '2024-01-02 10:00:00'}) == {'PnL': 3.0, 'Time': '2024-01-02 10:00:00'}
+    with pytest.raises(TradeSchemaError):
+        coerce_trade({'PnL': 'ten'})
+    with pytest.raises(TradeSchemaError):
+        coerce_trade({'Time': 'yesterday-ish'})
+
+
+def test_insert_keeps_column_dtypes():
+    df = typed_frame()
+    dtypes = df.dtypes.map(lambda dtype: type(dtype).__name__)
+    df = set_trade(df, 2, coerce_trade({'Time': '2024-01-02 10:00:00', 'Pair': 'ETH', 'Status': 'Running'}))
+    assert list(df.index) == [1, 2]
+    assert df.index.name == 'id'
+    assert (df.dtypes.map(lambda dtype: type(dtype).__name__) == dtypes).all()
+    row = df.loc[2]
+    assert row['Pair'] == 'ETH'
+    assert row['Outcome'] == '' and row['Notes'] == ''
+    assert pd.isna(row['PnL'])
+
+
+def test_insert_does_not_touch_the_original_frame():
+    df = typed_frame()
+    set_trade(df, 2, coerce_trade({'Pair': 'ETH'}))
+    assert list(df.index) == [1]
+
+
+def test_update_in_place():
+    df = typed_frame()
+    df = set_trade(df, 1, coerce_trade({'PnL': None, 'Status': 'Running'}))
+    assert pd.isna(df.at[1, 'PnL'])
+    assert format_value(df.at[1, 'Time']) == '2024-01-01 09:30:00'
@@ -0,0 +1,142 @@
+import os
+
+import pytest
+
+from trade_store import SqliteTradeStore, XlsxWalTradeStore
+
+
+def trade(pair, pnl=None, status='Running'):
+    return {'Time': '2024-01-02 10:00:00', 'Pair': pair, 'Trade Size': 100.0,
+            'Status': status, 'PnL': pnl}
+
+
+@pytest.fixture
+def xlsx_store(tmp_path):
+    store = XlsxWalTradeStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+def test_wal_replay_applies_insert_update_delete(xlsx_store):
+    first = xlsx_store.insert(trade('BTC'))
+    second = xlsx_store.insert(trade('ETH'))
+    xlsx_store.update(first, {'Status': 'Closed', 'PnL': 12.5})
+    xlsx_store.delete(second)
+
+    df = xlsx_store.load()
+    assert list(df.index) == [first]
+    assert df.at[first, 'Status'] == 'Closed'
+    assert df.at[first, 'PnL'] == 12.5
+    assert not os.path.exists(xlsx_store.xlsx_path)
+
+
+def test_compaction_keeps_trades_and_empties_log(xlsx_store):
+    first = xlsx_store.insert(trade('BTC'))
+    xlsx_store.update(first, {'PnL': 3.0})
+    before = xlsx_store.load()
+
+    xlsx_store.compact()
+
+    assert os.path.getsize(xlsx_store.wal_path) == 0
+    after = xlsx_store.load()
+    assert list(after.index) == list(before.index)
+    assert after.at[first, 'Pair'] == 'BTC'
+    assert after.at[first, 'PnL'] == 3.0
+
+
+def test_compaction_notifies_rewrite_listeners(xlsx_store):
+    calls = []
+    xlsx_store.rewrite_listeners.append(lambda old, new: calls.append((old, new)))
+    xlsx_store.insert(trade('BTC'))
+    xlsx_store.compact()
+    assert len(calls) == 1
+    assert calls[0][0] != calls[0][1]
+
+
+def test_torn_final_log_line_is_dropped(tmp_path):
+    store = XlsxWalTradeStore(str(tmp_path))
+    trade_id = store.insert(trade('BTC'))
+    store.close()
+    with open(store.wal_path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "insert", "id": 99')
+
+    reopened = XlsxWalTradeStore(str(tmp_path))
+    try:
+        assert list(reopened.load().index) == [trade_id]
+    finally:
+        reopened.close()
+
+
+def test_ids_are_not_reused_after_delete(xlsx_store):
+    first = xlsx_store.insert(trade('BTC'))
+    xlsx_store.delete(first)
+    assert xlsx_store.insert(trade('ETH')) > first
+
+
+def test_ids_are_not_reused_after_compaction_and_restart(tmp_path):
+    store = XlsxWalTradeStore(str(tmp_path))
+    store.insert(trade('BTC'))
+    last = store.insert(trade('ETH'))
+    store.compact()
+    store.delete(last)
+    store.compact()
+    store.close()
+
+    reopened = XlsxWalTradeStore(str(tmp_path))
+    try:
+        assert reopened.allocate_id() > last
+    finally:
+        reopened.close()
+
+
+def test_compaction_writes_trades_in_id_order(xlsx_store):
+    ids = [xlsx_store.insert(trade(pair)) for pair in ('BTC', 'ETH', 'SOL', 'XRP')]
+    xlsx_store.compact()
+    xlsx_store.delete(ids[2])
+    xlsx_store.insert(trade('ADA'), trade_id=ids[2])   # undo re-inserts with the old id
+    xlsx_store.compact()
+
+    assert list(xlsx_store.load().index) == ids
+
+
+def test_id_high_water_mark_survives_backend_switches(tmp_path):
+    sqlite_store = SqliteTradeStore(str(tmp_path))
+    sqlite_store.insert(trade('BTC'))
+    last = sqlite_store.insert(trade('ETH'))
+    sqlite_store.delete(last)
+
+    store = XlsxWalTradeStore(str(tmp_path))
+    try:
+        assert store.allocate_id() == last + 1
+    finally:
+        store.close()
+    assert SqliteTradeStore(str(tmp_path)).allocate_id() == last + 1
+
+
+def test_xlsx_store_migrates_sqlite_trades(tmp_path):
+    sqlite_store = SqliteTradeStore(str(tmp_path))
+    trade_id = sqlite_store.insert(trade('BTC', pnl=4.0, status='Closed'))
+
+    store = XlsxWalTradeStore(str(tmp_path))
+    try:
+        df = store.load()
+        assert list(df.index) == [trade_id]
+        assert df.at[trade_id, 'PnL'] == 4.0
+    finally:
+        store.close()
+    assert not os.path.exists(os.path.join(tmp_path, 'trades.db'))
+    assert os.path.exists(os.path.join(tmp_path, 'trades_legacy.db'))
+
+
+def test_sqlite_store_migrates_workbook_and_log(tmp_path):
+    store = XlsxWalTradeStore(str(tmp_path))
+    first = store.insert(trade('BTC'))
+    store.compact()
+    second = store.insert(trade('ETH'))   # still only in the log
+    store.update(first, {'PnL': 7.0})
+    store.close()
+
+    df = SqliteTradeStore(str(tmp_path)).load()
+    assert list(df.index) == [first, second]
+    assert df.at[first, 'PnL'] == 7.0
+    assert not os.path.exists(os.path.join(tmp_path, 'trades.wal'))
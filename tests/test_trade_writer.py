@@ -0,0 +1,74 @@
+import time
+
+from trade_writer import TradeSaveWriter
+
+
+class RecordingStore:
+    def __init__(self):
+        self.batches = []
+
+    def apply_batch(self, ops):
+        self.batches.append(list(ops))
+
+
+def test_merge_insert_then_update_stays_insert():
+    merged = TradeSaveWriter._merge(('insert', {'Pair': 'BTC', 'PnL': None}), ('update', {'PnL': 5.0}))
+    assert merged == ('insert', {'Pair': 'BTC', 'PnL': 5.0})
+
+
+def test_merge_update_then_update_combines_fields():
+    merged = TradeSaveWriter._merge(('update', {'Notes': 'a'}), ('update', {'PnL': 1.0}))
+    assert merged == ('update', {'Notes': 'a', 'PnL': 1.0})
+
+
+def test_merge_insert_then_delete_cancels_out():
+    assert TradeSaveWriter._merge(('insert', {'Pair': 'BTC'}), ('delete', None)) is None
+
+
+def test_merge_update_then_delete_is_delete():
+    assert TradeSaveWriter._merge(('update', {'PnL': 1.0}), ('delete', None)) == ('delete', None)
+
+
+def test_merge_without_previous_keeps_new():
+    assert TradeSaveWriter._merge(None, ('update', {'PnL': 1.0})) == ('update', {'PnL': 1.0})
+
+
+def test_submit_coalesces_per_trade():
+    writer = TradeSaveWriter(RecordingStore())
+    writer.submit('insert', 1, {'Pair': 'BTC'})
+    writer.submit('update', 1, {'PnL': 2.0})
+    writer.submit('insert', 2, {'Pair': 'ETH'})
+    writer.submit('delete', 2)
+    assert writer._pending == {1: ('insert', {'Pair': 'BTC', 'PnL': 2.0})}
+
+
+def test_cancelled_out_submit_clears_first_dirty():
+    writer = TradeSaveWriter(RecordingStore())
+    writer.submit('insert', 1, {'Pair': 'BTC'})
+    writer.submit('delete', 1)
+    assert not writer.has_queued()
+    assert writer._first_dirty is None
+
+
+def test_flush_when_idle_keeps_debounce():
+    writer = TradeSaveWriter(RecordingStore())
+    assert writer.flush(timeout=0.1)
+    assert writer._first_dirty is None
+
+    writer.submit('update', 1, {'PnL': 1.0})
+    # A fresh edit still waits for the debounce window
+    assert writer._due_in(time.monotonic()) > 0
+
+
+def test_flush_writes_queued_batch():
+    store = RecordingStore()
+    writer = TradeSaveWriter(store)
+    writer.start()
+    try:
+        writer.submit('insert', 1, {'Pair': 'BTC'})
+        writer.submit('update', 1, {'PnL': 3.0})
+        assert writer.flush(timeout=5)
+        assert store.batches == [[('insert', 1, {'Pair': 'BTC', 'PnL': 3.0})]]
+        assert writer._first_dirty is None
+    finally:
+        writer.stop(timeout=5)
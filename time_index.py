@@ -0,0 +1,39 @@
+"""
+Time Range Index
+Trades sorted by time as int64 epochs, so date-range filters are a binary search
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _to_epoch(value):
+    """Nanoseconds since the epoch for a date/datetime/string bound"""
+    return pd.Timestamp(value).as_unit('ns').value
+
+
+class TimeRangeIndex:
+    """Row positions of a trades frame ordered by their Time column.
+
+    Built once per frame version; between() finds a date range with two
+    searchsorted calls and returns a contiguous slice of the sorted positions.
+    Trades without a valid Time are left out of every range.
+    """
+
+    def __init__(self, times):
+        stamps = times.to_numpy(dtype='datetime64[ns]')
+        valid = ~np.isnat(stamps)
+        values = stamps.view('int64')
+        positions = np.flatnonzero(valid)
+        order = np.argsort(values[valid], kind='stable')
+        self.epochs = values[valid][order]
+        self.positions = positions[order]
+
+    def __len__(self):
+        return len(self.epochs)
+
+    def between(self, start=None, end=None):
+        """Row positions with start <= Time < end (either bound may be None), in time order"""
+        lo = 0 if start is None else np.searchsorted(self.epochs, _to_epoch(start), side='left')
+        hi = len(self.epochs) if end is None else np.searchsorted(self.epochs, _to_epoch(end), side='left')
+        return self.positions[lo:max(lo, hi)]
@@ -0,0 +1,393 @@
+"""
+Trade Repository
+One shared, cached trades DataFrame per profile
+"""
+
+import os
+import json
+import time
+import threading
+
+import pandas as pd
+
+from trade_store import open_trade_store, empty_trades_frame
+from trade_schema import apply_schema, coerce_trade, set_trade
+from time_index import TimeRangeIndex
+from metrics_engine import MetricsAccumulator
+from matrix_cache import MatrixCache
+from downsample import equity_curve
+from period_rollup import RollupSidecar
+
+# Columnar sidecar cache (optional)
+try:
+    import pyarrow.feather as feather
+    FEATHER_AVAILABLE = True
+except ImportError:
+    FEATHER_AVAILABLE = False
+
+
+class FeatherSidecar:
+    """trades.feather next to the trade store, stamped with the store's (mtime, size)
+
+    Reading a Feather file is 50-100x faster than parsing trades.xlsx (or
+    querying SQLite into pandas), so cold starts and profile switches use it
+    whenever its stamp in trades.feather.json still matches the store.
+    """
+
+    def __init__(self, profile_path):
+        self.path = os.path.join(profile_path, 'trades.feather')
+        self.meta_path = os.path.join(profile_path, 'trades.feather.json')
+
+    def _read_stamp(self):
+        try:
+            with open(self.meta_path, 'r') as f:
+                return json.load(f).get('source_stamp')
+        except Exception:
+            return None
+
+    def _write_stamp(self, stamp):
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'source_stamp': stamp}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    @staticmethod
+    def _stamp_json(stamp):
+        # Tuples come back from JSON as lists
+        return json.loads(json.dumps(stamp))
+
+    def read(self, stamp):
+        """Cached frame if it was written for this store stamp, else None"""
+        if not FEATHER_AVAILABLE or not os.path.exists(self.path):
+            return None
+        if self._read_stamp() != self._stamp_json(stamp):
+            return None
+        try:
+            df = feather.read_feather(self.path)
+        except Exception as e:
+            print(f"Error reading {self.path}: {e}")
+            return None
+        return df.set_index('id')
+
+    def write(self, df, stamp):
+        if not FEATHER_AVAILABLE:
+            return
+        try:
+            # Invalidate first so a crash mid-write never pairs old stamp with new data
+            if os.path.exists(self.meta_path):
+                os.remove(self.meta_path)
+            out = df.reset_index()
+            for col in out.columns:
+                if out[col].dtype == object and pd.api.types.infer_dtype(out[col], skipna=True) not in ('string', 'empty'):
+                    # Arrow needs one type per column; form values mix text and numbers
+                    out[col] = out[col].map(lambda v: None if v is None or (isinstance(v, float) and pd.isna(v))
+                                            else v if isinstance(v, str) else str(v))
+            tmp_path = self.path + '.tmp'
+            feather.write_feather(out, tmp_path)
+            os.replace(tmp_path, self.path)
+            self._write_stamp(stamp)
+        except Exception as e:
+            print(f"Error writing {self.path}: {e}")
+
+    def restamp(self, old_stamp, new_stamp):
+        """Store files were rewritten with identical content"""
+        if FEATHER_AVAILABLE and self._read_stamp() == self._stamp_json(old_stamp):
+            try:
+                self._write_stamp(new_stamp)
+            except OSError:
+                pass
+
+
+class TradeRepository:
+    """Owns the parsed trades DataFrame of one profile.
+
+    The frame is parsed once and reused until the store's (mtime, size) stamp
+    changes on disk. Writes made through the repository update the cached frame
+    in place and persist a single row through the store, so they never trigger
+    a re-parse. With a TradeSaveWriter attached, persisting happens on the
+    writer thread and the cached frame stays authoritative until it has caught
+    up. Treat the frame returned by frame() as read-only.
+
+    The Feather and rollup sidecars are rewritten once edits have been quiet for
+    SIDECAR_DELAY_SECONDS, on flush() and on close(), never once per edit.
+    """
+
+    SIDECAR_DELAY_SECONDS = 2.0
+
+    def __init__(self, store):
+        self.store = store
+        self.sidecar = FeatherSidecar(store.profile_path)
+        self.rollup_sidecar = RollupSidecar(store.profile_path)
+        self._lock = threading.RLock()
+        self._df = None
+        self._stamp = None
+        self.version = 0  # bumped on every reload or write
+        self.loads = 0
+        self._time_index = None
+        self._time_index_version = None
+        self._metrics = MetricsAccumulator()
+        self._metrics_version = None  # frame version the accumulator reflects
+        self.equity_cache = MatrixCache(maxsize=16)  # (version, start, points) -> chart series
+        self.writer = None
+        self._unsynced = False  # edits queued on the writer, not on disk yet
+        self._sidecars_dirty = False  # sidecars are behind the store
+        self._last_write = 0.0
+        self._sidecar_timer = None
+        store.rewrite_listeners.append(self._store_rewritten)
+
+    def attach_writer(self, writer):
+        """Persist through a TradeSaveWriter instead of on the calling thread"""
+        with self._lock:
+            self.writer = writer
+            writer.on_batch_written = self._batch_written
+
+    def detach_writer(self):
+        """Flush and stop the attached writer; later writes persist synchronously"""
+        writer = self.writer
+        if writer is None:
+            return
+        writer.stop()
+        with self._lock:
+            self.writer = None
+
+    def flush(self, timeout=10.0):
+        """Wait until edits have reached the store and the sidecars; returns True when synced"""
+        writer = self.writer
+        synced = writer is None or writer.flush(timeout)
+        self._write_sidecars()
+        return synced
+
+    def close(self):
+        """Flush and stop the writer and bring the sidecars up to date"""
+        self.detach_writer()
+        with self._lock:
+            if self._sidecar_timer is not None:
+                self._sidecar_timer.cancel()
+                self._sidecar_timer = None
+        self._write_sidecars()
+
+    def _store_rewritten(self, old_stamp, new_stamp):
+        # Same content, new files (e.g. log compaction): keep the cached frame
+        if self._stamp == old_stamp:
+            self._stamp = new_stamp
+        self.sidecar.restamp(old_stamp, new_stamp)
+
+    def frame(self):
+        """Current trades, re-read from the store only if it changed on disk"""
+        with self._lock:
+            if self._unsynced and self._df is not None:
+                # The store is behind the cached frame until the writer catches up
+                return self._df
+            stamp = self.store.stamp()
+            if self._df is None or stamp != self._stamp:
+                try:
+                    df = self.sidecar.read(stamp)
+                    if df is None:
+                        df = self.store.load()
+                        self.sidecar.write(df, stamp)
+                    self._df = apply_schema(df)
+                    self._sidecars_dirty = False
+                except Exception as e:
+                    print(f"Error loading trades from {self.store.profile_path}: {e}")
+                    if self._df is None:
+                        self._df = apply_schema(empty_trades_frame())
+                self._stamp = stamp
+                self.version += 1
+                self.loads += 1
+            return self._df
+
+    def current_version(self):
+        """Frame version after checking the store on disk; changes whenever the trades do"""
+        with self._lock:
+            self.frame()
+            return self.version
+
+    def time_index(self):
+        """TimeRangeIndex of the current frame, rebuilt only when the frame changed"""
+        with self._lock:
+            df = self.frame()
+            if self._time_index is None or self._time_index_version != self.version:
+                self._time_index = TimeRangeIndex(df['Time'])
+                self._time_index_version = self.version
+            return self._time_index
+
+    def trades_between(self, start=None, end=None):
+        """Trades with start <= Time < end, in time order"""
+        with self._lock:
+            positions = self.time_index().between(start, end)
+            return self.frame().iloc[positions]
+
+    def equity_curve(self, points=None, start=None):
+        """Downsampled cumulative PnL (see downsample.equity_curve), shared by the desktop and web charts"""
+        with self._lock:
+            df = self.frame()
+            key = (self.version, start, points)
+            return self.equity_cache.get_or_compute(key, lambda: equity_curve(df, self.time_index(), start, points))
+
+    def _current_metrics(self):
+        df = self.frame()
+        if self._metrics_version != self.version:
+            # Persisted rollups are only valid while the store matches the frame
+            periods = None if self._unsynced else self.rollup_sidecar.read(self._stamp)
+            self._metrics.rebuild(df, periods)
+            self._metrics_version = self.version
+            if periods is None and not self._unsynced:
+                self.rollup_sidecar.write(self._metrics.periods.to_json(), self._stamp)
+        return self._metrics
+
+    def dashboard_metrics(self):
+        """Dashboard card numbers from the running accumulator"""
+        with self._lock:
+            return self._current_metrics().dashboard()
+
+    def matrix_metrics(self, current_balance, start_balance):
+        """All-time Matrix metrics from the running accumulator"""
+        with self._lock:
+            return self._current_metrics().matrix(current_balance, start_balance)
+
+    def rollup(self, period, start=None, end=None):
+        """Closed-trade aggregates per 'day' / 'week' / 'month' starting in [start, end)"""
+        with self._lock:
+            return self._current_metrics().periods.between(period, start, end)
+
+    def period_totals(self, start=None, end=None):
+        """Closed-trade aggregates summed over the days in [start, end), as a dict"""
+        with self._lock:
+            return self._current_metrics().periods.totals(start, end).to_dict()
+
+    def streak_summary(self):
+        """Win/loss/break-even streaks of all closed trades from the running accumulator"""
+        with self._lock:
+            return self._current_metrics().streaks.summary()
+
+    def get_trade(self, trade_id):
+        """One trade as a Series, looked up by id on the frame's index, or None"""
+        with self._lock:
+            df = self.frame()
+            try:
+                return df.loc[trade_id]
+            except (KeyError, TypeError):
+                return None
+
+    def invalidate(self):
+        """Force the next frame() call to re-read the store"""
+        with self._lock:
+            self._df = None
+
+    def _written(self):
+        self._stamp = self.store.stamp()
+        self.version += 1
+        self._sidecars_dirty = True
+        self._last_write = time.monotonic()
+        if self._sidecar_timer is None:
+            self._schedule_sidecars(self.SIDECAR_DELAY_SECONDS)
+
+    def _schedule_sidecars(self, delay):
+        self._sidecar_timer = threading.Timer(delay, self._sidecars_due)
+        self._sidecar_timer.daemon = True
+        self._sidecar_timer.start()
+
+    def _sidecars_due(self):
+        """Timer callback: write the sidecars once edits have been quiet long enough"""
+        with self._lock:
+            self._sidecar_timer = None
+            quiet_for = time.monotonic() - self._last_write
+            if self._sidecars_dirty and quiet_for < self.SIDECAR_DELAY_SECONDS:
+                self._schedule_sidecars(self.SIDECAR_DELAY_SECONDS - quiet_for)
+                return
+        self._write_sidecars()
+
+    def _write_sidecars(self):
+        """Write the Feather and rollup sidecars for the synchronously persisted frame"""
+        with self._lock:
+            if not self._sidecars_dirty or self._unsynced or self._df is None:
+                # Edits queued on a writer: _batch_written writes them once it catches up
+                return
+            self._sidecars_dirty = False
+            stamp = self._stamp
+            snapshot = self._df.copy()
+            # Mutations update the accumulator with the frame, so tracked rollups match the snapshot
+            rollups = self._metrics.periods.to_json() if self._metrics_version == self.version else None
+        self.sidecar.write(snapshot, stamp)
+        if rollups is not None:
+            self.rollup_sidecar.write(rollups, stamp)
+
+    def _persist(self, op, trade_id, trade_data=None):
+        if self.writer is not None:
+            self._unsynced = True
+            self.version += 1
+            self.writer.submit(op, trade_id, trade_data)
+        else:
+            self.store.apply_batch([(op, trade_id, trade_data)])
+            self._written()
+
+    def _batch_written(self):
+        """Called on the writer thread after each batch reached the store"""
+        with self._lock:
+            if self.writer is None or self.writer.has_queued():
+                return
+            self._unsynced = False
+            self._sidecars_dirty = False
+            self._stamp = self.store.stamp()
+            stamp = self._stamp
+            snapshot = self._df.copy() if self._df is not None else None
+            rollups = self._metrics.periods.to_json() if self._metrics_version == self.version else None
+        if snapshot is not None:
+            self.sidecar.write(snapshot, stamp)
+        if rollups is not None:
+            self.rollup_sidecar.write(rollups, stamp)
+
+    def add(self, trade_data):
+        """Insert a trade and return its id (raises TradeSchemaError for invalid values)"""
+        trade_data = coerce_trade(trade_data)
+        with self._lock:
+            df = self.frame()
+            tracked = self._metrics_version == self.version
+            trade_id = self.store.allocate_id()
+            self._df = set_trade(df, trade_id, trade_data)
+            if tracked:
+                self._metrics.add(trade_id, self._df.loc[trade_id].to_dict(), self._df)
+            self._persist('insert', trade_id, trade_data)
+            if tracked:
+                self._metrics_version = self.version
+            return trade_id
+
+    def update(self, trade_id, trade_data):
+        trade_data = coerce_trade(trade_data)
+        with self._lock:
+            df = self.frame()
+            tracked = self._metrics_version == self.version
+            old_row = df.loc[trade_id].to_dict() if tracked else None
+            self._df = set_trade(df, trade_id, trade_data)
+            if tracked:
+                self._metrics.replace(trade_id, old_row, self._df.loc[trade_id].to_dict(), self._df)
+            self._persist('update', trade_id, trade_data)
+            if tracked:
+                self._metrics_version = self.version
+
+    def delete(self, trade_id):
+        with self._lock:
+            df = self.frame()
+            tracked = self._metrics_version == self.version
+            old_row = df.loc[trade_id].to_dict() if tracked else None
+            self._df = df.drop(trade_id)
+            if tracked:
+                self._metrics.remove(trade_id, old_row, self._df)
+            self._persist('delete', trade_id)
+            if tracked:
+                self._metrics_version = self.version
+
+
+_repositories = {}
+_repositories_lock = threading.Lock()
+
+
+def get_trade_repository(profile_path, backend=None):
+    """Shared repository for a profile folder (one per store)"""
+    store = open_trade_store(profile_path, backend)
+    with _repositories_lock:
+        repo = _repositories.get(store)
+        if repo is None:
+            repo = TradeRepository(store)
+            _repositories[store] = repo
+        return repo
@@ -0,0 +1,148 @@
+"""
+Trade Schema
+Declared column types for the trades DataFrame, applied once at load and enforced on write
+"""
+
+import datetime
+
+import pandas as pd
+
+
+# Column order used by the journal UI, the exports and every backend
+TRADE_COLUMNS = [
+    'Time', 'Pair', 'Notes', 'Screenshot1', 'Screenshot2', 'Trade Size', 'Leverage',
+    'Take Profit %', 'Stop Loss %', 'Take Profit Amount', 'Stop Loss Amount',
+    'Risk/Reward Ratio', 'Status', 'Outcome', 'PnL', 'PnL %',
+    'Closed Notes', 'Position Type'
+]
+
+# Format of the Time column in storage and in the UI
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+DATETIME_COLUMNS = ['Time']
+
+FLOAT_COLUMNS = [
+    'Trade Size', 'Leverage', 'Take Profit %', 'Stop Loss %', 'Take Profit Amount',
+    'Stop Loss Amount', 'Risk/Reward Ratio', 'PnL', 'PnL %'
+]
+
+# Few distinct values -> stored once per category instead of once per trade
+CATEGORY_COLUMNS = ['Pair', 'Status', 'Outcome', 'Position Type']
+
+# Free text ('' when empty)
+TEXT_COLUMNS = ['Notes', 'Closed Notes', 'Screenshot1', 'Screenshot2']
+
+
+class TradeSchemaError(ValueError):
+    """A value cannot be stored in its declared column type"""
+
+
+def _parse_times(values):
+    parsed = pd.to_datetime(values, format=TIME_FORMAT, errors='coerce')
+    # Older journals may hold other layouts (e.g. Excel dates); only those rows take the slow path
+    retry = parsed.isna() & values.notna() & (values.astype(str).str.strip() != '')
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry].astype(str), format='mixed', errors='coerce')
+    return parsed
+
+
+def apply_schema(df):
+    """Cast a trades DataFrame to the declared dtypes (columns already typed are left alone)"""
+    for col in TRADE_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    for col in DATETIME_COLUMNS:
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = _parse_times(df[col])
+    for col in FLOAT_COLUMNS:
+        if df[col].dtype != 'float64':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    for col in CATEGORY_COLUMNS:
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].fillna('').astype(str).astype('category')
+    for col in TEXT_COLUMNS:
+        if not pd.api.types.is_string_dtype(df[col]) or df[col].hasnans:
+            df[col] = df[col].fillna('').astype(str)
+    return df[TRADE_COLUMNS]
+
+
+def _coerce_time(column, value):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, (datetime.datetime, pd.Timestamp)):
+        return None if pd.isna(value) else value.strftime(TIME_FORMAT)
+    try:
+        return datetime.datetime.strptime(str(value).strip(), TIME_FORMAT).strftime(TIME_FORMAT)
+    except ValueError:
+        parsed = pd.to_datetime(str(value), errors='coerce')
+        if pd.isna(parsed):
+            raise TradeSchemaError(f"{column} must be a date like 2024-01-31 14:30:00, got '{value}'")
+        return parsed.strftime(TIME_FORMAT)
+
+
+def _coerce_float(column, value):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise TradeSchemaError(f"{column} must be a number, got '{value}'")
+    return None if pd.isna(number) else number
+
+
+def coerce_trade(trade_data):
+    """Storage-ready copy of a trade dict: Time as TIME_FORMAT text, numbers as float or None
+
+    Raises TradeSchemaError for values that do not fit their column.
+    """
+    clean = {}
+    for col, value in trade_data.items():
+        if col in DATETIME_COLUMNS:
+            clean[col] = _coerce_time(col, value)
+        elif col in FLOAT_COLUMNS:
+            clean[col] = _coerce_float(col, value)
+        elif col in CATEGORY_COLUMNS or col in TEXT_COLUMNS:
+            clean[col] = '' if value is None or (isinstance(value, float) and pd.isna(value)) else str(value)
+        else:
+            clean[col] = value
+    return clean
+
+
+def _add_categories(df, values):
+    for col in CATEGORY_COLUMNS:
+        if col in values and isinstance(df[col].dtype, pd.CategoricalDtype):
+            value = values[col]
+            if value not in df[col].cat.categories:
+                df[col] = df[col].cat.add_categories([value])
+
+
+def set_trade(df, trade_id, values):
+    """Write coerced values for one trade into a typed frame; returns the (possibly new) frame"""
+    if trade_id not in df.index:
+        if df.empty:
+            return apply_schema(pd.DataFrame([values], index=pd.Index([trade_id], name=df.index.name)))
+        # Enlarge by one row (every column keeps its dtype, unlike df.loc[new] = row or a
+        # concat with a one-row frame), then fill it in like an update
+        df = df.reindex(df.index.append(pd.Index([trade_id], name=df.index.name)))
+        values = dict({col: '' for col in CATEGORY_COLUMNS + TEXT_COLUMNS}, **values)
+    _add_categories(df, values)
+    for col, value in values.items():
+        if col in DATETIME_COLUMNS:
+            value = pd.NaT if value is None else pd.Timestamp(value)
+        elif col in FLOAT_COLUMNS and value is None:
+            value = float('nan')
+        df.at[trade_id, col] = value
+    return df
+
+
+def format_value(value):
+    """Text for a typed cell in the journal form / trade lists"""
+    if value is None:
+        return ''
+    if isinstance(value, (datetime.datetime, pd.Timestamp)):
+        return '' if pd.isna(value) else value.strftime(TIME_FORMAT)
+    if isinstance(value, float):
+        if pd.isna(value):
+            return ''
+        return str(int(value)) if value.is_integer() else str(value)
+    return str(value)
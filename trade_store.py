@@ -0,0 +1,557 @@
+"""
+Trade Storage Backends
+Per-profile trade persistence with single-row inserts, updates and deletes
+"""
+
+import os
+import json
+import time
+import datetime
+import sqlite3
+import threading
+from contextlib import closing
+
+import pandas as pd
+
+from trade_schema import TRADE_COLUMNS, FLOAT_COLUMNS, TIME_FORMAT
+
+
+# SQLite column affinities (anything not listed is stored as TEXT)
+REAL_COLUMNS = FLOAT_COLUMNS
+
+# Columns that get their own index in the SQLite store
+INDEXED_COLUMNS = ['Time', 'Pair', 'Status']
+
+DEFAULT_BACKEND = 'sqlite'
+
+# Workbook property holding the next unused trade id (the xlsx backend's sqlite_sequence)
+NEXT_ID_PROPERTY = 'next_id'
+
+
+def empty_trades_frame():
+    """Empty trades DataFrame with the journal's columns"""
+    df = pd.DataFrame(columns=TRADE_COLUMNS)
+    df.index.name = 'id'
+    return df
+
+
+def _quote(column):
+    """Quote a column name for SQL ("Take Profit %" etc.)"""
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _clean_value(value):
+    """Convert pandas missing values to None so they are stored as NULL"""
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if isinstance(value, (datetime.datetime, pd.Timestamp)):
+        return value.strftime(TIME_FORMAT)
+    if hasattr(value, 'item'):
+        # numpy scalars -> python scalars
+        return value.item()
+    return value
+
+
+def read_trades_xlsx(path):
+    """Trades workbook as a frame indexed by trade id (legacy workbooks are numbered in file order)"""
+    if not os.path.exists(path):
+        return empty_trades_frame()
+    df = pd.read_excel(path)
+    df.columns = df.columns.str.strip()
+    if 'id' in df.columns and df['id'].notna().all() and df['id'].is_unique:
+        df = df.set_index('id')
+        df.index = df.index.astype(int)
+    else:
+        # Legacy workbook without ids: number rows in file order
+        df = df.drop(columns=['id'], errors='ignore')
+        df.index = pd.RangeIndex(1, len(df) + 1)
+    df.index.name = 'id'
+    for col in TRADE_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    return df[TRADE_COLUMNS]
+
+
+def read_xlsx_next_id(path):
+    """Id high-water mark stored in a trades workbook (0 if it has none)"""
+    if not os.path.exists(path):
+        return 0
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True)
+    try:
+        for prop in wb.custom_doc_props:
+            if prop.name == NEXT_ID_PROPERTY:
+                return int(prop.value)
+    finally:
+        wb.close()
+    return 0
+
+
+def write_trades_xlsx(df, path, next_id):
+    """Write trades in id order, recording the id high-water mark as a workbook property"""
+    from openpyxl.packaging.custom import IntProperty
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        df.sort_index().to_excel(writer, index=True, index_label='id')
+        writer.book.custom_doc_props.append(IntProperty(name=NEXT_ID_PROPERTY, value=int(next_id)))
+
+
+def _next_id_after(df, entries=(), next_id=0):
+    """Smallest id above every stored, logged (including deleted) or previously issued id"""
+    max_id = int(df.index.max()) if len(df) else 0
+    for entry in entries:
+        if isinstance(entry.get('id'), int):
+            max_id = max(max_id, entry['id'])
+    return max(next_id, max_id + 1)
+
+
+def read_wal(path, limit=None):
+    """Return (entries, bytes consumed) of a trades log; a torn final line from a crash is ignored"""
+    if not os.path.exists(path):
+        return [], 0
+    with open(path, 'rb') as f:
+        data = f.read() if limit is None else f.read(limit)
+
+    entries = []
+    consumed = 0
+    for line in data.splitlines(keepends=True):
+        if not line.endswith(b'\n'):
+            break
+        consumed += len(line)
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            print(f"⚠️ Skipping corrupt entry in {path}")
+    return entries, consumed
+
+
+def read_sqlite_sequence(path):
+    """Highest AUTOINCREMENT id ever issued by a trades.db file"""
+    with closing(sqlite3.connect(path, timeout=10)) as conn:
+        seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'trades'").fetchone()
+    return seq[0] if seq else 0
+
+
+def read_sqlite_trades(path):
+    """All trades of a trades.db file as a frame indexed by trade id"""
+    with closing(sqlite3.connect(path, timeout=10)) as conn:
+        df = pd.read_sql_query('SELECT * FROM trades ORDER BY id', conn, index_col='id')
+    for col in TRADE_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    return df[TRADE_COLUMNS]
+
+
+class TradeStore:
+    """Base class for per-profile trade storage backends"""
+    backend_name = None
+    store_files = []  # file names in the profile folder, main file first
+
+    def __init__(self, profile_path):
+        self.profile_path = profile_path
+        self.xlsx_path = os.path.join(profile_path, 'trades.xlsx')
+        # Called as listener(old_stamp, new_stamp), with the store lock held, when the
+        # backing files are rewritten without changing their content (e.g. compaction)
+        self.rewrite_listeners = []
+
+    def _stamp_paths(self):
+        """Files whose (mtime, size) identify the stored data"""
+        return []
+
+    def stamp(self):
+        """(mtime, size) of the backing files; changes whenever the stored trades change"""
+        result = []
+        for path in self._stamp_paths():
+            try:
+                st = os.stat(path)
+                result.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                result.append(None)
+        return tuple(result)
+
+    def load(self):
+        """Return all trades as a DataFrame indexed by trade id"""
+        raise NotImplementedError
+
+    def allocate_id(self):
+        """Reserve the id of a trade that is about to be inserted"""
+        raise NotImplementedError
+
+    def apply_batch(self, ops):
+        """Persist a list of (op, trade_id, trade_data) mutations together
+
+        op is 'insert', 'update' or 'delete'; trade_data is None for deletes.
+        """
+        raise NotImplementedError
+
+    def insert(self, trade_data, trade_id=None):
+        """Persist a new trade and return its id"""
+        if trade_id is None:
+            trade_id = self.allocate_id()
+        self.apply_batch([('insert', trade_id, trade_data)])
+        return trade_id
+
+    def update(self, trade_id, trade_data):
+        """Persist changed fields of an existing trade"""
+        self.apply_batch([('update', trade_id, trade_data)])
+
+    def delete(self, trade_id):
+        """Remove a trade from storage"""
+        self.apply_batch([('delete', trade_id, None)])
+
+    def export_xlsx(self, path):
+        """Write all trades to an Excel workbook (with their ids, so a re-import keeps them)"""
+        df = self.load()
+        df.to_excel(path, index=True, index_label='id')
+        return path
+
+    def close(self):
+        """Release background resources (timers, threads)"""
+        pass
+
+
+class SqliteTradeStore(TradeStore):
+    """SQLite trade store (profiles/profile_<id>/trades.db)"""
+    backend_name = 'sqlite'
+    store_files = ['trades.db']
+
+    def __init__(self, profile_path):
+        super().__init__(profile_path)
+        self.db_path = os.path.join(profile_path, 'trades.db')
+        self._lock = threading.Lock()
+        self._next_id = None
+
+        os.makedirs(profile_path, exist_ok=True)
+        self._create_schema()
+        wal_path = os.path.join(profile_path, 'trades.wal')
+        if (os.path.exists(self.xlsx_path) or os.path.exists(wal_path)) and self._count() == 0:
+            self._migrate_from_xlsx()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _stamp_paths(self):
+        return [self.db_path]
+
+    def _create_schema(self):
+        column_defs = ', '.join(
+            f"{_quote(col)} {'REAL' if col in REAL_COLUMNS else 'TEXT'}" for col in TRADE_COLUMNS
+        )
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS trades (id INTEGER PRIMARY KEY AUTOINCREMENT, {column_defs})")
+            for col in INDEXED_COLUMNS:
+                index_name = 'idx_trades_' + col.lower().replace(' ', '_')
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON trades ({_quote(col)})")
+
+    def _count(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+
+    def _migrate_from_xlsx(self):
+        """Import trades.xlsx (plus any un-compacted trades.wal of the xlsx backend) into the SQLite store"""
+        wal_path = os.path.join(self.profile_path, 'trades.wal')
+        try:
+            df = read_trades_xlsx(self.xlsx_path)
+            entries, _ = read_wal(wal_path)
+            next_id = _next_id_after(df, entries, read_xlsx_next_id(self.xlsx_path))
+            df = XlsxWalTradeStore._apply(df, entries)
+            columns = ['id'] + TRADE_COLUMNS
+            placeholders = ', '.join('?' for _ in columns)
+            sql = f"INSERT INTO trades ({', '.join(_quote(c) for c in columns)}) VALUES ({placeholders})"
+            rows = [
+                (int(trade_id),) + tuple(_clean_value(v) for v in row)
+                for trade_id, row in zip(df.index, df.itertuples(index=False, name=None))
+            ]
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.executemany(sql, rows)
+                # Carry over ids that were issued and deleted before the switch
+                conn.execute("DELETE FROM sqlite_sequence WHERE name = 'trades'")
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('trades', ?)", (next_id - 1,))
+        except Exception as e:
+            # Leave trades.xlsx / trades.wal in place so the migration is retried next launch
+            print(f"Error migrating {self.xlsx_path}: {e}")
+            return
+
+        # Keep the original files as a backup; they are no longer written to
+        if os.path.exists(self.xlsx_path):
+            os.replace(self.xlsx_path, os.path.join(self.profile_path, 'trades_legacy.xlsx'))
+        if os.path.exists(wal_path):
+            os.replace(wal_path, os.path.join(self.profile_path, 'trades_legacy.wal'))
+        print(f"Migrated {len(rows)} trades from {self.xlsx_path} to {self.db_path}")
+
+    def load(self):
+        return read_sqlite_trades(self.db_path)
+
+    def allocate_id(self):
+        with self._lock:
+            if self._next_id is None:
+                with closing(self._connect()) as conn:
+                    max_id = conn.execute("SELECT MAX(id) FROM trades").fetchone()[0] or 0
+                    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'trades'").fetchone()
+                # Never hand out an AUTOINCREMENT id that was used before
+                self._next_id = max(max_id, seq[0] if seq else 0) + 1
+            trade_id = self._next_id
+            self._next_id += 1
+            return trade_id
+
+    @staticmethod
+    def _execute(conn, op, trade_id, trade_data):
+        if op == 'delete':
+            conn.execute("DELETE FROM trades WHERE id = ?", (int(trade_id),))
+            return
+        columns = [col for col in TRADE_COLUMNS if col in trade_data]
+        values = [_clean_value(trade_data[c]) for c in columns]
+        if op == 'insert':
+            names = ', '.join(['id'] + [_quote(c) for c in columns])
+            placeholders = ', '.join('?' for _ in range(len(columns) + 1))
+            conn.execute(f"INSERT INTO trades ({names}) VALUES ({placeholders})", [int(trade_id)] + values)
+        elif op == 'update' and columns:
+            assignments = ', '.join(f"{_quote(c)} = ?" for c in columns)
+            conn.execute(f"UPDATE trades SET {assignments} WHERE id = ?", values + [int(trade_id)])
+
+    def apply_batch(self, ops):
+        # One transaction for the whole batch
+        with self._lock, closing(self._connect()) as conn, conn:
+            for op, trade_id, trade_data in ops:
+                self._execute(conn, op, trade_id, trade_data)
+
+
+class XlsxWalTradeStore(TradeStore):
+    """trades.xlsx plus an append-only write-ahead log (profiles/profile_<id>/trades.wal)
+
+    Every mutation is appended to the log as one fsync'd JSON line, so edits are
+    O(1) on disk. A background compactor folds the log into trades.xlsx once it
+    grows past COMPACT_MAX_BYTES or its oldest entry is COMPACT_MAX_AGE seconds old.
+    load() replays whatever has not been compacted yet, so a crash never loses a trade.
+    """
+    backend_name = 'xlsx'
+    store_files = ['trades.xlsx', 'trades.wal']
+
+    COMPACT_MAX_BYTES = 256 * 1024
+    COMPACT_MAX_AGE = 120  # seconds
+
+    def __init__(self, profile_path):
+        super().__init__(profile_path)
+        self.wal_path = os.path.join(profile_path, 'trades.wal')
+        self._lock = threading.RLock()
+        self._generation = 0  # bumped every time the log is folded into trades.xlsx
+        self._next_id = None
+        self._compact_thread = None
+        self._compact_timer = None
+
+        os.makedirs(profile_path, exist_ok=True)
+        self._repair_wal()
+        if not os.path.exists(self.xlsx_path) and not os.path.exists(self.wal_path):
+            self._migrate_from_sqlite()
+        if os.path.exists(self.wal_path) and os.path.getsize(self.wal_path) > 0:
+            self._schedule_compaction()
+
+    def _repair_wal(self):
+        """Cut off a half-written final line left behind by a crash"""
+        if not os.path.exists(self.wal_path):
+            return
+        with open(self.wal_path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+                print(f"⚠️ Dropped incomplete entry at the end of {self.wal_path}")
+
+    def _migrate_from_sqlite(self):
+        """Import a trades.db left by the SQLite backend (e.g. after switching storage_backend)"""
+        db_path = os.path.join(self.profile_path, 'trades.db')
+        if not os.path.exists(db_path):
+            return
+        try:
+            df = read_sqlite_trades(db_path)
+            next_id = _next_id_after(df, next_id=read_sqlite_sequence(db_path) + 1)
+            tmp_path = os.path.join(self.profile_path, 'trades.migrating.xlsx')
+            write_trades_xlsx(df, tmp_path, next_id)
+            os.replace(tmp_path, self.xlsx_path)
+        except Exception as e:
+            # Leave trades.db in place so the migration is retried next launch
+            print(f"Error migrating {db_path}: {e}")
+            return
+
+        # Keep the database as a backup; it is no longer written to
+        os.replace(db_path, os.path.join(self.profile_path, 'trades_legacy.db'))
+        print(f"Migrated {len(df)} trades from {db_path} to {self.xlsx_path}")
+
+    def _stamp_paths(self):
+        return [self.xlsx_path, self.wal_path]
+
+    # ---------- reading ----------
+    def _read_xlsx(self):
+        """(trades, id high-water mark) of the workbook"""
+        return read_trades_xlsx(self.xlsx_path), read_xlsx_next_id(self.xlsx_path)
+
+    def _read_wal(self, limit=None):
+        return read_wal(self.wal_path, limit)
+
+    @staticmethod
+    def _apply(df, entries):
+        """Replay log entries onto a trades frame (idempotent, keyed by id)"""
+        if entries:
+            # Logged values keep the form's types; don't let pandas refuse the upcast
+            df = df.astype(object)
+        for entry in entries:
+            op = entry.get('op')
+            trade_id = entry.get('id')
+            row = entry.get('row') or {}
+            if op == 'insert':
+                df.loc[trade_id] = pd.Series({col: row.get(col) for col in TRADE_COLUMNS})
+            elif op == 'update' and trade_id in df.index:
+                for col, value in row.items():
+                    if col in df.columns:
+                        df.at[trade_id, col] = value
+            elif op == 'delete' and trade_id in df.index:
+                df = df.drop(trade_id)
+        return df
+
+    def load(self):
+        while True:
+            generation = self._generation
+            df, next_id = self._read_xlsx()
+            with self._lock:
+                # Only pair the workbook with the log of the same generation
+                if generation == self._generation:
+                    entries, _ = self._read_wal()
+                    break
+
+        next_id = _next_id_after(df, entries, next_id)
+        df = self._apply(df, entries)
+        with self._lock:
+            if self._next_id is None or self._next_id < next_id:
+                self._next_id = next_id
+        return df
+
+    # ---------- writing ----------
+    def allocate_id(self):
+        with self._lock:
+            if self._next_id is None:
+                self.load()
+            trade_id = self._next_id
+            self._next_id += 1
+            return trade_id
+
+    def apply_batch(self, ops):
+        """Append one log line per mutation, fsync'd once for the whole batch"""
+        lines = []
+        for op, trade_id, trade_data in ops:
+            entry = {'op': op, 'id': int(trade_id)}
+            if trade_data is not None:
+                entry['row'] = {col: _clean_value(trade_data[col]) for col in TRADE_COLUMNS if col in trade_data}
+            lines.append(json.dumps(entry, default=str, ensure_ascii=False) + '\n')
+        if not lines:
+            return
+
+        with self._lock:
+            with open(self.wal_path, 'a', encoding='utf-8') as f:
+                f.write(''.join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            wal_size = os.path.getsize(self.wal_path)
+
+        if wal_size >= self.COMPACT_MAX_BYTES:
+            self.compact_async()
+        else:
+            self._schedule_compaction()
+
+    # ---------- compaction ----------
+    def _schedule_compaction(self):
+        """Make sure the log is compacted within COMPACT_MAX_AGE seconds"""
+        with self._lock:
+            if self._compact_timer is not None:
+                return
+            self._compact_timer = threading.Timer(self.COMPACT_MAX_AGE, self.compact_async)
+            self._compact_timer.daemon = True
+            self._compact_timer.start()
+
+    def compact_async(self):
+        """Fold the log into trades.xlsx on a background thread"""
+        with self._lock:
+            if self._compact_timer is not None:
+                self._compact_timer.cancel()
+                self._compact_timer = None
+            if self._compact_thread is not None and self._compact_thread.is_alive():
+                return
+            self._compact_thread = threading.Thread(target=self.compact, daemon=True)
+            self._compact_thread.start()
+
+    def compact(self):
+        """Rewrite trades.xlsx with every logged change and drop the compacted log prefix"""
+        started = time.perf_counter()
+        with self._lock:
+            wal_size = os.path.getsize(self.wal_path) if os.path.exists(self.wal_path) else 0
+        if wal_size == 0:
+            return
+
+        try:
+            df, next_id = self._read_xlsx()
+            entries, consumed = self._read_wal(limit=wal_size)
+            # The log is about to lose the ids of deleted trades; keep them in the workbook
+            next_id = _next_id_after(df, entries, next_id)
+            df = self._apply(df, entries)
+
+            tmp_path = os.path.join(self.profile_path, 'trades.compacting.xlsx')
+            write_trades_xlsx(df, tmp_path, next_id)
+
+            with self._lock:
+                before = self.stamp()
+                os.replace(tmp_path, self.xlsx_path)
+                # Keep entries appended while the workbook was being written
+                with open(self.wal_path, 'rb') as f:
+                    f.seek(consumed)
+                    tail = f.read()
+                tmp_wal = self.wal_path + '.tmp'
+                with open(tmp_wal, 'wb') as f:
+                    f.write(tail)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_wal, self.wal_path)
+                self._generation += 1
+                after = self.stamp()
+                for listener in self.rewrite_listeners:
+                    listener(before, after)
+        except Exception as e:
+            print(f"Error compacting {self.wal_path}: {e}")
+            return
+
+        print(f"Compacted {len(entries)} log entries into {self.xlsx_path} "
+              f"in {time.perf_counter() - started:.2f}s")
+        if tail:
+            self._schedule_compaction()
+
+    def close(self):
+        with self._lock:
+            if self._compact_timer is not None:
+                self._compact_timer.cancel()
+                self._compact_timer = None
+
+
+# Registered storage backends, selected with the 'storage_backend' setting
+STORE_BACKENDS = {
+    'sqlite': SqliteTradeStore,
+    'xlsx': XlsxWalTradeStore,
+}
+
+# One store per profile folder, shared by the journal UI and the Matrix server
+_open_stores = {}
+_open_stores_lock = threading.Lock()
+
+
+def open_trade_store(profile_path, backend=None):
+    """Open (or reuse) the trade store for a profile folder"""
+    backend = backend or DEFAULT_BACKEND
+    if backend not in STORE_BACKENDS:
+        print(f"⚠️ Unknown storage backend '{backend}', using {DEFAULT_BACKEND}")
+        backend = DEFAULT_BACKEND
+
+    key = (os.path.abspath(profile_path), backend)
+    with _open_stores_lock:
+        store = _open_stores.get(key)
+        if store is None:
+            store = STORE_BACKENDS[backend](profile_path)
+            _open_stores[key] = store
+        return store
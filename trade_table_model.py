@@ -0,0 +1,178 @@
+"""
+Trade Table Model
+Virtualized Qt table model over the trade arrays, with a status filter / sort proxy
+"""
+
+import numpy as np
+import pandas as pd
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QAbstractProxyModel, QModelIndex
+
+from trade_schema import format_value
+
+
+class TradeTableModel(QAbstractTableModel):
+    """Trades as a read-only table backed by numpy arrays.
+
+    set_trades() copies a handful of columns out of the frame in vectorized
+    passes; cell text is only formatted in data(), i.e. for the rows a view
+    actually paints. Qt.UserRole holds the trade id.
+    """
+
+    # (frame column, header)
+    COLUMNS = [
+        ('Time', 'Time'),
+        ('Pair', 'Pair'),
+        ('Trade Size', 'Size'),
+        ('PnL', 'PnL'),
+        ('PnL %', 'PnL %'),
+    ]
+    NUMERIC_COLUMNS = {'Trade Size', 'PnL', 'PnL %'}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.ids = np.array([], dtype=np.int64)
+        self.statuses = np.array([], dtype=str)
+        self.values = {col: np.array([]) for col, _ in self.COLUMNS}
+
+    def set_trades(self, df):
+        """Show the trades of a typed frame (frame order)"""
+        self.beginResetModel()
+        if df is None or df.empty:
+            self.ids = np.array([], dtype=np.int64)
+            self.statuses = np.array([], dtype=str)
+            self.values = {col: np.array([]) for col, _ in self.COLUMNS}
+        else:
+            self.ids = df.index.to_numpy(dtype=np.int64)
+            self.statuses = df['Status'].to_numpy(dtype=str)
+            self.values = {
+                'Time': df['Time'].to_numpy(dtype='datetime64[ns]'),
+                'Pair': df['Pair'].to_numpy(dtype=str),
+            }
+            for col in self.NUMERIC_COLUMNS:
+                self.values[col] = df[col].to_numpy(dtype=float, na_value=np.nan)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.UserRole:
+            return int(self.ids[row])
+        col = self.COLUMNS[index.column()][0]
+        if role == Qt.DisplayRole:
+            value = self.values[col][row]
+            if col == 'Time':
+                return '' if np.isnat(value) else format_value(pd.Timestamp(value))
+            return format_value(value.item() if hasattr(value, 'item') else value)
+        if role == Qt.TextAlignmentRole and col in self.NUMERIC_COLUMNS:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section][1]
+        return None
+
+    def sort_key(self, column):
+        """Array ordering the rows by a column (missing times / numbers sort last)"""
+        col = self.COLUMNS[column][0]
+        values = self.values[col]
+        if col == 'Time':
+            epochs = values.view('int64').astype(float)
+            epochs[np.isnat(values)] = np.nan
+            return epochs
+        return values
+
+
+class TradeFilterProxy(QAbstractProxyModel):
+    """Rows of a TradeTableModel with one status, in the view's sort order.
+
+    The row mapping is two index arrays computed with numpy (mask + argsort)
+    whenever the source is reset or the view sorts, so filtering and sorting
+    never call back into Python per row.
+    """
+
+    def __init__(self, status=None, parent=None):
+        super().__init__(parent)
+        self.status = status
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+        self._rows = np.array([], dtype=np.int64)     # proxy row -> source row
+        self._inverse = np.array([], dtype=np.int64)  # source row -> proxy row (-1 if hidden)
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self._source_reset)
+        self.beginResetModel()
+        self._source_reset()
+
+    def _source_reset(self):
+        self._remap()
+        self.endResetModel()
+
+    def _remap(self):
+        model = self.sourceModel()
+        if self.status is None:
+            rows = np.arange(len(model.ids))
+        else:
+            rows = np.flatnonzero(model.statuses == self.status)
+        if self.sort_column >= 0 and len(rows):
+            keys = model.sort_key(self.sort_column)[rows]
+            order = np.argsort(keys, kind='stable')
+            if self.sort_order == Qt.DescendingOrder:
+                # Reverse, but keep missing values at the end
+                missing = pd.isna(keys[order])
+                order = np.concatenate((order[~missing][::-1], order[missing]))
+            rows = rows[order]
+        self._rows = rows
+        self._inverse = np.full(len(model.ids), -1, dtype=np.int64)
+        self._inverse[rows] = np.arange(len(rows))
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self.sort_column = column
+        self.sort_order = order
+        self._remap()
+        self.layoutChanged.emit()
+
+    def trade_id(self, row):
+        return int(self.sourceModel().ids[self._rows[row]])
+
+    # ---------- QAbstractProxyModel ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.sourceModel().columnCount()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < len(self._rows)) or not (0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(int(self._rows[proxy_index.row()]), proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid() or source_index.row() >= len(self._inverse):
+            return QModelIndex()
+        row = int(self._inverse[source_index.row()])
+        return QModelIndex() if row < 0 else self.createIndex(row, source_index.column())
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal:
+            return self.sourceModel().headerData(section, orientation, role)
+        return None
@@ -0,0 +1,181 @@
+"""
+Trade Save Writer
+Debounced background thread that persists trade mutations
+"""
+
+import time
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class TradeSaveWriter(QThread):
+    """Background writer with a coalescing queue.
+
+    Mutations are queued per trade id and merged (insert+update -> insert,
+    update+update -> update, insert+delete -> nothing), then written as one
+    batch once edits have been quiet for DEBOUNCE_SECONDS (or MAX_DELAY_SECONDS
+    after the first unsaved edit). The UI thread never waits on the disk.
+    """
+    state_changed = pyqtSignal(str)          # 'dirty', 'saving', 'saved' or 'error'
+    save_finished = pyqtSignal(int, float)   # mutations written, write latency (ms)
+    save_failed = pyqtSignal(str)
+
+    DEBOUNCE_SECONDS = 0.3
+    MAX_DELAY_SECONDS = 2.0
+    RETRY_SECONDS = 2.0
+
+    def __init__(self, store, on_batch_written=None):
+        super().__init__()
+        self.store = store
+        self.on_batch_written = on_batch_written
+        self._cond = threading.Condition()
+        self._pending = {}       # trade_id -> (op, trade_data), in submission order
+        self._first_dirty = None
+        self._last_submit = None
+        self._retry_at = None
+        self._busy = False
+        self._stopping = False
+        self.last_latency_ms = None
+        self.total_writes = 0
+
+    # ---------- called from the UI thread ----------
+    def submit(self, op, trade_id, trade_data=None):
+        """Queue a mutation; returns immediately"""
+        with self._cond:
+            previous = self._pending.pop(trade_id, None)
+            merged = self._merge(previous, (op, dict(trade_data) if trade_data else None))
+            if merged is not None:
+                self._pending[trade_id] = merged
+            now = time.monotonic()
+            if not self._pending:
+                # e.g. insert+delete cancelled out: nothing left to debounce
+                self._first_dirty = None
+            elif self._first_dirty is None:
+                self._first_dirty = now
+            self._last_submit = now
+            self._cond.notify_all()
+        self.state_changed.emit('dirty')
+
+    @staticmethod
+    def _merge(previous, new):
+        if previous is None:
+            return new
+        prev_op, prev_data = previous
+        op, data = new
+        if op == 'delete':
+            # Never written -> nothing to delete
+            return None if prev_op == 'insert' else new
+        if op == 'update':
+            merged = dict(prev_data or {})
+            merged.update(data or {})
+            return (prev_op if prev_op == 'insert' else 'update', merged)
+        return new
+
+    def has_pending(self):
+        """True while anything is queued or being written"""
+        with self._cond:
+            return bool(self._pending) or self._busy
+
+    def has_queued(self):
+        """True if mutations are waiting for the next batch"""
+        with self._cond:
+            return bool(self._pending)
+
+    def flush(self, timeout=10.0):
+        """Write everything queued now and wait for it; returns True when idle"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if self._pending:
+                self._first_dirty = 0  # skip the debounce
+                self._retry_at = None
+                self._cond.notify_all()
+            while self._pending or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout=10.0):
+        """Flush, then end the thread"""
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self.wait(int(timeout * 1000))
+        return flushed
+
+    # ---------- writer thread ----------
+    def _due_in(self, now):
+        """Seconds until the queued batch should be written (<= 0 means now)"""
+        if self._retry_at is not None:
+            return self._retry_at - now
+        quiet_for = now - self._last_submit
+        waited = now - self._first_dirty
+        return min(self.DEBOUNCE_SECONDS - quiet_for, self.MAX_DELAY_SECONDS - waited)
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    if self._pending:
+                        due_in = self._due_in(time.monotonic())
+                        if due_in <= 0:
+                            break
+                        self._cond.wait(due_in)
+                    else:
+                        self._cond.wait()
+                if self._stopping and not self._pending:
+                    return
+                batch = list(self._pending.items())
+                self._pending.clear()
+                self._first_dirty = None
+                self._retry_at = None
+                self._busy = True
+
+            self.state_changed.emit('saving')
+            started = time.perf_counter()
+            try:
+                self.store.apply_batch([(op, trade_id, data) for trade_id, (op, data) in batch])
+                error = None
+            except Exception as e:
+                error = e
+            latency_ms = (time.perf_counter() - started) * 1000
+
+            if error is not None:
+                print(f"Error saving trades: {error}")
+                with self._cond:
+                    # Put the batch back in front of anything queued meanwhile
+                    newer = self._pending
+                    self._pending = dict(batch)
+                    for trade_id, change in newer.items():
+                        merged = self._merge(self._pending.pop(trade_id, None), change)
+                        if merged is not None:
+                            self._pending[trade_id] = merged
+                    self._first_dirty = time.monotonic()
+                    self._last_submit = self._first_dirty
+                    self._retry_at = self._first_dirty + self.RETRY_SECONDS
+                    self._busy = False
+                    self._cond.notify_all()
+                self.state_changed.emit('error')
+                self.save_failed.emit(str(error))
+                if self._stopping:
+                    return
+                continue
+
+            self.last_latency_ms = latency_ms
+            self.total_writes += 1
+            if self.on_batch_written is not None:
+                try:
+                    self.on_batch_written()
+                except Exception as e:
+                    print(f"Error after saving trades: {e}")
+
+            with self._cond:
+                self._busy = False
+                idle = not self._pending
+                self._cond.notify_all()
+            self.save_finished.emit(len(batch), latency_ms)
+            if idle:
+                self.state_changed.emit('saved')